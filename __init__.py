@@ -7,17 +7,14 @@ from .panels import RigPoserArmature_PT_Panel
 from .operators import OT_GenerateBaseRig_Operator
 
 # START — workflow remove
+from . import dev_reload
 if _needs_reload:
-    import sys, importlib
+    # reload only what changed, in dependency order, then pick up the new classes
+    dev_reload.reload_changed(__name__)
     from .panels import RigPoserArmature_PT_Panel
     from .operators import OT_GenerateBaseRig_Operator
-
-    all_modules = sys.modules
-    all_modules = dict(sorted(all_modules.items(), key=lambda x: x[0]))  # sort them
-    # reload modules
-    for k, v in all_modules.items():
-        if k.startswith(__name__):
-            importlib.reload(v)
+else:
+    dev_reload.start_watching(__name__)
 # END — workflow remove
 
 
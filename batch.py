@@ -0,0 +1,440 @@
+"""Headless batch rigging of Poser FBX exports with a pool of Blender worker processes.
+
+The coordinator spreads FBX files over worker processes (one Blender per figure), so a
+figure that crashes or hangs Blender only fails its own record. Each worker imports the
+FBX, runs :func:`setup_poser_figure`, saves a ``.blend`` and reports a JSON result that
+the coordinator appends to a JSON-lines log. With a template directory, figures whose
+skeleton topology was rigged before are fitted from that rig instead (see ``rig_template``).
+
+Usage::
+
+    blender -b --factory-startup --python cli.py -- batch INPUT -o OUTPUT_DIR [-j WORKERS]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import addon_utils
+import bpy
+from bpy.types import Object
+
+from .cache import RigCache, cache_key
+from .constants import RIG_FIGURE_PROPERTY
+from .generate_base_rig import setup_poser_figure
+from .profiler import profile_setup_poser_figure, rig_statistics
+from .rig_template import RigTemplates, setup_poser_figure_from_template
+
+CLI_SCRIPT = Path(__file__).with_name('cli.py')
+FBX_SUFFIX = '.fbx'
+# ID collections cleared between figures; order matters so users are removed before the data they use
+RESET_DATA_COLLECTIONS = (
+    'objects', 'collections', 'meshes', 'armatures', 'materials', 'images', 'textures',
+    'actions', 'cameras', 'lights', 'node_groups', 'worlds',
+)
+STDERR_TAIL_LINES = 20
+
+
+def collect_fbx_files(source: Path) -> list[tuple[Path, Path]]:
+    """
+    Collect FBX files from a directory or a manifest file.
+
+    A manifest is a text file with one FBX path per line; blank lines and lines
+    starting with ``#`` are ignored and relative paths resolve against the manifest.
+
+    Args:
+        source: Directory to search recursively, or manifest file
+
+    Returns:
+        List of ``(fbx_path, relative_path)`` pairs, where the relative path is used to
+        lay out the output directory
+
+    Raises:
+        FileNotFoundError: If the source or a manifest entry does not exist
+    """
+    if not source.exists():
+        raise FileNotFoundError(f"Batch input not found: {source}")
+
+    if source.is_dir():
+        files = sorted(path for path in source.rglob('*') if path.suffix.lower() == FBX_SUFFIX)
+        return [(path, path.relative_to(source)) for path in files]
+
+    base_dir = source.parent
+    entries = []
+    for line in source.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        path = Path(line)
+        if not path.is_absolute():
+            path = base_dir / path
+        if not path.exists():
+            raise FileNotFoundError(f"Manifest entry not found: {path}")
+
+        relative = path.relative_to(base_dir) if path.is_relative_to(base_dir) else Path(path.name)
+        entries.append((path, relative))
+
+    return entries
+
+
+def reset_data(keep: set = frozenset()) -> None:
+    """
+    Remove all scene data so the next figure starts from an empty file.
+
+    Args:
+        keep: Datablocks to preserve (e.g. data a warm worker loaded up front)
+    """
+    for collection_name in RESET_DATA_COLLECTIONS:
+        data = getattr(bpy.data, collection_name)
+        ids = [datablock for datablock in data if datablock not in keep]
+        if ids:
+            bpy.data.batch_remove(ids)
+
+
+def enable_fbx_importer() -> None:
+    """Make sure Blender's bundled FBX importer is enabled."""
+    _, loaded = addon_utils.check('io_scene_fbx')
+    if not loaded:
+        addon_utils.enable('io_scene_fbx', default_set=False)
+
+
+def import_fbx(fbx_path: Path) -> Object:
+    """
+    Import a Poser FBX export and make its armature the active, only selected object.
+
+    Args:
+        fbx_path: FBX file to import
+
+    Returns:
+        The imported armature object; the one with the most bones if there are several
+
+    Raises:
+        ValueError: If the file contains no armature
+    """
+    bpy.ops.import_scene.fbx(filepath=str(fbx_path))
+
+    armatures = [obj for obj in bpy.context.selected_objects if obj.type == 'ARMATURE']
+    if not armatures:
+        raise ValueError(f"No armature found in {fbx_path.name}")
+
+    armature = max(armatures, key=lambda obj: len(obj.data.bones))
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+
+    bpy.context.view_layer.objects.active = armature
+    armature.select_set(True)
+    return armature
+
+
+def rig_fbx(fbx_path: Path, output_path: Path, profile: bool = False, templates: RigTemplates = None) -> dict:
+    """
+    Import, rig and save a single figure, capturing any failure in the result.
+
+    Args:
+        fbx_path: FBX file to rig
+        output_path: Destination ``.blend`` file
+        profile: Add a per-stage profile of the rig step to the result as ``profile``;
+            profiled figures are always generated in full
+        templates: Template rigs to fit the figure from, or None to always generate
+
+    Returns:
+        Result record with status, per-step timings and rig statistics; ``template`` is
+        ``'fitted'`` or ``'generated'`` when templates are used
+    """
+    record = {'fbx': str(fbx_path), 'output': str(output_path), 'status': 'ok', 'error': None}
+    timings = {}
+    start = time.perf_counter()
+    step_start = start
+    try:
+        reset_data()
+        armature = import_fbx(fbx_path)
+        timings['import'] = time.perf_counter() - step_start
+
+        step_start = time.perf_counter()
+        if profile:
+            record['profile'] = profile_setup_poser_figure(armature)
+        elif templates is not None:
+            fitted = setup_poser_figure_from_template(armature, templates)
+            record['template'] = 'fitted' if fitted else 'generated'
+        else:
+            setup_poser_figure(armature)
+        timings['rig'] = time.perf_counter() - step_start
+        record['figure'] = armature.get(RIG_FIGURE_PROPERTY)
+        record.update(rig_statistics(armature))
+
+        step_start = time.perf_counter()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        bpy.ops.wm.save_as_mainfile(filepath=str(output_path), check_existing=False)
+        timings['save'] = time.perf_counter() - step_start
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['traceback'] = traceback.format_exc()
+
+    timings['total'] = time.perf_counter() - start
+    record['timings'] = timings
+    return record
+
+
+def worker_main(argv: list[str]) -> int:
+    """
+    Rig one FBX file and write its result record (``rig-worker`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code, non-zero if rigging failed
+    """
+    parser = argparse.ArgumentParser(prog='rig-worker', description="Rig a single Poser FBX export.")
+    parser.add_argument('--fbx', type=Path, required=True, help="FBX file to rig")
+    parser.add_argument('--output', type=Path, required=True, help="Destination .blend file")
+    parser.add_argument('--result', type=Path, required=True, help="File to write the JSON result record to")
+    parser.add_argument('--profile', action='store_true', help="Profile each generation stage")
+    parser.add_argument('--templates', type=Path, default=None, help="Directory of template rigs to fit from")
+    args = parser.parse_args(argv)
+
+    enable_fbx_importer()
+    templates = RigTemplates(args.templates) if args.templates is not None else None
+    record = rig_fbx(args.fbx, args.output, args.profile, templates)
+    # written under a temporary name, so a worker killed mid-write leaves no partial result
+    partial = args.result.with_name(args.result.name + '.partial')
+    partial.write_text(json.dumps(record), encoding='utf-8')
+    partial.replace(args.result)
+    return 0 if record['status'] == 'ok' else 1
+
+
+def run_worker(
+    blender: str,
+    fbx_path: Path,
+    output_path: Path,
+    threads: int,
+    timeout: float | None,
+    profile: bool = False,
+    templates: Path | None = None,
+) -> dict:
+    """
+    Rig one figure in a separate Blender process.
+
+    Args:
+        blender: Path to the Blender executable
+        fbx_path: FBX file to rig
+        output_path: Destination ``.blend`` file
+        threads: Number of threads the worker Blender may use
+        timeout: Seconds before the worker is killed, or None to wait forever
+        profile: Have the worker profile each generation stage
+        templates: Directory of template rigs the worker fits from, or None
+
+    Returns:
+        The worker's result record, or an error record if the worker died without one
+    """
+    with tempfile.TemporaryDirectory(prefix='poser_rig_') as temp_dir:
+        result_path = Path(temp_dir) / 'result.json'
+        command = [
+            blender, '-b', '--factory-startup', '--threads', str(threads),
+            '--python', str(CLI_SCRIPT), '--',
+            'rig-worker', '--fbx', str(fbx_path), '--output', str(output_path), '--result', str(result_path),
+        ]
+        if profile:
+            command.append('--profile')
+        if templates is not None:
+            command += ['--templates', str(templates)]
+
+        start = time.perf_counter()
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            returncode, stderr = process.returncode, process.stderr
+        except subprocess.TimeoutExpired as e:
+            # the output captured before a timeout is bytes even with text=True
+            partial = e.stderr.decode(errors='replace') if isinstance(e.stderr, bytes) else e.stderr or ''
+            returncode, stderr = None, f"Worker timed out after {timeout}s\n{partial}"
+        wall_time = time.perf_counter() - start
+
+        record = None
+        if result_path.exists():
+            try:
+                record = json.loads(result_path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                record = None
+        if record is None:
+            stderr_tail = '\n'.join(str(stderr).splitlines()[-STDERR_TAIL_LINES:])
+            record = {
+                'fbx': str(fbx_path),
+                'output': str(output_path),
+                'status': 'error',
+                'error': f"Worker exited with code {returncode} without a readable result",
+                'stderr': stderr_tail,
+                'timings': {},
+            }
+
+    record['timings']['wall'] = wall_time
+    record['returncode'] = returncode
+    return record
+
+
+def run_job(
+    blender: str,
+    fbx_path: Path,
+    output_path: Path,
+    threads: int,
+    timeout: float | None,
+    cache: RigCache | None = None,
+    options: dict = None,
+    profile: bool = False,
+    templates: Path | None = None,
+) -> dict:
+    """
+    Rig one figure, reusing a cached result when the cache already holds it.
+
+    Args:
+        blender: Path to the Blender executable
+        fbx_path: FBX file to rig
+        output_path: Destination ``.blend`` file
+        threads: Number of threads the worker Blender may use
+        timeout: Seconds before the worker is killed, or None to wait forever
+        cache: Cache of rigged files, or None to always rig
+        options: Generation options that are part of the cache key
+        profile: Profile each generation stage; cache hits are not profiled
+        templates: Directory of template rigs to fit figures from, or None
+
+    Returns:
+        Result record; ``cache`` is ``'hit'`` or ``'miss'`` when a cache is used
+    """
+    if cache is None:
+        return run_worker(blender, fbx_path, output_path, threads, timeout, profile, templates)
+
+    start = time.perf_counter()
+    try:
+        key = cache_key(fbx_path, options or {})
+    except OSError:
+        return run_worker(blender, fbx_path, output_path, threads, timeout, profile, templates)
+
+    cached_record = cache.fetch(key, output_path)
+    if cached_record is not None:
+        cached_record.update({
+            'fbx': str(fbx_path),
+            'output': str(output_path),
+            'cache': 'hit',
+            'timings': {'wall': time.perf_counter() - start},
+        })
+        return cached_record
+
+    record = run_worker(blender, fbx_path, output_path, threads, timeout, profile, templates)
+    record['cache'] = 'miss'
+    if record['status'] == 'ok':
+        cache.store(key, output_path, {name: value for name, value in record.items() if name != 'profile'})
+    return record
+
+
+def run_batch(
+    jobs: list[tuple[Path, Path]],
+    log_path: Path,
+    blender: str,
+    workers: int,
+    threads: int = 1,
+    timeout: float | None = None,
+    cache: RigCache | None = None,
+    options: dict = None,
+    profile: bool = False,
+    templates: Path | None = None,
+) -> dict:
+    """
+    Rig a list of figures in parallel, appending each result to a JSON-lines log.
+
+    Args:
+        jobs: ``(fbx_path, output_path)`` pairs
+        log_path: JSON-lines file that result records are appended to
+        blender: Path to the Blender executable used for workers
+        workers: Number of worker processes to run at once
+        threads: Number of threads per worker Blender
+        timeout: Per-figure timeout in seconds, or None
+        cache: Cache of rigged files, or None to always rig
+        options: Generation options that are part of the cache key
+        profile: Add a per-stage profile to each record of a rigged figure
+        templates: Directory of template rigs to fit figures from, or None
+
+    Returns:
+        Batch summary with counts, wall time and cache statistics
+    """
+    start = time.perf_counter()
+    summary = {'total': len(jobs), 'ok': 0, 'failed': 0}
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with log_path.open('a', encoding='utf-8') as log, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                run_job, blender, fbx_path, output_path, threads, timeout, cache, options, profile, templates
+            )
+            for fbx_path, output_path in jobs
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            summary['ok' if record['status'] == 'ok' else 'failed'] += 1
+            log.write(json.dumps(record) + '\n')
+            log.flush()
+            print(f"[{summary['ok'] + summary['failed']}/{summary['total']}] {record['status']}: {record['fbx']}")
+
+    summary['wall_time'] = time.perf_counter() - start
+    if cache is not None:
+        summary['cache'] = cache.stats()
+    return summary
+
+
+def main(argv: list[str]) -> int:
+    """
+    Rig a directory or manifest of FBX files (``batch`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code, non-zero if any figure failed
+    """
+    parser = argparse.ArgumentParser(prog='batch', description="Rig Poser FBX exports with parallel Blender workers.")
+    parser.add_argument('input', type=Path, help="Directory of FBX files, or manifest with one FBX path per line")
+    parser.add_argument('-o', '--output', type=Path, required=True, help="Directory for rigged .blend files")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--threads', type=int, default=1, help="Threads per worker Blender")
+    parser.add_argument('--timeout', type=float, default=None, help="Per-figure timeout in seconds")
+    parser.add_argument('--log', type=Path, default=None, help="JSON-lines result log (default: OUTPUT/results.jsonl)")
+    parser.add_argument('--blender', default=bpy.app.binary_path, help="Blender executable for workers")
+    parser.add_argument('--cache', type=Path, default=None, help="Directory of cached rigs to reuse")
+    parser.add_argument('--cache-size', type=float, default=10.0, help="Cache size limit in GiB")
+    parser.add_argument('--cache-link', action='store_true', help="Hard-link cached rigs instead of copying")
+    parser.add_argument('--profile', action='store_true', help="Record a per-stage profile in each result")
+    parser.add_argument(
+        '--templates', type=Path, default=None, help="Directory of template rigs to fit same-skeleton figures from"
+    )
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache is not None:
+        cache = RigCache(args.cache, int(args.cache_size * 1024 ** 3), args.cache_link)
+
+    jobs = [
+        (fbx_path, args.output / relative.with_suffix('.blend'))
+        for fbx_path, relative in collect_fbx_files(args.input)
+    ]
+    log_path = args.log or args.output / 'results.jsonl'
+    summary = run_batch(
+        jobs, log_path, args.blender, max(1, args.workers), args.threads, args.timeout, cache,
+        options={'templates': args.templates is not None}, profile=args.profile, templates=args.templates,
+    )
+
+    print(
+        f"Rigged {summary['ok']}/{summary['total']} figures "
+        f"({summary['failed']} failed) in {summary['wall_time']:.1f}s, log: {log_path}",
+        file=sys.stderr if summary['failed'] else sys.stdout,
+    )
+    if cache is not None:
+        stats = summary['cache']
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+    return 1 if summary['failed'] else 0
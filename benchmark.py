@@ -0,0 +1,676 @@
+"""Generation benchmarks on synthetic Millennium 3 style figures.
+
+Each scenario procedurally builds an armature with the bone names and layout of a
+Poser Millennium 3 FBX import (optionally padded with extra face-style bones) and a
+skinned mesh with a configurable number of vertices, then times
+:func:`setup_poser_figure` end to end and per stage and source module. Results can be
+written as a baseline JSON file and later runs compared against it with a tolerance.
+
+The playback benchmark rigs one or more figures, animates a range of motion and times
+the dependency graph evaluation of every frame, split into constraints, drivers and
+armature deformation.
+
+Usage::
+
+    blender -b --factory-startup --python cli.py -- bench [--suite quick|bones|vertices|full]
+        [--write-baseline FILE | --baseline FILE [--tolerance 0.15]]
+    blender -b --factory-startup --python cli.py -- bench-playback [--figures 1 5 20]
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+from bpy.types import Object
+
+from . import generate_base_rig
+from .batch import reset_data
+from .cache import get_addon_version
+from .constants import PROP_ARMS_FKIK, PROP_LEGS_FKIK
+from .profiler import UNSTAGED, pipeline_sessions, pipeline_stages, profile_setup_poser_figure
+
+BENCHMARK_FIGURE_NAME = 'M3_Benchmark'
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.15
+# timings that changed by less than this many seconds are never reported as regressions
+DEFAULT_MIN_DELTA = 0.005
+MESH_SEGMENTS = 8
+MESH_RADIUS = 0.03
+FINGER_SEGMENT_LENGTHS = (0.03, 0.025, 0.02)
+# Y offset of each finger's root (the thumb is listed with the hand), from the front of the hand to the back
+FINGER_Y_OFFSETS = {'Index': -0.02, 'Mid': 0.0, 'Ring': 0.015, 'Pinky': 0.03}
+PLAYBACK_FIGURE_COUNTS = (1, 5, 20)
+PLAYBACK_FRAMES = 120
+PLAYBACK_VERTICES = 50_000
+FIGURE_SPACING = 1.0
+MOTION_KEY_INTERVAL = 6
+MOTION_ANGLE = math.radians(30)
+MOTION_DISTANCE = 0.1
+MOTION_FK_BONES = ('FK-Shoulder', 'FK-Forearm', 'FK-Thigh', 'FK-Shin')
+MOTION_IK_BONES = ('CTRL-IK-Hand.L', 'CTRL-IK-Hand.R', 'CTRL-IK-Foot.L', 'CTRL-IK-Foot.R', 'CTRL-Torso', 'CTRL-Chest')
+# playback passes as (name, drivers, constraints, deform); each switches off one more component
+PLAYBACK_PASSES = (
+    ('full', True, True, True),
+    ('no_drivers', False, True, True),
+    ('no_constraints', False, False, True),
+    ('no_deform', False, False, False),
+)
+PLAYBACK_DRIVER_NOTE = (
+    "with drivers off, driven constraint mute and influence values are frozen, "
+    "so the drivers share does not include FK/IK switching"
+)
+
+# Bones of a Millennium 3 figure: name -> (parent, head, tail), left side on +X, facing -Y
+M3_CENTER_BONES = {
+    'Body': (None, (0.0, 0.0, 0.0), (0.0, 0.0, 0.1)),
+    'Hip': ('Body', (0.0, 0.0, 0.95), (0.0, 0.0, 1.0)),
+    'Abdomen': ('Hip', (0.0, 0.0, 1.08), (0.0, 0.0, 1.2)),
+    'Chest': ('Abdomen', (0.0, 0.0, 1.2), (0.0, 0.0, 1.45)),
+    'Neck': ('Chest', (0.0, 0.0, 1.47), (0.0, 0.0, 1.57)),
+    'Head': ('Neck', (0.0, 0.0, 1.57), (0.0, 0.0, 1.75)),
+}
+M3_LEFT_BONES = {
+    'Eye': ('Head', (0.03, -0.08, 1.67), (0.03, -0.1, 1.67)),
+    'Collar': ('Chest', (0.02, -0.02, 1.42), (0.17, 0.0, 1.43)),
+    'Shoulder': ('Collar', (0.17, 0.0, 1.43), (0.45, 0.01, 1.42)),
+    'Forearm': ('Shoulder', (0.45, 0.01, 1.42), (0.7, 0.0, 1.42)),
+    'Hand': ('Forearm', (0.7, 0.0, 1.42), (0.78, 0.0, 1.42)),
+    'Thumb_1': ('Hand', (0.71, -0.02, 1.41), (0.74, -0.04, 1.4)),
+    'Thumb_2': ('Thumb_1', (0.74, -0.04, 1.4), (0.765, -0.05, 1.395)),
+    'Thumb_3': ('Thumb_2', (0.765, -0.05, 1.395), (0.79, -0.055, 1.39)),
+    'Buttock': ('Hip', (0.0, 0.0, 0.97), (0.09, 0.0, 0.93)),
+    'Thigh': ('Buttock', (0.09, 0.0, 0.93), (0.1, -0.01, 0.5)),
+    'Shin': ('Thigh', (0.1, -0.01, 0.5), (0.1, 0.02, 0.08)),
+    'Foot': ('Shin', (0.1, 0.02, 0.08), (0.1, -0.08, 0.02)),
+    'Toe': ('Foot', (0.1, -0.08, 0.02), (0.1, -0.14, 0.01)),
+}
+
+# Scenarios as (name, total bones or None for a plain M3 figure, mesh vertices)
+BONE_SCALING = [(f'bones-{count}', count, 10_000) for count in (80, 250, 500, 1000, 2000)]
+VERTEX_SCALING = [(f'vertices-{count // 1000}k', None, count) for count in (10_000, 50_000, 100_000, 250_000, 500_000)]
+SUITES = {
+    'quick': [('m3', None, 10_000)],
+    'bones': BONE_SCALING,
+    'vertices': VERTEX_SCALING,
+    'full': [('m3', None, 10_000), *BONE_SCALING, *VERTEX_SCALING],
+}
+
+
+def m3_skeleton(extra_bones: int = 0) -> dict[str, tuple[str | None, tuple, tuple]]:
+    """
+    Describe the skeleton of a synthetic Millennium 3 figure.
+
+    Bone names follow the Poser FBX export (``Left_``/``Right_`` prefixes), so the
+    figure passes ``preflight.validate_armature`` and every bone ``fix_bones`` and the chain
+    builders look up exists.
+
+    Args:
+        extra_bones: Additional face-style bones added under the head, in left/right pairs
+            (plus one center bone for an odd count)
+
+    Returns:
+        Ordered mapping of bone name to ``(parent name, head, tail)``, parents first
+    """
+    left_bones = dict(M3_LEFT_BONES)
+    for finger, y in FINGER_Y_OFFSETS.items():
+        x = left_bones['Hand'][2][0]
+        for segment, length in enumerate(FINGER_SEGMENT_LENGTHS, start=1):
+            parent = 'Hand' if segment == 1 else f'{finger}_{segment - 1}'
+            left_bones[f'{finger}_{segment}'] = (parent, (x, y, 1.42), (x + length, y, 1.415))
+            x += length
+
+    def sided(name: str | None, side: str) -> str | None:
+        if name is None or name in M3_CENTER_BONES:
+            return name
+        return f'{side}_{name}'
+
+    skeleton = dict(M3_CENTER_BONES)
+    for side, sign in (('Left', 1.0), ('Right', -1.0)):
+        for name, (parent, head, tail) in left_bones.items():
+            skeleton[f'{side}_{name}'] = (
+                sided(parent, side),
+                (head[0] * sign, head[1], head[2]),
+                (tail[0] * sign, tail[1], tail[2]),
+            )
+
+    # extra bones spread over the front of the face in short chains, like a facial rig
+    pairs, center = divmod(extra_bones, 2)
+    for index in range(pairs):
+        angle = math.pi * (index % 16) / 16
+        height = 1.6 + 0.12 * (index // 16 % 10) / 10
+        x = 0.01 + 0.06 * math.sin(angle / 2)
+        y = -0.09 * math.cos(angle / 4)
+        parent = 'Head' if index % 4 == 0 else f'Face_{index - 1}'
+        for side, sign in (('Left', 1.0), ('Right', -1.0)):
+            skeleton[f'{side}_Face_{index}'] = (
+                'Head' if parent == 'Head' else f'{side}_{parent}',
+                (x * sign, y, height),
+                (x * sign, y - 0.01, height + 0.005),
+            )
+    if center:
+        skeleton['Face_Center'] = ('Head', (0.0, -0.1, 1.62), (0.0, -0.11, 1.62))
+
+    return skeleton
+
+
+def build_synthetic_figure(
+    extra_bones: int = 0,
+    vertex_count: int = 10_000,
+    name: str = BENCHMARK_FIGURE_NAME,
+) -> Object:
+    """
+    Build a synthetic Millennium 3 armature with a skinned mesh in the current scene.
+
+    Args:
+        extra_bones: Additional bones beyond the Millennium 3 skeleton
+        vertex_count: Approximate number of mesh vertices, or 0 for no mesh
+        name: Name of the armature object
+
+    Returns:
+        The armature object, active and the only selected object
+    """
+    if bpy.context.object is not None and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    armature_data = bpy.data.armatures.new(name)
+    armature = bpy.data.objects.new(name, armature_data)
+    bpy.context.scene.collection.objects.link(armature)
+    for obj in bpy.context.selected_objects:
+        obj.select_set(False)
+    bpy.context.view_layer.objects.active = armature
+    armature.select_set(True)
+
+    skeleton = m3_skeleton(extra_bones)
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature_data.edit_bones
+    for bone_name, (parent_name, head, tail) in skeleton.items():
+        bone = edit_bones.new(bone_name)
+        bone.head = head
+        bone.tail = tail
+        if parent_name is not None:
+            bone.parent = edit_bones[parent_name]
+            bone.use_connect = tuple(edit_bones[parent_name].tail) == tuple(bone.head)
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    if vertex_count > 0:
+        mesh_object = build_skinned_mesh(skeleton, vertex_count, f'{name}_Body')
+        mesh_object.parent = armature
+        modifier = mesh_object.modifiers.new('Armature', 'ARMATURE')
+        modifier.object = armature
+
+    return armature
+
+
+def build_skinned_mesh(skeleton: dict, vertex_count: int, name: str) -> Object:
+    """
+    Build a mesh of one quad tube per bone, fully weighted to that bone.
+
+    Vertices are spread over the bones in proportion to their length.
+
+    Args:
+        skeleton: Skeleton description from m3_skeleton()
+        vertex_count: Approximate total number of vertices
+        name: Name of the mesh object
+
+    Returns:
+        The mesh object, linked to the scene
+    """
+    names = [bone_name for bone_name in skeleton if bone_name != 'Body']
+    heads = np.array([skeleton[bone_name][1] for bone_name in names], dtype=np.float32)
+    tails = np.array([skeleton[bone_name][2] for bone_name in names], dtype=np.float32)
+    axes = tails - heads
+    lengths = np.linalg.norm(axes, axis=1)
+
+    # at least two rings per bone so every tube has faces
+    rings = np.maximum(2, np.round(lengths / lengths.sum() * vertex_count / MESH_SEGMENTS).astype(np.int64))
+    angles = np.linspace(0, 2 * math.pi, MESH_SEGMENTS, endpoint=False)
+
+    coordinates = []
+    quads = []
+    offset = 0
+    for index, ring_count in enumerate(rings):
+        axis = axes[index] / lengths[index]
+        reference = np.array((0.0, 0.0, 1.0)) if abs(axis[2]) < 0.9 else np.array((1.0, 0.0, 0.0))
+        u = np.cross(axis, reference)
+        u /= np.linalg.norm(u)
+        v = np.cross(axis, u)
+
+        t = np.linspace(0.0, 1.0, ring_count)[:, None, None]
+        circle = MESH_RADIUS * (np.cos(angles)[:, None] * u + np.sin(angles)[:, None] * v)
+        coordinates.append((heads[index] + t * axes[index] + circle[None]).reshape(-1, 3))
+
+        ring_index = np.arange(ring_count - 1)[:, None] * MESH_SEGMENTS
+        segment = np.arange(MESH_SEGMENTS)[None, :]
+        next_segment = (segment + 1) % MESH_SEGMENTS
+        quads.append(offset + np.stack([
+            ring_index + segment,
+            ring_index + next_segment,
+            ring_index + MESH_SEGMENTS + next_segment,
+            ring_index + MESH_SEGMENTS + segment,
+        ], axis=-1).reshape(-1, 4))
+        offset += ring_count * MESH_SEGMENTS
+
+    coordinates = np.concatenate(coordinates).astype(np.float32)
+    quads = np.concatenate(quads).astype(np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(coordinates))
+    mesh.vertices.foreach_set('co', coordinates.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set('vertex_index', quads.ravel())
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set('loop_start', np.arange(0, quads.size, 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    mesh_object = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(mesh_object)
+
+    start = 0
+    for bone_name, ring_count in zip(names, rings, strict=True):
+        count = int(ring_count) * MESH_SEGMENTS
+        mesh_object.vertex_groups.new(name=bone_name).add(list(range(start, start + count)), 1.0, 'REPLACE')
+        start += count
+
+    return mesh_object
+
+
+def stage_modules() -> dict[str, str]:
+    """
+    Map each pipeline stage to the add-on module that implements it.
+
+    Returns:
+        Dictionary of stage name to module name without the package prefix
+    """
+    return {
+        name: getattr(generate_base_rig, name).__module__.rpartition('.')[2]
+        for name in [*pipeline_stages(), *pipeline_sessions()]
+    }
+
+
+def run_scenario(name: str, total_bones: int | None, vertex_count: int, repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Build and rig a synthetic figure several times and summarize the timings.
+
+    Args:
+        name: Scenario name
+        total_bones: Bone count of the synthetic armature, or None for a plain Millennium 3 figure
+        vertex_count: Approximate number of mesh vertices
+        repeat: Number of timed runs; medians are reported
+
+    Returns:
+        Scenario result with median total, per-stage and per-module seconds
+    """
+    base_bones = len(m3_skeleton())
+    extra_bones = max(0, total_bones - base_bones) if total_bones is not None else 0
+    modules = stage_modules()
+
+    runs = []
+    for _ in range(repeat):
+        reset_data()
+        armature = build_synthetic_figure(extra_bones, vertex_count)
+        vertices = sum(len(child.data.vertices) for child in armature.children if child.type == 'MESH')
+        runs.append(profile_setup_poser_figure(armature))
+
+    stage_seconds = {}
+    module_seconds = {}
+    for run in runs:
+        per_module = {}
+        for stage in run['stages']:
+            stage_seconds.setdefault(stage['name'], []).append(stage['seconds'])
+            module = modules.get(stage['name'], UNSTAGED)
+            per_module[module] = per_module.get(module, 0.0) + stage['seconds']
+        for module, seconds in per_module.items():
+            module_seconds.setdefault(module, []).append(seconds)
+
+    return {
+        'name': name,
+        'source_bones': base_bones + extra_bones,
+        'vertices': vertices,
+        'rig_bones': runs[-1]['bones'],
+        'runs': repeat,
+        'ops': runs[-1]['ops'],
+        'mode_toggles': runs[-1]['mode_toggles'],
+        'total': statistics.median(run['total_seconds'] for run in runs),
+        'total_min': min(run['total_seconds'] for run in runs),
+        'stages': {stage: statistics.median(seconds) for stage, seconds in stage_seconds.items()},
+        'modules': {module: statistics.median(seconds) for module, seconds in module_seconds.items()},
+    }
+
+
+def compare_to_baseline(
+    results: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_delta: float = DEFAULT_MIN_DELTA,
+) -> list[str]:
+    """
+    Find timings that regressed against a baseline.
+
+    A timing regresses when it is more than ``tolerance`` slower than the baseline and
+    the difference is also above ``min_delta`` seconds, so tiny stages don't flag noise.
+
+    Args:
+        results: Benchmark results from run_benchmarks()
+        baseline: Earlier results to compare against
+        tolerance: Allowed relative slowdown, e.g. 0.15 for 15%
+        min_delta: Allowed absolute slowdown in seconds
+
+    Returns:
+        Human-readable description of every regression; empty if there are none
+    """
+    regressions = []
+    for name, scenario in results['scenarios'].items():
+        reference = baseline['scenarios'].get(name)
+        if reference is None:
+            continue
+
+        timings = [('total', scenario['total'], reference['total'])]
+        timings += [
+            (f'module {module}', seconds, reference['modules'][module])
+            for module, seconds in scenario['modules'].items()
+            if module in reference['modules']
+        ]
+        for label, current, previous in timings:
+            if current > previous * (1 + tolerance) and current - previous > min_delta:
+                regressions.append(
+                    f"{name}: {label} {previous * 1000:.1f} ms -> {current * 1000:.1f} ms "
+                    f"(+{(current / previous - 1) * 100 if previous else math.inf:.0f}%)"
+                )
+    return regressions
+
+
+def run_benchmarks(scenarios: list[tuple[str, int | None, int]], repeat: int = DEFAULT_REPEAT) -> dict:
+    """
+    Run a list of scenarios.
+
+    Args:
+        scenarios: ``(name, total bones or None, vertices)`` tuples
+        repeat: Number of timed runs per scenario
+
+    Returns:
+        Results with the Blender and add-on versions and one entry per scenario
+    """
+    results = {'blender': bpy.app.version_string, 'addon': get_addon_version(), 'scenarios': {}}
+    for name, total_bones, vertex_count in scenarios:
+        scenario = run_scenario(name, total_bones, vertex_count, repeat)
+        results['scenarios'][name] = scenario
+        print(
+            f"{name:<16}{scenario['source_bones']:>6} bones{scenario['vertices']:>8} verts"
+            f"{scenario['total'] * 1000:>10.1f} ms  ({scenario['ops']} ops, {scenario['mode_toggles']} mode toggles)"
+        )
+        for module, seconds in sorted(scenario['modules'].items(), key=lambda item: item[1], reverse=True):
+            print(f"    {module:<28}{seconds * 1000:>10.1f} ms")
+
+    reset_data()
+    return results
+
+
+def main(argv: list[str]) -> int:
+    """
+    Run the generation benchmarks (``bench`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code, non-zero if a timing regressed against the baseline
+    """
+    parser = argparse.ArgumentParser(prog='bench', description="Benchmark rig generation on synthetic figures.")
+    parser.add_argument('--suite', choices=SUITES, default='quick', help="Scenarios to run")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per scenario")
+    parser.add_argument('--output', type=Path, default=None, help="Write the results to this JSON file")
+    parser.add_argument('--write-baseline', type=Path, default=None, help="Write the results as a new baseline")
+    parser.add_argument('--baseline', type=Path, default=None, help="Baseline JSON file to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown")
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA, help="Allowed slowdown in seconds")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(SUITES[args.suite], max(1, args.repeat))
+    for path in (args.output, args.write_baseline):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    if args.baseline is None:
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+    if baseline.get('blender') != results['blender']:
+        print(f"Warning: baseline was recorded with Blender {baseline.get('blender')}", file=sys.stderr)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+def rig_playback_figures(count: int, vertex_count: int = PLAYBACK_VERTICES) -> list[Object]:
+    """
+    Build, rig and animate synthetic figures side by side in an empty scene.
+
+    Args:
+        count: Number of figures
+        vertex_count: Approximate number of mesh vertices per figure
+
+    Returns:
+        The rigged armature objects
+    """
+    reset_data()
+    armatures = []
+    for index in range(count):
+        armature = build_synthetic_figure(vertex_count=vertex_count, name=f'{BENCHMARK_FIGURE_NAME}_{index}')
+        generate_base_rig.setup_poser_figure(armature)
+        armature.location.x = index * FIGURE_SPACING
+        animate_range_of_motion(armature, phase=index)
+        armatures.append(armature)
+    return armatures
+
+
+def animate_range_of_motion(armature: Object, frames: int = PLAYBACK_FRAMES, phase: int = 0) -> None:
+    """
+    Keyframe a looping range of motion on a generated rig's controls.
+
+    Swings the FK limbs, moves the IK hand and foot controls and the torso, and blends
+    the limbs from FK to IK and back, so constraints and switch drivers are exercised.
+
+    Args:
+        armature: Rigged armature object
+        frames: Length of the motion in frames, starting at frame 1
+        phase: Offset in keyframes so several figures don't move in lockstep
+    """
+    pose_bones = armature.pose.bones
+    properties_bone = pose_bones['PROPERTIES']
+    for frame in range(1, frames + 1, MOTION_KEY_INTERVAL):
+        wave = math.sin(2 * math.pi * ((frame - 1) / frames + phase * 0.1))
+        for bone_name in MOTION_FK_BONES:
+            for side in ('.L', '.R'):
+                bone = pose_bones[f'{bone_name}{side}']
+                bone.rotation_euler = (wave * MOTION_ANGLE, 0.0, wave * MOTION_ANGLE / 2)
+                bone.keyframe_insert('rotation_euler', frame=frame)
+        for bone_name in MOTION_IK_BONES:
+            bone = pose_bones[bone_name]
+            bone.location = (0.0, wave * MOTION_DISTANCE, abs(wave) * MOTION_DISTANCE)
+            bone.keyframe_insert('location', frame=frame)
+
+        fkik = 0.5 + 0.5 * wave
+        for prop_name in (PROP_ARMS_FKIK, PROP_LEGS_FKIK):
+            properties_bone[prop_name][0] = properties_bone[prop_name][1] = fkik
+            properties_bone.keyframe_insert(f'["{prop_name}"]', frame=frame)
+
+
+def time_playback(frames: range) -> list[float]:
+    """
+    Step through frames and time the dependency graph evaluation of each.
+
+    Args:
+        frames: Frames to evaluate, in order
+
+    Returns:
+        Seconds per frame
+    """
+    scene = bpy.context.scene
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        scene.frame_set(frame)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def rig_component_state(armatures: list[Object]) -> dict:
+    """
+    Record the driver, constraint and armature modifier switches of generated rigs.
+
+    Args:
+        armatures: Rigged armature objects
+
+    Returns:
+        Mapping of component to ``(item, original switch value)`` pairs, for set_rig_components()
+    """
+    return {
+        'drivers': [(fcurve, fcurve.mute) for armature in armatures for fcurve in armature.animation_data.drivers],
+        'constraints': [
+            (constraint, constraint.mute)
+            for armature in armatures for bone in armature.pose.bones for constraint in bone.constraints
+        ],
+        'deform': [
+            (modifier, modifier.show_viewport)
+            for armature in armatures for child in armature.children for modifier in child.modifiers
+            if modifier.type == 'ARMATURE'
+        ],
+    }
+
+
+def set_rig_components(state: dict, drivers: bool, constraints: bool, deform: bool) -> None:
+    """
+    Switch off evaluated parts of generated rigs, or restore them as recorded.
+
+    Constraint mute flags are recorded rather than cleared on restore: the FK/IK switch
+    drivers control them, and a constraint muted by the generator stays muted.
+
+    Args:
+        state: Original switches, from rig_component_state()
+        drivers: Whether the rigs' drivers are evaluated
+        constraints: Whether the rigs' bone constraints are evaluated
+        deform: Whether the armature modifiers of the rigs' meshes are evaluated
+    """
+    for fcurve, mute in state['drivers']:
+        fcurve.mute = mute or not drivers
+    for constraint, mute in state['constraints']:
+        constraint.mute = mute or not constraints
+    for modifier, shown in state['deform']:
+        modifier.show_viewport = shown and deform
+
+
+def frame_statistics(timings: list[float]) -> dict:
+    """
+    Summarize per-frame evaluation times.
+
+    Args:
+        timings: Seconds per frame
+
+    Returns:
+        Dictionary with mean, median, 95th percentile and max seconds and the mean frame rate
+    """
+    ordered = sorted(timings)
+    mean = statistics.fmean(ordered)
+    return {
+        'mean': mean,
+        'median': statistics.median(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1],
+        'fps': 1 / mean if mean else math.inf,
+    }
+
+
+def run_playback(figure_count: int, vertex_count: int = PLAYBACK_VERTICES, frames: int = PLAYBACK_FRAMES) -> dict:
+    """
+    Measure playback evaluation cost of a scene with several rigged figures.
+
+    The frame range is played once to warm up, then once with everything enabled and
+    once more after each of drivers, constraints and armature deformation is switched
+    off in turn. The differences between those passes split the frame time into the
+    cost of each component; what remains is animation and base pose evaluation.
+    With drivers off, the constraint mute and influence values they drive stay as they
+    were on the last frame, so the driver share leaves out FK/IK switching.
+
+    Args:
+        figure_count: Number of rigged figures in the scene
+        vertex_count: Approximate number of mesh vertices per figure
+        frames: Number of frames to play
+
+    Returns:
+        Frame time statistics for the full rig and the per-component split of the mean frame time
+    """
+    armatures = rig_playback_figures(figure_count, vertex_count)
+    frame_range = range(1, frames + 1)
+    time_playback(frame_range)
+
+    state = rig_component_state(armatures)
+    passes = {}
+    for name, drivers, constraints, deform in PLAYBACK_PASSES:
+        set_rig_components(state, drivers, constraints, deform)
+        passes[name] = frame_statistics(time_playback(frame_range))
+    set_rig_components(state, drivers=True, constraints=True, deform=True)
+
+    means = {name: stats['mean'] for name, stats in passes.items()}
+    return {
+        'figures': figure_count,
+        'vertices': vertex_count,
+        'frames': frames,
+        'frame': passes['full'],
+        'split': {
+            'drivers': max(0.0, means['full'] - means['no_drivers']),
+            'constraints': max(0.0, means['no_drivers'] - means['no_constraints']),
+            'deform': max(0.0, means['no_constraints'] - means['no_deform']),
+            'base': means['no_deform'],
+        },
+        'passes': passes,
+        'note': PLAYBACK_DRIVER_NOTE,
+    }
+
+
+def playback_main(argv: list[str]) -> int:
+    """
+    Run the playback evaluation benchmark (``bench-playback`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog='bench-playback', description="Benchmark playback of generated rigs.")
+    parser.add_argument('--figures', type=int, nargs='+', default=list(PLAYBACK_FIGURE_COUNTS),
+                        help="Numbers of rigged figures per scene")
+    parser.add_argument('--vertices', type=int, default=PLAYBACK_VERTICES, help="Mesh vertices per figure")
+    parser.add_argument('--frames', type=int, default=PLAYBACK_FRAMES, help="Frames to play")
+    parser.add_argument('--output', type=Path, default=None, help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {'blender': bpy.app.version_string, 'addon': get_addon_version(), 'scenes': []}
+    for figure_count in args.figures:
+        scene = run_playback(figure_count, args.vertices, args.frames)
+        results['scenes'].append(scene)
+        frame, split = scene['frame'], scene['split']
+        print(
+            f"{figure_count:>3} figures: {frame['mean'] * 1000:.2f} ms/frame ({frame['fps']:.1f} fps), "
+            f"p95 {frame['p95'] * 1000:.2f} ms | constraints {split['constraints'] * 1000:.2f} ms, "
+            f"drivers {split['drivers'] * 1000:.2f} ms, deform {split['deform'] * 1000:.2f} ms, "
+            f"other {split['base'] * 1000:.2f} ms"
+        )
+    print(f"Note: {PLAYBACK_DRIVER_NOTE}")
+
+    reset_data()
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    return 0
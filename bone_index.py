@@ -0,0 +1,160 @@
+"""Index of bone names by role prefix, base name, chain segment and side.
+
+Rig bone names follow the add-on's naming convention: stacked role prefixes such as
+``DEF-``, ``FK-``, ``IK-``, ``MCH-`` and ``CTRL-`` (``CTRL-IK-Pole-Hip``), a base name,
+an optional ``_<n>`` chain segment and an optional ``.L``/``.R`` side. ``BoneIndex``
+parses every name once, so generation stages can look bones up by role instead of
+scanning the whole armature with substring checks.
+"""
+
+from collections.abc import Iterable
+
+from .constants import PREFIX_CTRL, PREFIX_DEF, PREFIX_FK, PREFIX_IK, PREFIX_MCH, SUFFIX_LEFT, SUFFIX_RIGHT
+
+# Role tokens recognised at the start of a bone name, without their '-' separator
+ROLES = tuple(prefix.rstrip('-') for prefix in (PREFIX_DEF, PREFIX_FK, PREFIX_IK, PREFIX_MCH, PREFIX_CTRL))
+
+
+def parse_bone_name(name: str) -> dict:
+    """
+    Split a bone name into its parts.
+
+    Examples: ``'IK-Index_2.L'`` gives prefix ``'IK'``, base ``'Index'``, segment 2 and
+    side ``'.L'``; ``'CTRL-IK-Pole-Hip'`` gives prefix ``'CTRL-IK'`` and base ``'Pole-Hip'``.
+
+    Args:
+        name: Bone name
+
+    Returns:
+        Mapping with ``prefix`` (role tokens joined by ``-``, or ``''``), ``base``,
+        ``segment`` (int or None) and ``side`` (``'.L'``, ``'.R'`` or ``''``)
+    """
+    side = ''
+    for suffix in (SUFFIX_LEFT, SUFFIX_RIGHT):
+        if name.endswith(suffix):
+            side = suffix
+            name = name[:-len(suffix)]
+
+    tokens = name.split('-')
+    roles = []
+    while len(tokens) > 1 and tokens[0] in ROLES:
+        roles.append(tokens.pop(0))
+
+    base = '-'.join(tokens)
+    segment = None
+    stem, _, number = base.rpartition('_')
+    if stem and number.isdigit():
+        base, segment = stem, int(number)
+
+    return {'prefix': '-'.join(roles), 'base': base, 'segment': segment, 'side': side}
+
+
+class BoneIndex:
+    """Bone names parsed once and indexed for constant-time lookups by role."""
+
+    def __init__(self, names: Iterable[str] = ()):
+        """
+        Index a set of bone names.
+
+        Args:
+            names: Bone names, e.g. ``(bone.name for bone in armature.pose.bones)``
+        """
+        self._parts = {}
+        self._by_parts = {}
+        self._by_role = {}
+        self._by_side = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        """
+        Add a bone created after the index was built.
+
+        Args:
+            name: Bone name
+        """
+        if name in self._parts:
+            return
+
+        parts = parse_bone_name(name)
+        self._parts[name] = parts
+        self._by_parts[(parts['prefix'], parts['base'], parts['segment'], parts['side'])] = name
+        for role in set(parts['prefix'].split('-')) - {''}:
+            self._by_role.setdefault(role, []).append(name)
+        self._by_side.setdefault(parts['side'], []).append(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._parts
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    def parts(self, name: str) -> dict:
+        """
+        Return the parsed parts of an indexed bone name.
+
+        Args:
+            name: Indexed bone name
+
+        Returns:
+            Parts as returned by parse_bone_name()
+        """
+        return self._parts[name]
+
+    def get(self, prefix: str, base: str, segment: int = None, side: str = '') -> str | None:
+        """
+        Look up a bone by its parts.
+
+        Args:
+            prefix: Role prefix without trailing ``-``, e.g. ``'CTRL-IK'``
+            base: Base name, e.g. ``'Index'``
+            segment: Chain segment, or None for bones without one
+            side: ``'.L'``, ``'.R'`` or ``''``
+
+        Returns:
+            The bone name, or None if no such bone is indexed
+        """
+        return self._by_parts.get((prefix, base, segment, side))
+
+    def with_role(self, role: str) -> list[str]:
+        """
+        List the bones whose prefix contains a role token.
+
+        Args:
+            role: Role token, e.g. ``'DEF'`` or ``'MCH'``
+
+        Returns:
+            Bone names in the order they were indexed
+        """
+        return list(self._by_role.get(role, ()))
+
+    def on_side(self, side: str) -> list[str]:
+        """
+        List the bones on one side.
+
+        Args:
+            side: ``'.L'``, ``'.R'`` or ``''`` for centre-line bones
+
+        Returns:
+            Bone names in the order they were indexed
+        """
+        return list(self._by_side.get(side, ()))
+
+    def chain(self, prefix: str, base: str, side: str = '') -> list[str]:
+        """
+        List the segments of a chain, such as ``FK-Index_1.L`` to ``FK-Index_3.L``.
+
+        Args:
+            prefix: Role prefix without trailing ``-``
+            base: Base name shared by the chain's bones
+            side: ``'.L'``, ``'.R'`` or ``''``
+
+        Returns:
+            Bone names ordered by segment number
+        """
+        segments = []
+        segment = 1
+        while (name := self.get(prefix, base, segment, side)) is not None:
+            segments.append(name)
+            segment += 1
+        return segments
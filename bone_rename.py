@@ -0,0 +1,173 @@
+"""Renaming of Poser bones to the generator's names, planned up front and applied in bulk.
+
+Poser exports name sided bones ``Left_Hand``/``Right_Hand`` or ``lHand``/``rHand``; the
+generator uses Blender's suffix convention, ``DEF-Hand.L``. ``plan_bone_renames`` works
+out the whole old → new map from the bone names alone and reports the names it cannot
+rename cleanly: names that only look sided (``lowerJaw``, ``Upper_Left_Lip``) and
+renames that would clash with another bone. The map is then applied in one pass.
+"""
+
+import re
+from collections.abc import Iterable
+
+import bpy
+from bpy.types import Object
+
+from .constants import BONE_PROPERTIES, BONE_ROOT, SUFFIX_LEFT, SUFFIX_RIGHT
+
+# Side words and side letters at the start of Poser bone names
+SIDE_WORDS = {'Left_': SUFFIX_LEFT, 'Right_': SUFFIX_RIGHT}
+SIDE_LETTERS = {'l': SUFFIX_LEFT, 'r': SUFFIX_RIGHT}
+# Bones containing these are never renamed
+SKIPPED_NAMES = (BONE_ROOT, BONE_PROPERTIES)
+# Matches the bone name in a pose-bone data path
+POSE_BONE_PATH = re.compile(r'pose\.bones\["((?:[^"\\]|\\.)*)"\]')
+
+
+def rename_bone(name: str, prefix: str = '') -> str:
+    """
+    Rename a bone following Blender naming conventions.
+
+    Converts Poser naming (``Left_``/``Right_`` or ``l``/``r`` prefix) to Blender naming
+    (``.L``/``.R`` suffix). A single ``l`` or ``r`` only counts as a side when an upper
+    case letter or digit follows, so ``lHand`` is a left hand but ``lowerJaw`` is not.
+    Skips special bones like ``root`` and ``PROPERTIES``.
+
+    Args:
+        name: Original bone name
+        prefix: Optional prefix to add (e.g., ``'DEF-'``)
+
+    Returns:
+        New bone name with appropriate suffix, or empty string if bone should not be renamed
+    """
+    if any(skipped in name for skipped in SKIPPED_NAMES):
+        return ''
+
+    for word, suffix in SIDE_WORDS.items():
+        if name.startswith(word):
+            return prefix + name[len(word):] + suffix
+
+    if len(name) > 1 and name[0] in SIDE_LETTERS and (name[1].isupper() or name[1].isdigit()):
+        return prefix + name[1:] + SIDE_LETTERS[name[0]]
+
+    return prefix + name
+
+
+def _looks_sided(name: str) -> str | None:
+    """Explain why a name that rename_bone() leaves unsided looks like a sided name, if it does."""
+    for word in SIDE_WORDS:
+        if word in name and not name.startswith(word):
+            return f"'{word}' is not at the start of the name"
+    if len(name) > 1 and name[0] in SIDE_LETTERS and name[1].islower():
+        return f"starts with '{name[0]}' followed by a lower case letter, so it is not a side prefix"
+    return None
+
+
+def plan_bone_renames(names: Iterable[str], prefix: str = '') -> dict:
+    """
+    Work out every bone rename before any bone is renamed.
+
+    Renames that would give a bone the name of another bone, or of a bone renamed
+    before it, are dropped, since Blender would add a ``.001`` suffix instead.
+
+    Args:
+        names: Current bone names
+        prefix: Prefix added to every renamed bone (e.g., ``'DEF-'``)
+
+    Returns:
+        Mapping with ``renames`` (old → new name, only bones whose name changes) and
+        ``conflicts`` (one ``{'bone', 'name', 'reason'}`` entry per suspicious or dropped rename)
+    """
+    names = list(names)
+    renames = {}
+    conflicts = []
+    for name in names:
+        new_name = rename_bone(name, prefix)
+        if not new_name or new_name == name:
+            continue
+        reason = _looks_sided(name)
+        if reason is not None:
+            conflicts.append({'bone': name, 'name': new_name, 'reason': f"renamed without a side: {reason}"})
+        renames[name] = new_name
+
+    # bones that keep their name, and the new names handed out so far, cannot be reused
+    taken = {name: name for name in names if name not in renames}
+    for name, new_name in list(renames.items()):
+        if new_name in taken:
+            conflicts.append({'bone': name, 'name': new_name, 'reason': f"'{taken[new_name]}' already has that name"})
+            del renames[name]
+        else:
+            taken[new_name] = name
+
+    return {'renames': renames, 'conflicts': conflicts}
+
+
+def rename_all_bones(armature: Object, prefix: str = '') -> list[dict]:
+    """
+    Rename all bones in the armature with the given prefix.
+
+    The renames are planned first (see plan_bone_renames()) and every bone is then
+    renamed once. Blender updates vertex groups, constraints and animation paths
+    that use a bone when it is renamed in edit mode.
+
+    Args:
+        armature: Armature object in edit mode
+        prefix: String to prepend to bone names (e.g., 'DEF-')
+
+    Returns:
+        Rename conflicts, see plan_bone_renames()
+    """
+    edit_bones = armature.data.edit_bones
+    plan = plan_bone_renames(edit_bones.keys(), prefix)
+    renames = plan['renames']
+
+    bones = [(bone, renames[bone.name]) for bone in edit_bones if bone.name in renames]
+    if renames.keys() & set(renames.values()):
+        # a bone takes a name another bone only gives up later: free every name first
+        for index, (bone, _) in enumerate(bones):
+            bone.name = f'.rename{index}'
+    for bone, new_name in bones:
+        bone.name = new_name
+
+    return plan['conflicts']
+
+
+def rename_bone_users(armature: Object, names: dict[str, str]) -> None:
+    """
+    Rename vertex groups, bone parents and pose-bone animation paths that use renamed bones.
+
+    Blender does this by itself when bones are renamed in edit mode; replacing the
+    armature data does not. Each user is visited once, however many bones are renamed.
+
+    Args:
+        armature: Armature object
+        names: Mapping of old to new bone name
+    """
+    for obj in bpy.data.objects:
+        uses_armature = obj.parent == armature or any(
+            modifier.type == 'ARMATURE' and modifier.object == armature for modifier in obj.modifiers
+        )
+        if not uses_armature:
+            continue
+
+        for group in obj.vertex_groups:
+            if group.name in names:
+                group.name = names[group.name]
+        if obj.parent == armature and obj.parent_type == 'BONE' and obj.parent_bone in names:
+            obj.parent_bone = names[obj.parent_bone]
+
+    action = armature.animation_data.action if armature.animation_data else None
+    if action is None:
+        return
+
+    def rename_path(match: re.Match) -> str:
+        name = match.group(1)
+        return f'pose.bones["{names[name]}"]' if name in names else match.group(0)
+
+    for fcurve in action.fcurves:
+        data_path = POSE_BONE_PATH.sub(rename_path, fcurve.data_path)
+        if data_path != fcurve.data_path:
+            fcurve.data_path = data_path
+    for group in action.groups:
+        if group.name in names:
+            group.name = names[group.name]
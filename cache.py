@@ -0,0 +1,201 @@
+"""Content-addressed cache of rigged .blend files.
+
+Entries are keyed on the FBX file's content hash, the add-on and generator versions,
+the Blender version and the generation options, so re-running a batch only rigs figures whose
+input or rigging code actually changed. The cache is bounded in size and evicts the
+least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import tomllib
+from functools import cache
+from pathlib import Path
+
+import bpy
+
+ADDON_MANIFEST = Path(__file__).with_name('blender_manifest.toml')
+DEFAULT_CACHE_SIZE = 10 * 1024 ** 3
+HASH_CHUNK_SIZE = 1024 ** 2
+# Bump whenever a change to the generator changes the rigged output, so older entries miss
+GENERATOR_VERSION = 2
+
+
+@cache
+def get_addon_version() -> str:
+    """
+    Read the add-on version from the extension manifest.
+
+    Returns:
+        Version string, e.g. ``'1.0.0'``
+    """
+    with ADDON_MANIFEST.open('rb') as manifest:
+        return tomllib.load(manifest)['version']
+
+
+def file_digest(path: Path) -> str:
+    """
+    Hash a file's content.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with path.open('rb') as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(fbx_path: Path, options: dict) -> str:
+    """
+    Compute the cache key for rigging a figure.
+
+    Args:
+        fbx_path: FBX file to rig
+        options: Generation options that affect the rigged output
+
+    Returns:
+        Hex SHA-256 key
+    """
+    key_data = {
+        'fbx': file_digest(fbx_path),
+        'addon': get_addon_version(),
+        'generator': GENERATOR_VERSION,
+        'blender': bpy.app.version_string,
+        'options': options,
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class RigCache:
+    """Size-bounded store of rigged .blend files addressed by cache key."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_SIZE, link: bool = False):
+        """
+        Open a cache directory.
+
+        Args:
+            root: Cache directory, created if missing
+            max_bytes: Total size the cache is evicted down to after each store
+            link: Hard-link cached files into place instead of copying them
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry_paths(self, key: str) -> tuple[Path, Path]:
+        """Return the ``.blend`` and metadata paths for a key."""
+        entry_dir = self.root / key[:2]
+        return entry_dir / f'{key}.blend', entry_dir / f'{key}.json'
+
+    def fetch(self, key: str, output_path: Path) -> dict | None:
+        """
+        Place a cached rig at the output path.
+
+        Args:
+            key: Cache key from cache_key()
+            output_path: Where the rigged .blend should end up
+
+        Returns:
+            The result record stored with the entry on a hit, None on a miss
+        """
+        blend_path, meta_path = self._entry_paths(key)
+        try:
+            metadata = json.loads(meta_path.read_text(encoding='utf-8'))
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.unlink(missing_ok=True)
+            if self.link:
+                try:
+                    os.link(blend_path, output_path)
+                except OSError:
+                    shutil.copyfile(blend_path, output_path)
+            else:
+                shutil.copyfile(blend_path, output_path)
+            # the modification time doubles as the last-used time for eviction
+            os.utime(blend_path)
+            os.utime(meta_path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return metadata
+
+    def store(self, key: str, blend_path: Path, record: dict) -> None:
+        """
+        Add a freshly rigged .blend to the cache, then evict down to the size limit.
+
+        Args:
+            key: Cache key from cache_key()
+            blend_path: Rigged .blend file to store
+            record: Result record to return on later hits
+        """
+        entry_path, meta_path = self._entry_paths(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to temporary names first so a concurrent fetch never sees a partial entry
+        temp_path = entry_path.with_name(f'{key}.{os.getpid()}.{threading.get_ident()}.tmp')
+        shutil.copyfile(blend_path, temp_path)
+        temp_path.replace(entry_path)
+        temp_path.write_text(json.dumps(record), encoding='utf-8')
+        temp_path.replace(meta_path)
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits its size limit.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for blend_path in self.root.glob('*/*.blend'):
+                meta_path = blend_path.with_suffix('.json')
+                try:
+                    stat = blend_path.stat()
+                    size = stat.st_size + (meta_path.stat().st_size if meta_path.exists() else 0)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, size, blend_path, meta_path))
+                total += size
+
+            removed = 0
+            for _, size, blend_path, meta_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                meta_path.unlink(missing_ok=True)
+                blend_path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+            return removed
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            Dictionary with ``hits``, ``misses`` and ``hit_rate``
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,93 @@
+"""Command-line entry point for running the auto-rigger inside a headless Blender.
+
+Usage::
+
+    blender -b --factory-startup --python cli.py -- <command> [options]
+
+Run a command with ``--help`` to list its options.
+"""
+
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+
+PACKAGE_NAME = 'poser_autorigger'
+
+# command name -> (module, function); each function takes the remaining argument list and returns an exit code
+COMMANDS = {
+    'batch': ('batch', 'main'),
+    'rig-worker': ('batch', 'worker_main'),
+    'ingest': ('ingest', 'main'),
+    'ingest-worker': ('ingest', 'worker_main'),
+    'bench': ('benchmark', 'main'),
+    'bench-playback': ('benchmark', 'playback_main'),
+    'export-rig': ('rig_export', 'export_main'),
+    'load-rig': ('rig_export', 'load_main'),
+    'diff': ('rig_diff', 'main'),
+}
+
+
+def import_package():
+    """
+    Import the add-on package from the directory containing this script.
+
+    Blender runs ``--python`` scripts as ``__main__``, so the add-on's relative imports only
+    resolve once the package itself has been imported under its extension id.
+
+    Returns:
+        The imported add-on package module
+    """
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+
+    package_dir = Path(__file__).resolve().parent
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME,
+        package_dir / '__init__.py',
+        submodule_search_locations=[str(package_dir)],
+    )
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    spec.loader.exec_module(package)
+    return package
+
+
+def script_args(argv: list[str]) -> list[str]:
+    """
+    Return the arguments meant for this script.
+
+    Args:
+        argv: Full Blender command line
+
+    Returns:
+        Everything after Blender's ``--`` separator
+    """
+    if '--' not in argv:
+        return []
+    return argv[argv.index('--') + 1:]
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Dispatch a command to the add-on module that implements it.
+
+    Args:
+        argv: Full Blender command line, defaults to ``sys.argv``
+
+    Returns:
+        Process exit code
+    """
+    args = script_args(sys.argv if argv is None else argv)
+    if not args or args[0] not in COMMANDS:
+        print(f"Usage: blender -b --python {Path(__file__).name} -- <{'|'.join(COMMANDS)}> [options]")
+        return 2
+
+    module_name, function_name = COMMANDS[args[0]]
+    import_package()
+    module = importlib.import_module(f'{PACKAGE_NAME}.{module_name}')
+    return getattr(module, function_name)(args[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -90,6 +90,8 @@ PROP_COLLAR_TRACKING = 'collar_tracking_speed_multiplier'
 FKIK_DEFAULT = 1.0
 FKIK_MIN = 0.0
 FKIK_MAX = 1.0
+# Switch values within this margin of a layer's zero influence mute that layer's constraints
+FKIK_MUTE_MARGIN = 1e-4
 
 # Rotation mode
 ROTATION_MODE_XYZ = 'XYZ'
@@ -99,3 +101,20 @@ ORIENTATION_NORMAL = 'NORMAL'
 ORIENTATION_GLOBAL = 'GLOBAL'
 PIVOT_INDIVIDUAL = 'INDIVIDUAL_ORIGINS'
 PIVOT_MEDIAN = 'MEDIAN_POINT'
+
+# Text datablock the rig generation profile is written to
+PROFILE_TEXT_NAME = 'Rig Profile'
+
+# Custom properties recorded on generated rigs for incremental regeneration
+RIG_SOURCE_PROPERTY = 'poser_rig_source'
+RIG_MANIFEST_PROPERTY = 'poser_rig_manifest'
+RIG_FIGURE_PROPERTY = 'poser_rig_figure'
+
+# Widget sources: a procedural detail level (segments per full circle), or the WGTS.blend library
+WIDGET_DETAIL_SEGMENTS = {'low': 8, 'medium': 16, 'high': 32}
+WIDGET_DETAIL_DEFAULT = 'medium'
+WIDGET_SOURCE_LIBRARY = 'library'
+
+# Bone roll strategies: Z axis towards global +Z, or along the Z axis of the same side's hand
+ROLL_GLOBAL_POS_Z = 'GLOBAL_POS_Z'
+ROLL_HAND_PLANE = 'HAND_PLANE'
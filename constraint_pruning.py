@@ -0,0 +1,169 @@
+"""Removal of constraints that can never affect the pose.
+
+Runs once at the end of rig generation. A constraint is pruned when it is:
+
+- disabled for good: zero influence;
+- a no-op: invalid (e.g. a missing target), or a copy or limit constraint with every
+  axis switched off;
+- overridden: followed on the same bone by a Copy Transforms constraint that replaces
+  the whole transform at full influence;
+- a duplicate: identical to the constraint right before it, for constraint types whose
+  effect does not stack.
+
+Constraints that a driver or an animation feeds, or that a driver reads, are always
+kept, and so are IK constraints, which also move the rest of their chain.
+"""
+
+import re
+
+from bpy.types import Constraint, Object
+
+from .rig_manifest import rna_settings
+
+# Matches the owning bone and constraint in a constraint's data path
+CONSTRAINT_PATH = re.compile(r'pose\.bones\["((?:[^"\\]|\\.)*)"\]\.constraints\["((?:[^"\\]|\\.)*)"\]')
+# Constraint types that move other bones than their owner
+CHAIN_CONSTRAINT_TYPES = {'IK', 'SPLINE_IK'}
+# Axis switches per constraint type; with all of them off the constraint does nothing
+AXIS_SWITCHES = {
+    'COPY_LOCATION': ('use_x', 'use_y', 'use_z'),
+    'COPY_ROTATION': ('use_x', 'use_y', 'use_z'),
+    'COPY_SCALE': ('use_x', 'use_y', 'use_z'),
+    'LIMIT_ROTATION': ('use_limit_x', 'use_limit_y', 'use_limit_z'),
+    'LIMIT_LOCATION': ('use_min_x', 'use_min_y', 'use_min_z', 'use_max_x', 'use_max_y', 'use_max_z'),
+    'LIMIT_SCALE': ('use_min_x', 'use_min_y', 'use_min_z', 'use_max_x', 'use_max_y', 'use_max_z'),
+}
+# Constraint types that give the same result when applied twice at full influence
+IDEMPOTENT_TYPES = {'LIMIT_ROTATION', 'LIMIT_LOCATION', 'LIMIT_SCALE', 'LIMIT_DISTANCE', 'DAMPED_TRACK'}
+
+
+def fed_constraints(armature: Object) -> set[tuple[str, str]]:
+    """
+    Find the constraints that drivers or animation write to or read from.
+
+    Args:
+        armature: Armature object
+
+    Returns:
+        Set of ``(bone name, constraint name)`` pairs
+    """
+    animation_data = armature.animation_data
+    if animation_data is None:
+        return set()
+
+    paths = []
+    for fcurve in animation_data.drivers:
+        paths.append(fcurve.data_path)
+        for variable in fcurve.driver.variables:
+            paths += [target.data_path for target in variable.targets if target.id == armature]
+    if animation_data.action is not None:
+        paths += [fcurve.data_path for fcurve in animation_data.action.fcurves]
+
+    return {match.groups() for path in paths if (match := CONSTRAINT_PATH.match(path))}
+
+
+def find_prunable_constraints(armature: Object) -> list[dict]:
+    """
+    List the constraints that can be removed without changing the pose.
+
+    Args:
+        armature: Armature object
+
+    Returns:
+        One record per prunable constraint with ``bone``, ``constraint``, ``type`` and ``reason``
+    """
+    fed = fed_constraints(armature)
+    prunable = []
+    for bone in armature.pose.bones:
+        candidates = [
+            constraint for constraint in bone.constraints
+            if (bone.name, constraint.name) not in fed and constraint.type not in CHAIN_CONSTRAINT_TYPES
+        ]
+        reasons = {}
+        for constraint in candidates:
+            reason = _noop_reason(constraint)
+            if reason is not None:
+                reasons[constraint.name] = reason
+
+        overriding = [
+            index for index, constraint in enumerate(candidates)
+            if constraint.name not in reasons and _replaces_transform(constraint)
+        ]
+        if overriding:
+            for constraint in candidates[:overriding[-1]]:
+                reasons.setdefault(constraint.name, 'overridden')
+
+        previous = None
+        for constraint in candidates:
+            if constraint.name in reasons:
+                continue
+            if previous is not None and _duplicates(previous, constraint, armature):
+                reasons[constraint.name] = 'duplicate'
+            else:
+                previous = constraint
+
+        for constraint in bone.constraints:
+            if constraint.name in reasons:
+                prunable.append({
+                    'bone': bone.name,
+                    'constraint': constraint.name,
+                    'type': constraint.type,
+                    'reason': reasons[constraint.name],
+                })
+
+    return prunable
+
+
+def _noop_reason(constraint: Constraint) -> str | None:
+    """Return why a constraint never does anything, or None if it may."""
+    if constraint.influence == 0.0:
+        return 'zero influence'
+    if not constraint.is_valid:
+        return 'invalid'
+    switches = AXIS_SWITCHES.get(constraint.type)
+    if switches is not None and not any(getattr(constraint, switch) for switch in switches):
+        return 'no axes'
+    return None
+
+
+def _replaces_transform(constraint: Constraint) -> bool:
+    """Check whether a constraint overwrites its owner's whole transform."""
+    return constraint.type == 'COPY_TRANSFORMS' and constraint.mix_mode == 'REPLACE' and constraint.influence == 1.0
+
+
+def _duplicates(previous: Constraint, constraint: Constraint, armature: Object) -> bool:
+    """Check whether a constraint repeats the one before it to no further effect."""
+    if constraint.type != previous.type or constraint.influence != 1.0:
+        return False
+    if constraint.type not in IDEMPOTENT_TYPES and not _replaces_transform(constraint):
+        return False
+    return rna_settings(previous, armature, {'name'}) == rna_settings(constraint, armature, {'name'})
+
+
+def prune_constraints(armature: Object) -> dict:
+    """
+    Remove the constraints that can never affect the pose.
+
+    The saving is estimated as the share of per-frame constraint evaluations that
+    are no longer made, counting each constraint as one evaluation.
+
+    Args:
+        armature: Generated armature object
+
+    Returns:
+        Report with the ``removed`` constraint records, the constraint counts ``before``
+        and ``after`` pruning and the ``estimated_saving`` as a fraction
+    """
+    before = sum(len(bone.constraints) for bone in armature.pose.bones)
+    removed = find_prunable_constraints(armature)
+    pose_bones = armature.pose.bones
+    for record in removed:
+        constraints = pose_bones[record['bone']].constraints
+        constraints.remove(constraints[record['constraint']])
+
+    return {
+        'removed': removed,
+        'before': before,
+        'after': before - len(removed),
+        'estimated_saving': len(removed) / before if before else 0.0,
+    }
@@ -1,7 +1,6 @@
-from typing import LiteralString, Literal
+from typing import Literal
 from bpy.types import PoseBone
 import math
-import bpy
 
 
 def add_damped_track_constraint(pose_bone: PoseBone, target_bone, target_object, head_tail=0.0, track_axis='TRACK_X'):
@@ -173,81 +172,3 @@ def add_transformation_constraint(pose_bone, target_bone, target_object,
     transform.to_min_x_scale = to_min_x_scale
     transform.to_min_y_scale = to_min_y_scale
     transform.to_min_z_scale = to_min_z_scale
-
-
-
-def add_ik_constraints(ik_target_name, chain: list[LiteralString], side:str = '.L', pole_name:str = None, pole_angle:float = 180, influence:float = 1.0):
-    armature = bpy.context.object
-    bones = armature.pose.bones
-
-    chain_length = len(chain)
-    ik_target_bone = bones.get(ik_target_name + side)
-    ik_constraint_bone_name = 'IK-' + chain[0] + side
-
-    ik_constraint = bones[ik_constraint_bone_name].constraints.new('IK')
-    ik_constraint.target = armature
-    ik_constraint.subtarget = ik_target_bone.name
-    ik_constraint.chain_count = chain_length
-
-    if pole_name is not None:
-        ik_pole_bone = bones.get('CTRL-IK-Pole-' + pole_name + side)
-        ik_constraint.pole_target = armature
-        ik_constraint.pole_angle = math.radians(pole_angle)
-        ik_constraint.pole_subtarget = ik_pole_bone.name
-
-    ik_constraint.influence = influence
-    ik_constraint.enabled = True
-
-
-def add_copy_transforms_constraints(prefix_target, prefix_constraint, constraint_name:str = 'Copy Transforms', influence:float = 1.0):
-    armature = bpy.context.object
-    bones = armature.pose.bones
-    thumb_fkik_chain = [
-        'Thumb_1',
-        'Thumb_2',
-        'Thumb_3',
-    ]
-    index_fkik_chain = [
-        'Index_1',
-        'Index_2',
-        'Index_3',
-    ]
-    mid_fkik_chain = [
-        'Mid_1',
-        'Mid_2',
-        'Mid_3',
-    ]
-    ring_fkik_chain = [
-        'Ring_1',
-        'Ring_2',
-        'Ring_3',
-    ]
-    pinky_fkik_chain = [
-        'Pinky_1',
-        'Pinky_2',
-        'Pinky_3',
-    ]
-
-    exclude = thumb_fkik_chain + index_fkik_chain + mid_fkik_chain + ring_fkik_chain + pinky_fkik_chain
-    for bone in bones:
-        if not bone.name.startswith(prefix_target):
-            continue
-
-        constraint_bone_name = bone.name.replace(prefix_target, prefix_constraint)
-        if constraint_bone_name not in bones:
-            continue
-
-        # Add the constraint itself
-        constraint = bones[constraint_bone_name].constraints.new('COPY_TRANSFORMS')
-        constraint.name = constraint_name
-
-        constraint.target = armature
-        constraint.target = armature
-        constraint.subtarget = bone.name
-        constraint.influence = influence
-
-        # turn off copy constraint on finger bones
-        for n in exclude:
-            if n in bone.name and bone.name.startswith('IK'):
-                constraint.influence = 0.0
-
@@ -1,21 +1,23 @@
 """Functions for creating base rig bones (root and properties)."""
 
-import bpy
-from bpy.types import EditBone
+from bpy.types import EditBone, Object
 from .helpers import create_bone
 
 
-def create_properties_bone() -> EditBone:
+def create_properties_bone(armature: Object) -> EditBone:
     """
     Create the PROPERTIES bone for storing custom rig properties.
     
     This bone holds FK/IK switches and other control properties.
     
+    Args:
+        armature: Armature object in edit mode
+
     Returns:
         The created PROPERTIES EditBone
     """
-    edit_bones = bpy.context.object.data.edit_bones
-    collection = bpy.context.object.data.collections_all.get('Root')
+    edit_bones = armature.data.edit_bones
+    collection = armature.data.collections_all.get('Root')
     return create_bone(
         edit_bones=edit_bones,
         name='PROPERTIES',
@@ -29,15 +31,18 @@ def create_properties_bone() -> EditBone:
     )
 
 
-def create_root() -> None:
+def create_root(armature: Object) -> None:
     """
     Create the root bone by repurposing the Poser 'Body' bone.
     
     The Body bone from Poser FBX is renamed to 'root' and repositioned
     at the origin to serve as the main parent for the rig hierarchy.
+
+    Args:
+        armature: Armature object in edit mode
     """
-    collection = bpy.context.object.data.collections_all.get('Root')
-    edit_bones = bpy.context.object.data.edit_bones
+    collection = armature.data.collections_all.get('Root')
+    edit_bones = armature.data.edit_bones
     
     # Rename Body to root, disconnect, and position at origin
     edit_bones['Hip'].use_connect = False
@@ -1,11 +1,12 @@
-import bpy
+from bpy.types import Object
 from .constraints import add_copy_rotation_constraint, add_damped_track_constraint
 from .helpers import create_bone
 from .colorscheme import bright_blue, bright_yellow
+from .constants import EYE_TARGET_DISTANCE
+from .rest_pose import RestPose, eye_control_positions
 
-def setup_eye_tracking_constraints():
-    armature = bpy.context.object
-    pose_bones = bpy.context.object.pose.bones
+def setup_eye_tracking_constraints(armature: Object):
+    pose_bones = armature.pose.bones
     # assign copy constraint from MCH-Eye.L to DEF-Eye.L
     bone_mch_eye_left = pose_bones['MCH-Eye.L']
     bone_eye_left = pose_bones['DEF-Eye.L']
@@ -27,19 +28,20 @@ def setup_eye_tracking_constraints():
     )
 
 
-def create_eye_control_bones():
-    collection = bpy.context.object.data.collections_all.get('Eyes CTRL')
-    mch_parent_collection = bpy.context.object.data.collections_all.get('MCH')
-    mch_eye_collection = bpy.context.object.data.collections.new('MCH Eye', parent=mch_parent_collection)
-    edit_bones = bpy.context.object.data.edit_bones
+def create_eye_control_bones(armature: Object):
+    collection = armature.data.collections_all.get('Eyes CTRL')
+    mch_eye_collection = armature.data.collections_all.get('MCH Eye')
+    edit_bones = armature.data.edit_bones
     # create main eye track and two eye track bones
     bone_eye_left = edit_bones['DEF-Eye.L']
+    rest = RestPose(armature)
+    positions = eye_control_positions(rest.head('DEF-Eye.L'), rest.tail('DEF-Eye.L'), EYE_TARGET_DISTANCE)
 
     create_bone(
         edit_bones=edit_bones,
         name='MCH-Eye.L',
-        head=bone_eye_left.head,
-        tail=[bone_eye_left.tail[0], bone_eye_left.tail[1] + 0.005, bone_eye_left.tail[2]],
+        head=positions['MCH-Eye.L'][0],
+        tail=positions['MCH-Eye.L'][1],
         use_deform=False,
         parent=bone_eye_left.parent,
         bbone_size=bone_eye_left.bbone_z * 2,
@@ -49,8 +51,8 @@ def create_eye_control_bones():
     bone_ctrl_eye_target = create_bone(
         edit_bones=edit_bones,
         name='CTRL-Eye_Target',
-        head=[0, -0.25, bone_eye_left.head[2]],
-        tail=[0, -0.27, bone_eye_left.head[2]],
+        head=positions['CTRL-Eye_Target'][0],
+        tail=positions['CTRL-Eye_Target'][1],
         use_deform=False,
         parent=edit_bones['DEF-Head'],
         bbone_size=bone_eye_left.bbone_x,
@@ -62,8 +64,8 @@ def create_eye_control_bones():
         edit_bones=edit_bones,
         name='CTRL-Eye_Target.L',
         parent=bone_ctrl_eye_target,
-        head=[bone_eye_left.head[0], -0.25, bone_eye_left.head[2]],
-        tail=[bone_eye_left.head[0], -0.27, bone_eye_left.head[2]],
+        head=positions['CTRL-Eye_Target.L'][0],
+        tail=positions['CTRL-Eye_Target.L'][1],
         bbone_size=bone_eye_left.bbone_x,
         custom_color=bright_yellow,
         collection=collection
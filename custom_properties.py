@@ -1,41 +1,24 @@
 """Custom properties setup for rig controls."""
 
-import bpy
-from .constants import (
-    PROP_HEAD_TRACKING, PROP_COLLAR_TRACKING, PROP_ARMS_FKIK, PROP_LEGS_FKIK,
-    PROP_SPINE_FKIK, PROP_FINGERS_FKIK_LEFT, PROP_FINGERS_FKIK_RIGHT,
-    FKIK_DEFAULT, FKIK_MIN, FKIK_MAX
-)
+from bpy.types import PoseBone
 
 
-def create_custom_properties() -> None:
+def set_custom_property(properties_bone: PoseBone, prop_name: str, value,
+                        min_val: float = None, max_val: float = None) -> None:
     """
-    Create custom properties on the PROPERTIES bone for rig controls.
-    
-    Sets up FK/IK switching properties and other control parameters.
-    Properties are library-overridable for linking across files.
-    """
-    properties_bone = bpy.context.object.pose.bones['PROPERTIES']
+    Create a custom property on the PROPERTIES bone for rig controls.
 
-    # Tracking properties
-    properties_bone[PROP_HEAD_TRACKING] = False
-    properties_bone[PROP_COLLAR_TRACKING] = 0.05
-
-    # FK/IK switching properties (1.0 = FK, 0.0 = IK)
-    properties_bone[PROP_ARMS_FKIK] = [FKIK_DEFAULT, FKIK_DEFAULT]
-    properties_bone[PROP_LEGS_FKIK] = [FKIK_DEFAULT, FKIK_DEFAULT]
-    properties_bone[PROP_SPINE_FKIK] = FKIK_DEFAULT
-    properties_bone[PROP_FINGERS_FKIK_LEFT] = [FKIK_DEFAULT] * 5
-    properties_bone[PROP_FINGERS_FKIK_RIGHT] = [FKIK_DEFAULT] * 5
+    Properties are library-overridable for linking across files.
 
-    # Configure property UI settings
-    _setup_property_ui(properties_bone, PROP_HEAD_TRACKING)
-    _setup_property_ui(properties_bone, PROP_COLLAR_TRACKING, min_val=FKIK_MIN, max_val=FKIK_MAX)
-    _setup_property_ui(properties_bone, PROP_ARMS_FKIK, min_val=FKIK_MIN, max_val=FKIK_MAX)
-    _setup_property_ui(properties_bone, PROP_LEGS_FKIK, min_val=FKIK_MIN, max_val=FKIK_MAX)
-    _setup_property_ui(properties_bone, PROP_SPINE_FKIK, min_val=FKIK_MIN, max_val=FKIK_MAX)
-    _setup_property_ui(properties_bone, PROP_FINGERS_FKIK_LEFT, min_val=FKIK_MIN, max_val=FKIK_MAX)
-    _setup_property_ui(properties_bone, PROP_FINGERS_FKIK_RIGHT, min_val=FKIK_MIN, max_val=FKIK_MAX)
+    Args:
+        properties_bone: Bone holding the rig's control properties
+        prop_name: Name of the property
+        value: Default value, a number, bool or list of numbers
+        min_val: Minimum value (optional)
+        max_val: Maximum value (optional)
+    """
+    properties_bone[prop_name] = value
+    _setup_property_ui(properties_bone, prop_name, min_val, max_val)
 
 
 def _setup_property_ui(properties_bone, prop_name: str, min_val: float = None, max_val: float = None) -> None:
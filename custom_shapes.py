@@ -1,24 +1,71 @@
-"""Custom shape (widget) assignment for rig control bones."""
+"""Custom shape (widget) assignment for rig control bones.
 
-from bpy.types import PoseBone, Object
+Widgets live in one shared, armature-independent ``WGTS`` collection per file, and
+every rig in the file reuses the same objects. They come from one of two sources:
+
+- procedural (the default): built from ``widgets.widget_geometry`` at a detail level,
+  with one mesh and object per shape and parameters, shared by every bone that uses
+  that shape. No library file is read.
+- ``'library'``: the hand-made widgets in WGTS.blend, appended the first time a rig
+  needs them under their library name (``WGT_Armature_<bone>``).
+"""
+
+from functools import cache
 from pathlib import Path
+
 import bpy
+from bpy.types import Collection, Object, PoseBone, Scene
+from mathutils import Matrix
+
+from .bone_index import BoneIndex
+from .constants import WIDGET_DETAIL_DEFAULT, WIDGET_DETAIL_SEGMENTS, WIDGET_SOURCE_LIBRARY
+from .mirror import flip_side_name
+from .widgets import widget_geometry, widget_object_name, widget_shape
+
+# Shared collection holding every widget loaded into the file
+WIDGET_COLLECTION = 'WGTS'
+# Widget object names in WGTS.blend are this prefix followed by the bone name
+WIDGET_PREFIX = 'WGT_Armature_'
+
+# Widget meshes read from WGTS.blend by cache_widget_library(), keyed by widget object name
+_widget_cache: dict[str, dict] = {}
+
+
+def widget_name(bone_name: str) -> str:
+    """
+    Return the name of the widget for a bone.
+
+    Args:
+        bone_name: Control bone name
+
+    Returns:
+        Widget object name, e.g. ``'WGT_Armature_CTRL-Torso'``
+    """
+    return WIDGET_PREFIX + bone_name
 
 
-def assign_all_custom_shapes(armature: Object) -> None:
+def assign_all_custom_shapes(armature: Object, bone_names: list[str] = None, index: BoneIndex = None,
+                             source: str = WIDGET_DETAIL_DEFAULT) -> None:
     """
     Assign custom shapes (widgets) to all control bones in the armature.
-    
-    Widgets are imported from WGTS.blend file and matched to bone names.
-    Some finger controls use override transforms to position widgets correctly.
-    
+
+    Widgets are matched to bone names and taken from the shared widget collection;
+    the ones it does not hold yet are built or imported first. Some finger controls
+    use override transforms to position widgets correctly.
+
     Args:
         armature: The armature object to assign shapes to
+        bone_names: Only assign shapes to these bones (optional)
+        index: Index of the armature's bone names, built if not given
+        source: Procedural detail level (see ``constants.WIDGET_DETAIL_SEGMENTS``) or
+            ``'library'`` for the WGTS.blend widgets
+
+    Raises:
+        ValueError: If the source is unknown
     """
     pose_bones = armature.pose.bones
-    shape_collection_name = 'WGTS_' + armature.name
-    shape_collection = bpy.data.collections[shape_collection_name]
-    
+    index = index or BoneIndex(bone.name for bone in pose_bones)
+
     # Finger controls need custom transform override
     override_bones = {
         'CTRL-IK-Thumb.L': 'IK-Thumb_3.L',
@@ -33,27 +80,37 @@ def assign_all_custom_shapes(armature: Object) -> None:
         'CTRL-IK-Pinky.R': 'IK-Pinky_3.R',
     }
 
-    for bone in pose_bones:
-        # Skip deform and mechanism bones
-        if 'DEF' in bone.name or 'MCH' in bone.name:
-            continue
-
-        shape_name = 'WGT_' + armature.name + '_' + bone.name
-        found = shape_collection.all_objects.find(shape_name)
+    # Skip deform and mechanism bones
+    skipped = {*index.with_role('DEF'), *index.with_role('MCH')}
+    wanted = set(bone_names) if bone_names is not None else None
+    bones = [
+        bone for bone in pose_bones
+        if bone.name not in skipped and (wanted is None or bone.name in wanted)
+    ]
+    scene = armature.users_scene[0] if armature.users_scene else None
+    if source == WIDGET_SOURCE_LIBRARY:
+        # also load the other side's widgets, which mirror_pose_bones() binds to mirrored bones
+        names = [widget_name(name) for bone in bones for name in (bone.name, flip_side_name(bone.name))]
+        widgets = import_custom_shapes(names, scene)
+        shapes = {bone.name: widgets.get(widget_name(bone.name)) for bone in bones}
+    else:
+        shapes = procedural_custom_shapes([bone.name for bone in bones], source, scene)
 
-        if found != -1:
+    for bone in bones:
+        shape = shapes.get(bone.name)
+        if shape is not None:
             override_bone = None
             if bone.name in override_bones:
                 override_bone = pose_bones[override_bones[bone.name]]
 
-            assign_custom_shape(bone, shape_collection.all_objects[found], override_bone)
+            assign_custom_shape(bone, shape, override_bone)
 
 
-def assign_custom_shape(pose_bone: PoseBone, shape: Object | None, 
+def assign_custom_shape(pose_bone: PoseBone, shape: Object | None,
                        override_transform: PoseBone = None) -> None:
     """
     Assign a custom shape (widget) to a pose bone.
-    
+
     Args:
         pose_bone: Bone to assign shape to
         shape: Custom shape object
@@ -63,39 +120,212 @@ def assign_custom_shape(pose_bone: PoseBone, shape: Object | None,
     pose_bone.custom_shape_transform = override_transform
 
 
-def import_custom_shapes(collection_name: str) -> None:
+def import_custom_shapes(shape_names: list[str], scene: Scene = None) -> dict[str, Object]:
     """
-    Import custom bone shapes from WGTS.blend file.
-    
-    Imports the widget collection and renames it to match the armature.
-    The collection is hidden in the viewport after import.
-    
+    Make sure the shared widget collection holds the given widgets.
+
+    Only widgets that are missing from the collection and exist in WGTS.blend are
+    imported. If the widget library has been cached with cache_widget_library(),
+    they are rebuilt from memory instead of reading the file again. The collection
+    is created, linked to the scene and hidden in the viewport on first use.
+
     Args:
-        collection_name: Name of the armature to create widgets for
-        
+        shape_names: Widget object names, see widget_name()
+        scene: Scene to link the widget collection to, defaults to the context scene
+
+    Returns:
+        Mapping of widget name to object for every widget in the shared collection
+
+    Raises:
+        FileNotFoundError: If WGTS.blend file is not found
+    """
+    collection = _widget_collection(scene or bpy.context.scene)
+    widgets = {shape.name: shape for shape in collection.objects}
+
+    available = _widget_cache.keys() if _widget_cache else library_widget_names()
+    missing = [name for name in dict.fromkeys(shape_names) if name not in widgets and name in available]
+    if not missing:
+        return widgets
+
+    loaded = _build_widgets(missing) if _widget_cache else _load_widgets(missing)
+    for name, shape in zip(missing, loaded, strict=True):
+        collection.objects.link(shape)
+        widgets[name] = shape
+
+    return widgets
+
+
+def procedural_custom_shapes(bone_names: list[str], detail: str = WIDGET_DETAIL_DEFAULT,
+                             scene: Scene = None) -> dict[str, Object]:
+    """
+    Build or reuse the procedural widgets for a set of bones.
+
+    Each distinct shape is made once per file: its mesh and object are named after the
+    shape, detail and parameters (see ``widgets.widget_object_name``), so bones and rigs
+    with the same shape share them.
+
+    Args:
+        bone_names: Bone names
+        detail: Detail level, a key of ``constants.WIDGET_DETAIL_SEGMENTS``
+        scene: Scene to link the widget collection to, defaults to the context scene
+
+    Returns:
+        Mapping of bone name to widget object, for bones that have a widget
+
+    Raises:
+        ValueError: If the detail level is unknown
+    """
+    if detail not in WIDGET_DETAIL_SEGMENTS:
+        raise ValueError(
+            f"Unknown widget source: {detail}. "
+            f"Use one of {', '.join(WIDGET_DETAIL_SEGMENTS)} or '{WIDGET_SOURCE_LIBRARY}'."
+        )
+
+    segments = WIDGET_DETAIL_SEGMENTS[detail]
+    collection = _widget_collection(scene or bpy.context.scene)
+    shared = {}
+    shapes = {}
+    for bone_name in bone_names:
+        chosen = widget_shape(bone_name)
+        if chosen is None:
+            continue
+
+        name = widget_object_name(chosen[0], segments, chosen[1])
+        if name not in shared:
+            shared[name] = _procedural_widget(name, chosen[0], segments, chosen[1], collection)
+        shapes[bone_name] = shared[name]
+
+    return shapes
+
+
+def _procedural_widget(name: str, shape: str, segments: int, params: dict, collection: Collection) -> Object:
+    """Return the named procedural widget, building its mesh and object if the file lacks them."""
+    widget = bpy.data.objects.get(name)
+    if widget is None:
+        mesh = bpy.data.meshes.get(name)
+        if mesh is None:
+            vertices, edges = widget_geometry(shape, segments, tuple(sorted(params.items())))
+            mesh = bpy.data.meshes.new(name)
+            mesh.from_pydata(vertices, edges, [])
+        widget = bpy.data.objects.new(name, mesh)
+
+    if widget.name not in collection.objects:
+        collection.objects.link(widget)
+
+    return widget
+
+
+def _widget_collection(scene: Scene) -> Collection:
+    """Return the shared widget collection, creating it and linking it to the scene if needed."""
+    collection = bpy.data.collections.get(WIDGET_COLLECTION)
+    if collection is None:
+        collection = bpy.data.collections.new(WIDGET_COLLECTION)
+        collection.hide_viewport = True
+
+    if collection.name not in scene.collection.children:
+        scene.collection.children.link(collection)
+
+    return collection
+
+
+def cache_widget_library() -> None:
+    """
+    Read WGTS.blend once and keep its widget meshes in memory.
+
+    Long-running workers call this at start-up so every later call to
+    import_custom_shapes() rebuilds the widgets without any library I/O.
+    The loaded datablocks are removed again, leaving the file untouched.
+
+    Raises:
+        FileNotFoundError: If WGTS.blend file is not found
+    """
+    if _widget_cache:
+        return
+
+    shapes = _load_widgets(library_widget_names())
+    meshes = [shape.data for shape in shapes]
+
+    for name, shape in zip(library_widget_names(), shapes, strict=True):
+        mesh = shape.data
+        coordinates = [0.0] * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', coordinates)
+        _widget_cache[name] = {
+            'mesh': mesh.name,
+            'vertices': [coordinates[i:i + 3] for i in range(0, len(coordinates), 3)],
+            'edges': [tuple(edge.vertices) for edge in mesh.edges],
+            'faces': [tuple(polygon.vertices) for polygon in mesh.polygons],
+            'matrix': [list(row) for row in shape.matrix_basis],
+        }
+
+    bpy.data.batch_remove([*shapes, *meshes])
+
+
+def _library_path() -> Path:
+    """
+    Return the path of the WGTS.blend file next to this module.
+
     Raises:
         FileNotFoundError: If WGTS.blend file is not found
-        RuntimeError: If the WGTS collection fails to load
     """
     blend_path = Path(__file__).with_name("WGTS.blend")
-    
+
     if not blend_path.exists():
         raise FileNotFoundError(f"Widget file not found: {blend_path}")
-    
-    with bpy.data.libraries.load(str(blend_path), link=False) as (data_from, data_to):
-        data_to.collections = ["WGTS"]
-
-    # Link into the scene tree so it's visible
-    coll = bpy.data.collections.get("WGTS")
-    if not coll:
-        raise RuntimeError(f"Failed to load WGTS collection from {blend_path}")
-    
-    coll.name = "WGTS_" + collection_name  # Rename collection to match armature
-    if coll.name not in bpy.context.scene.collection.children:
-        bpy.context.scene.collection.children.link(coll)
-
-    for shape in coll.all_objects:
-        new_shape_name = 'WGT_' + collection_name + '_'
-        shape.name = shape.name.replace('WGT_Armature_', new_shape_name)
-
-    coll.hide_viewport = True
+
+    return blend_path
+
+
+@cache
+def library_widget_names() -> tuple[str, ...]:
+    """
+    List the widget objects in WGTS.blend without loading them.
+
+    Returns:
+        Widget object names
+
+    Raises:
+        FileNotFoundError: If WGTS.blend file is not found
+    """
+    with bpy.data.libraries.load(str(_library_path()), link=False) as (data_from, data_to):
+        return tuple(name for name in data_from.objects if name.startswith(WIDGET_PREFIX))
+
+
+def _load_widgets(names: list[str]) -> list[Object]:
+    """
+    Append widget objects from the WGTS.blend file next to this module.
+
+    Args:
+        names: Widget object names to append
+
+    Returns:
+        The appended objects, in the order of ``names``
+
+    Raises:
+        FileNotFoundError: If WGTS.blend file is not found
+    """
+    with bpy.data.libraries.load(str(_library_path()), link=False) as (data_from, data_to):
+        data_to.objects = list(names)
+
+    return list(data_to.objects)
+
+
+def _build_widgets(names: list[str]) -> list[Object]:
+    """
+    Rebuild widget objects from the in-memory widget cache.
+
+    Args:
+        names: Widget object names to build
+
+    Returns:
+        One new object per name, in the order of ``names``
+    """
+    shapes = []
+    for shape_name in names:
+        shape_data = _widget_cache[shape_name]
+        mesh = bpy.data.meshes.new(shape_data['mesh'])
+        mesh.from_pydata(shape_data['vertices'], shape_data['edges'], shape_data['faces'])
+        shape = bpy.data.objects.new(shape_name, mesh)
+        shape.matrix_basis = Matrix(shape_data['matrix'])
+        shapes.append(shape)
+
+    return shapes
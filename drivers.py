@@ -1,124 +1,75 @@
 """Driver setup functions for FK/IK switching."""
 
-import bpy
+from bpy.types import FCurve, Object
 
+from .constants import FKIK_MAX, FKIK_MIN, FKIK_MUTE_MARGIN
 
-def _add_fkik_driver(constraint, armature, data_path: str) -> None:
+
+def add_fkik_driver(constraint, armature: Object, data_path: str) -> FCurve:
     """
-    Add an FK/IK switch driver to a constraint.
+    Drive a constraint's influence with an FK/IK switch property.
+
+    The driver averages a single property variable, so the switch value is copied
+    straight into the influence without evaluating an expression. Every constraint of a
+    chain side reads the same switch property.
     
     Args:
         constraint: Constraint to add driver to
         armature: Armature object
         data_path: Property data path for the driver variable
-    """
-    fcurve = constraint.driver_add("influence")
-    driver = fcurve.driver
-    driver.type = 'SCRIPTED'
-    driver.use_self = True
-    
-    var = driver.variables.new()
-    var.name = 'fkik_switch'
-    var.type = 'SINGLE_PROP'
-    
-    target = var.targets[0]
-    target.id_type = 'OBJECT'
-    target.id = armature
-    target.data_path = data_path
-    
-    driver.expression = 'fkik_switch'
-    driver.use_self = False
 
-
-def create_limb_fkik_switch_drivers(chain: list[str], prop_name: str) -> None:
+    Returns:
+        The driver F-curve
     """
-    Create FK/IK switch drivers for limb bones (arms/legs).
-    
-    Limbs have separate left and right properties.
-    
-    Args:
-        chain: List of bone names in the FK/IK chain
-        prop_name: Name of the custom property (e.g., 'arms_fkik', 'legs_fkik')
-    """
-    armature = bpy.context.object
-    pose_bones = armature.pose.bones
-
-    for bone_name in chain:
-        for bone in pose_bones:
-            if bone_name not in bone.name:
-                continue
+    return _add_switch_driver(constraint, "influence", armature, data_path)
 
-            is_left = '.L' in bone.name
-            side_index = 0 if is_left else 1
-            
-            for constraint in bone.constraints:
-                if 'IK' in constraint.name and constraint.type == 'COPY_TRANSFORMS':
-                    data_path = f'pose.bones["PROPERTIES"]["{prop_name}"][{side_index}]'
-                    _add_fkik_driver(constraint, armature, data_path)
 
-
-def create_spine_fkik_switch_drivers(chain: list[str], prop_name: str) -> None:
+def add_switch_mute_driver(constraint, armature: Object, data_path: str, muted_at: float) -> FCurve:
     """
-    Create FK/IK switch drivers for spine bones.
-    
-    Spine has a single property for the entire chain.
-    
-    Args:
-        chain: List of bone names in the FK/IK chain
-        prop_name: Name of the custom property (e.g., 'spine_fkik')
-    """
-    armature = bpy.context.object
-    pose_bones = armature.pose.bones
+    Mute a constraint while an FK/IK switch makes its result irrelevant.
 
-    for bone_name in chain:
-        for bone in pose_bones:
-            if bone_name not in bone.name:
-                continue
+    The switch value is mapped onto the constraint's mute flag by a constant-interpolated
+    driver F-curve, so no expression is evaluated. The IK layer is irrelevant while the
+    switch is at ``FKIK_MIN`` (within ``FKIK_MUTE_MARGIN``), the FK layer while it is at
+    ``FKIK_MAX``.
 
-            for constraint in bone.constraints:
-                if 'IK' in constraint.name and constraint.type == 'COPY_TRANSFORMS':
-                    data_path = f'pose.bones["PROPERTIES"]["{prop_name}"]'
-                    _add_fkik_driver(constraint, armature, data_path)
-
-
-def create_finger_fkik_switch_drivers(prop_name: str) -> None:
-    """
-    Create FK/IK switch drivers for finger bones.
-    
-    Fingers have separate properties for each finger on each side.
-    
     Args:
-        prop_name: Base name of the custom property (e.g., 'fingers_fkik')
-                   Will be suffixed with '_l' or '_r' for left/right
-    """
-    armature = bpy.context.object
-    pose_bones = armature.pose.bones
+        constraint: Constraint to mute
+        armature: Armature object owning the switch property
+        data_path: Property data path of the switch
+        muted_at: Switch value at which the constraint is muted, ``FKIK_MIN`` or ``FKIK_MAX``
 
-    # Define all finger chains
-    finger_chains = [
-        ['FK-Thumb_1', 'FK-Thumb_2', 'FK-Thumb_3'],
-        ['FK-Index_1', 'FK-Index_2', 'FK-Index_3'],
-        ['FK-Mid_1', 'FK-Mid_2', 'FK-Mid_3'],
-        ['FK-Ring_1', 'FK-Ring_2', 'FK-Ring_3'],
-        ['FK-Pinky_1', 'FK-Pinky_2', 'FK-Pinky_3'],
-    ]
+    Returns:
+        The driver F-curve
+    """
+    fcurve = _add_switch_driver(constraint, "mute", armature, data_path)
+    for modifier in list(fcurve.modifiers):
+        fcurve.modifiers.remove(modifier)
+    fcurve.keyframe_points.clear()
+
+    # (switch value, mute) pairs; each value holds until the next key
+    if muted_at == FKIK_MIN:
+        keys = [(FKIK_MIN, 1.0), (FKIK_MIN + FKIK_MUTE_MARGIN, 0.0)]
+    else:
+        keys = [(FKIK_MIN, 0.0), (FKIK_MAX, 1.0)]
+    for switch_value, mute in keys:
+        fcurve.keyframe_points.insert(switch_value, mute).interpolation = 'CONSTANT'
+    fcurve.extrapolation = 'CONSTANT'
+    return fcurve
+
+
+def _add_switch_driver(constraint, property_name: str, armature: Object, data_path: str) -> FCurve:
+    """Add an averaged-value driver reading one switch property to a constraint property."""
+    fcurve = constraint.driver_add(property_name)
+    driver = fcurve.driver
+    driver.type = 'AVERAGE'
     
-    chain = [bone for finger_chain in finger_chains for bone in finger_chain]
-    finger_names = ['Thumb', 'Index', 'Mid', 'Ring', 'Pinky']
+    var = driver.variables.new()
+    var.name = 'fkik_switch'
+    var.type = 'SINGLE_PROP'
     
-    for bone_name in chain:
-        for bone in pose_bones:
-            if bone_name not in bone.name:
-                continue
-
-            is_left = '.L' in bone.name
-            prop_name_side = f"{prop_name}_{'l' if is_left else 'r'}"
-
-            for finger_index, finger_name in enumerate(finger_names):
-                if finger_name not in bone.name:
-                    continue
-
-                for constraint in bone.constraints:
-                    if 'IK' in constraint.name and constraint.type == 'COPY_TRANSFORMS':
-                        data_path = f'pose.bones["PROPERTIES"]["{prop_name_side}"][{finger_index}]'
-                        _add_fkik_driver(constraint, armature, data_path)
+    target = var.targets[0]
+    target.id_type = 'OBJECT'
+    target.id = armature
+    target.data_path = data_path
+    return fcurve
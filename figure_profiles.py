@@ -0,0 +1,177 @@
+"""Figure profiles: the differences between Poser figures the generator has to know about.
+
+The generator is written against the Millennium 3 skeleton. A profile describes how
+another figure differs from it:
+
+- ``bone_map``: figure bones to rename to the Millennium 3 bone they stand for, e.g. a
+  waist bone that plays the part of ``LowerAbdomen``;
+- ``extra_bones``: bones only this figure has (toes, jaw, neck segments), with their
+  parents. They are kept as plain deform bones and identify the figure;
+- ``bone_offsets``: extra ``(head, tail)`` offsets merged into the spec's ``bone_offsets``.
+
+Names are written the way ``bone_rename.rename_bone`` writes them (``'Hand.L'``), so
+``Left_Hand`` and ``lHand`` exports are treated alike.
+
+A figure is recognised by its fingerprint: the set of extra bones, each with its
+parent, that it has out of all the profiles' extra bones. The fingerprint takes one
+pass over the bones and is looked up in a table built once from the profiles.
+"""
+
+from collections.abc import Iterable
+from functools import cache
+
+from bpy.types import Object
+
+from .bone_rename import rename_bone
+from .constants import RIG_FIGURE_PROPERTY
+from .preflight import poser_bone_name
+
+# Profile used for figures that match no other profile
+DEFAULT_FIGURE = 'millennium3'
+
+FIGURE_PROFILES = {
+    'millennium3': {
+        'label': 'Millennium 3',
+        'bone_map': {},
+        'extra_bones': {},
+        'bone_offsets': {},
+    },
+    'millennium4': {
+        'label': 'Millennium 4',
+        'bone_map': {},
+        'extra_bones': {
+            'Lower_Jaw': 'Head',
+            'Big_Toe.L': 'Toe.L',
+            'Big_Toe.R': 'Toe.R',
+        },
+        'bone_offsets': {},
+    },
+    'la_femme': {
+        'label': 'La Femme / Le Homme',
+        # the waist sits between hip and abdomen, where the generator adds LowerAbdomen
+        'bone_map': {'Waist': 'LowerAbdomen'},
+        'extra_bones': {
+            'Waist': 'Hip',
+            'Upper_Neck': 'Neck',
+        },
+        'bone_offsets': {},
+    },
+}
+
+
+def _normalized(name: str | None) -> str | None:
+    """Return a bone name as rename_bone() writes it, without prefix."""
+    return None if name is None else rename_bone(name) or name
+
+
+@cache
+def _fingerprint_table() -> dict[frozenset, str]:
+    """Map each profile's fingerprint to the profile name."""
+    return {
+        frozenset(profile['extra_bones'].items()): name
+        for name, profile in FIGURE_PROFILES.items()
+    }
+
+
+@cache
+def _marker_bones() -> frozenset[tuple[str, str]]:
+    """Every profile's extra bones as ``(bone, parent)`` pairs."""
+    return frozenset(pair for profile in FIGURE_PROFILES.values() for pair in profile['extra_bones'].items())
+
+
+def skeleton_fingerprint(bones: Iterable[tuple[str, str | None]]) -> frozenset[tuple[str, str]]:
+    """
+    Compute the fingerprint of a skeleton.
+
+    Args:
+        bones: ``(bone name, parent name or None)`` pairs
+
+    Returns:
+        The profiles' extra bones, as ``(bone, parent)`` pairs, that the skeleton has
+    """
+    markers = _marker_bones()
+    return frozenset(
+        pair for pair in ((_normalized(name), _normalized(parent)) for name, parent in bones)
+        if pair in markers
+    )
+
+
+def detect_figure_profile(armature: Object) -> str:
+    """
+    Pick the figure profile matching an imported armature.
+
+    A fingerprint that is in the table gives its profile directly. Otherwise (extra
+    bones of several figures, or only some of one figure's) the profile sharing the
+    most extra bones with the figure wins; figures without any are Millennium 3.
+
+    Args:
+        armature: Imported Poser armature object
+
+    Returns:
+        Profile name, a key of ``FIGURE_PROFILES``
+    """
+    fingerprint = skeleton_fingerprint(
+        (bone.name, bone.parent.name if bone.parent else None) for bone in armature.data.bones
+    )
+    table = _fingerprint_table()
+    if fingerprint in table:
+        return table[fingerprint]
+
+    best = max(table, key=lambda markers: len(markers & fingerprint))
+    return table[best] if best & fingerprint else DEFAULT_FIGURE
+
+
+def figure_profile(name: str) -> dict:
+    """
+    Return a figure profile by name.
+
+    Args:
+        name: Profile name
+
+    Returns:
+        Profile, see ``FIGURE_PROFILES``
+
+    Raises:
+        ValueError: If there is no such profile
+    """
+    if name not in FIGURE_PROFILES:
+        raise ValueError(f"Unknown figure profile: {name}. Use one of {', '.join(FIGURE_PROFILES)}.")
+    return FIGURE_PROFILES[name]
+
+
+def figure_profile_spec(spec: dict, name: str) -> dict:
+    """
+    Adapt a rig spec to a figure profile.
+
+    Args:
+        spec: Rig spec, e.g. ``rig_spec.POSER_RIG_SPEC``
+        name: Profile name
+
+    Returns:
+        The spec itself if the profile changes nothing, otherwise an adapted copy
+    """
+    offsets = figure_profile(name)['bone_offsets']
+    if not offsets:
+        return spec
+    return {**spec, 'bone_offsets': {**spec['bone_offsets'], **offsets}}
+
+
+def apply_figure_profile(armature: Object, name: str) -> None:
+    """
+    Rename an armature's bones to the names the generator expects and record the profile.
+
+    Bones are renamed on the armature data, so Blender renames the vertex groups of
+    the figure's meshes with them. Bones already renamed are left alone, so applying
+    a profile twice changes nothing.
+
+    Args:
+        armature: Imported Poser armature object, in object mode
+        name: Profile name
+    """
+    bone_map = figure_profile(name)['bone_map']
+    for bone in list(armature.data.bones):
+        new_name = bone_map.get(_normalized(bone.name))
+        if new_name is not None:
+            bone.name = poser_bone_name(new_name)
+
+    armature[RIG_FIGURE_PROPERTY] = name
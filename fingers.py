@@ -1,83 +1,15 @@
-from .helpers import create_fkik_chains, create_bone, move_bone_along_local_axis, align_bone_to_source
+from .helpers import create_bone, align_bone_to_source
 from .constraints import add_limit_scale_constraint, add_copy_rotation_constraint, add_limit_rotation_constraint, add_transformation_constraint
-from bpy.types import PoseBone
-import bpy
+from .bone_index import BoneIndex
+from .constants import FINGER_CTRL_LENGTH, FINGER_CTRL_SIZE_MULTIPLIER
+from .rest_pose import RestPose, finger_control_positions
+from bpy.types import Object, PoseBone
 
-def create_finger_fkik_chains():
-    edit_bones = bpy.context.object.data.edit_bones
-    ik_collection = bpy.context.object.data.collections_all.get('Fingers IK')
-    fk_collection = bpy.context.object.data.collections_all.get('Fingers FK')
-
-    # ofml — finger chains now
-    thumb_fkik_chain = [
-        'Thumb_1',
-        'Thumb_2',
-        'Thumb_3',
-    ]
-    index_fkik_chain = [
-        'Index_1',
-        'Index_2',
-        'Index_3',
-    ]
-    mid_fkik_chain = [
-        'Mid_1',
-        'Mid_2',
-        'Mid_3',
-    ]
-    ring_fkik_chain = [
-        'Ring_1',
-        'Ring_2',
-        'Ring_3',
-    ]
-    pinky_fkik_chain = [
-        'Pinky_1',
-        'Pinky_2',
-        'Pinky_3',
-    ]
-
-    finger_ik_chain = []
-    finger_ik_chain = create_fkik_chains(thumb_fkik_chain, 'IK-Hand.L', 'IK', '.L', 'THEME01', 0.004, True)
-    finger_ik_chain += create_fkik_chains(index_fkik_chain, 'IK-Hand.L', 'IK', '.L', 'THEME01', 0.004, True)
-    finger_ik_chain += create_fkik_chains(mid_fkik_chain, 'IK-Hand.L', 'IK', '.L', 'THEME01', 0.004, True)
-    finger_ik_chain += create_fkik_chains(ring_fkik_chain, 'IK-Hand.L', 'IK', '.L', 'THEME01', 0.004, True)
-    finger_ik_chain += create_fkik_chains(pinky_fkik_chain, 'IK-Hand.L', 'IK', '.L', 'THEME01', 0.004, True)
-
-    finger_fk_chain = []
-    finger_fk_chain = create_fkik_chains(thumb_fkik_chain, 'FK-Hand.L', 'FK', '.L', 'THEME03', 0.002)
-    finger_fk_chain += create_fkik_chains(index_fkik_chain, 'FK-Hand.L', 'FK', '.L', 'THEME03', 0.002)
-    finger_fk_chain += create_fkik_chains(mid_fkik_chain, 'FK-Hand.L', 'FK', '.L', 'THEME03', 0.002)
-    finger_fk_chain += create_fkik_chains(ring_fkik_chain, 'FK-Hand.L', 'FK', '.L', 'THEME03', 0.002)
-    finger_fk_chain += create_fkik_chains(pinky_fkik_chain, 'FK-Hand.L', 'FK', '.L', 'THEME03', 0.002)
-
-    for ik_bone in finger_ik_chain:
-        ik_collection.assign(ik_bone)
-
-    for fk_bone in finger_fk_chain:
-        fk_collection.assign(fk_bone)
-
-    # adjust position of middle joints in IK finger chain
-    # this eliminates the need for a pole target.
-    for bone in edit_bones:
-        if bone.name in ['IK-Thumb_2.L', 'IK-Index_2.L', 'IK-Mid_2.L', 'IK-Ring_2.L', 'IK-Pinky_2.L']:
-            if bone.name == 'IK-Thumb_2.L':
-                head_y_axis = bone.head[1]
-                tail_y_axis = bone.tail[1]
-                tail_z_axis = bone.tail[2]
-                bone.head[1] = head_y_axis - 0.005
-                bone.tail[1] = tail_y_axis - 0.005
-                bone.tail[2] = tail_z_axis + 0.005
-            else:
-                head_z_axis = bone.head[2]
-                tail_z_axis = bone.tail[2]
-                bone.head[2] = head_z_axis + 0.005
-                bone.tail[2] = tail_z_axis + 0.005
-
-
-
-def create_finger_control_bones():
-    edit_bones = bpy.context.object.data.edit_bones
-    fk_ctrl_collection = bpy.context.object.data.collections_all.get('Fingers FK CTRL')
-    ik_ctrl_collection = bpy.context.object.data.collections_all.get('Fingers IK CTRL')
+def create_finger_control_bones(armature: Object):
+    edit_bones = armature.data.edit_bones
+    rest = RestPose(armature)
+    fk_ctrl_collection = armature.data.collections_all.get('Fingers FK CTRL')
+    ik_ctrl_collection = armature.data.collections_all.get('Fingers IK CTRL')
 
     # eventually, we'll want to "DRY" this out, but this will do for now
     # finger/thumb curl bones
@@ -109,40 +41,40 @@ def create_finger_control_bones():
     # make bones to parent controls to, then parent these bones to their respective layers
 
 
-    bpy.ops.armature.select_all(action='DESELECT')
-    for bone in ctrl_bones:
-        name = bone.replace('_1', '')
-        fk_finger_bone = edit_bones['FK-' + bone + '.L']
-        ik_finger_bone = edit_bones['IK-' + name + '_3.L']
+    # place every finger's controls at once: FK controls just behind the first FK
+    # segment, IK controls starting at the tip of the last IK segment
+    names = [bone.replace('_1', '') for bone in ctrl_bones]
+    fk_rows = [rest.rows['FK-' + bone + '.L'] for bone in ctrl_bones]
+    ik_rows = [rest.rows['IK-' + name + '_3.L'] for name in names]
+    positions = finger_control_positions(
+        rest.heads[fk_rows], rest.tails[fk_rows], rest.heads[ik_rows], rest.tails[ik_rows], FINGER_CTRL_LENGTH
+    )
+    fk_heads, fk_tails = positions['fk']
+    ik_heads, ik_tails = positions['ik']
 
-        fk_ctrl_bone = create_bone(
+    for i, name in enumerate(names):
+        bbone_size = float(rest.bbone_sizes[fk_rows[i]]) * FINGER_CTRL_SIZE_MULTIPLIER
+        create_bone(
             edit_bones=edit_bones,
             name='CTRL-FK-' + name + '.L',
-            head=fk_finger_bone.head,
-            tail=fk_finger_bone.tail,
-            length=0.025,
-            bbone_size=fk_finger_bone.bbone_x * 3,
+            head=fk_heads[i],
+            tail=fk_tails[i],
+            bbone_size=bbone_size,
             palette='THEME09',
             parent=fk_fingers_ctrl,
             collection=fk_ctrl_collection
         )
-        ik_ctrl_bone = create_bone(
+        create_bone(
             edit_bones=edit_bones,
             name='CTRL-IK-' + name + '.L',
-            head=ik_finger_bone.head,
-            tail=ik_finger_bone.tail,
-            length=0.025,
-            bbone_size=fk_finger_bone.bbone_x * 3,
+            head=ik_heads[i],
+            tail=ik_tails[i],
+            bbone_size=bbone_size,
             palette='THEME09',
             parent=ik_fingers_ctrl,
             collection=ik_ctrl_collection
         )
 
-        move_bone_along_local_axis(fk_ctrl_bone, -0.025)
-        move_bone_along_local_axis(ik_ctrl_bone, 0.025)
-        ik_ctrl_bone.head = ik_finger_bone.tail # we want the heads and tails to align
-        ik_ctrl_bone.length = 0.025 # make sure length stays the same, though
-
     # need to do the same thing for thumb_1, because IKs are a bit different here
     thumb_bone = edit_bones['IK-Thumb_1.L']
     ik_thumb_bone = create_bone(
@@ -159,35 +91,9 @@ def create_finger_control_bones():
     align_bone_to_source(ik_thumb_bone, thumb_bone)
 
 
-def create_finger_fk_ctrl_constraints():
-    armature = bpy.context.object
+def create_finger_fk_ctrl_constraints(armature: Object, index: BoneIndex = None):
     bones = armature.pose.bones
-
-    thumb_fkik_chain = [
-        'Thumb_1',
-        'Thumb_2',
-        'Thumb_3',
-    ]
-    index_fkik_chain = [
-        'Index_1',
-        'Index_2',
-        'Index_3',
-    ]
-    mid_fkik_chain = [
-        'Mid_1',
-        'Mid_2',
-        'Mid_3',
-    ]
-    ring_fkik_chain = [
-        'Ring_1',
-        'Ring_2',
-        'Ring_3',
-    ]
-    pinky_fkik_chain = [
-        'Pinky_1',
-        'Pinky_2',
-        'Pinky_3',
-    ]
+    index = index or BoneIndex(bone.name for bone in bones)
 
     finger_fk_ctrls = [
         'CTRL-FK-Thumb.L',
@@ -198,65 +104,56 @@ def create_finger_fk_ctrl_constraints():
     ]
 
     for ctrl_bone in finger_fk_ctrls:
-        for i,bone in enumerate(bones):
-            if ctrl_bone in bone.name:
-                add_limit_scale_constraint_to_ctrl_bone(bone)
-
-            finger_bone_chain, side = ctrl_bone.replace('CTRL-', '').split('.')
-            if finger_bone_chain in bone.name and side in bone.name and 'CTRL-' not in bone.name:
-                finger_bone_item, finger_bone_position = bone.name.replace('.L', '').split('_')
-                finger_bone = bones[bone.name]
-                if 'FK-Thumb' in bone.name:
-                    fk_thumb_constraints(armature, bone, bones, ctrl_bone, finger_bone_position, i)
-
-                if finger_bone_item in ['FK-Index', 'FK-Mid', 'FK-Ring', 'FK-Pinky']:
-                    if 1 == int(finger_bone_position):
-                        add_copy_rotation_constraint(
-                            pose_bone=finger_bone,
-                            target_bone=bones[ctrl_bone],
-                            target_object=armature,
-                            name='Copy Rotation (Side-Side)',
-                            use_y=False,
-                            mix_mode='ADD'
-                        )
-                        add_transformation_constraint(
-                            pose_bone=finger_bone,
-                            target_bone=bones[ctrl_bone],
-                            target_object=armature,
-                            name='Transformation (Curl)',
-                            map_from='SCALE',
-                            from_min_y_scale=0.25,
-                            from_max_y_scale=1.0,
-                            map_to='ROTATION',
-                            map_to_x_from='Y',
-                            to_min_x_rot=-70.0,
-                            to_max_x_rot=0,
-                            mix_mode='ADD'
-                        )
-                    if 2 == int(finger_bone_position):
-                        add_copy_rotation_constraint(
-                            pose_bone=finger_bone,
-                            target_bone=bones[i - 1],
-                            target_object=armature,
-                            use_y=False,
-                            use_z=False,
-                        )
-                    if 3 == int(finger_bone_position):
-                        add_copy_rotation_constraint(
-                            pose_bone=finger_bone,
-                            target_bone=bones[i - 1],
-                            target_object=armature,
-                            use_y=False,
-                            use_z=False,
-                        )
+        add_limit_scale_constraint_to_ctrl_bone(bones[ctrl_bone])
 
+        ctrl_parts = index.parts(ctrl_bone)
+        previous_bone = None
+        for bone_name in index.chain('FK', ctrl_parts['base'], ctrl_parts['side']):
+            finger_bone = bones[bone_name]
+            finger_bone_position = index.parts(bone_name)['segment']
+            if ctrl_parts['base'] == 'Thumb':
+                fk_thumb_constraints(armature, finger_bone, bones, ctrl_bone, finger_bone_position, previous_bone)
 
-
-def fk_thumb_constraints(armature, bone: PoseBone, bones, ctrl_bone: str,
-                         finger_bone_position: str, i: int):
-
-    finger_bone = bones[bone.name]
-    if 1 == int(finger_bone_position):
+            else:
+                if 1 == finger_bone_position:
+                    add_copy_rotation_constraint(
+                        pose_bone=finger_bone,
+                        target_bone=bones[ctrl_bone],
+                        target_object=armature,
+                        name='Copy Rotation (Side-Side)',
+                        use_y=False,
+                        mix_mode='ADD'
+                    )
+                    add_transformation_constraint(
+                        pose_bone=finger_bone,
+                        target_bone=bones[ctrl_bone],
+                        target_object=armature,
+                        name='Transformation (Curl)',
+                        map_from='SCALE',
+                        from_min_y_scale=0.25,
+                        from_max_y_scale=1.0,
+                        map_to='ROTATION',
+                        map_to_x_from='Y',
+                        to_min_x_rot=-70.0,
+                        to_max_x_rot=0,
+                        mix_mode='ADD'
+                    )
+                if finger_bone_position in (2, 3):
+                    add_copy_rotation_constraint(
+                        pose_bone=finger_bone,
+                        target_bone=previous_bone,
+                        target_object=armature,
+                        use_y=False,
+                        use_z=False,
+                    )
+
+            previous_bone = finger_bone
+
+
+def fk_thumb_constraints(armature, finger_bone: PoseBone, bones, ctrl_bone: str,
+                         finger_bone_position: int, previous_bone: PoseBone | None):
+
+    if 1 == finger_bone_position:
         add_copy_rotation_constraint(finger_bone, bones[ctrl_bone], armature, mix_mode='ADD')
         add_limit_rotation_constraint(
             pose_bone=finger_bone,
@@ -271,7 +168,7 @@ def fk_thumb_constraints(armature, bone: PoseBone, bones, ctrl_bone: str,
             use_limit_z=True,
         )
 
-    if 2 == int(finger_bone_position):
+    if 2 == finger_bone_position:
         add_transformation_constraint(
             pose_bone=finger_bone,
             target_bone=bones[ctrl_bone],
@@ -285,10 +182,10 @@ def fk_thumb_constraints(armature, bone: PoseBone, bones, ctrl_bone: str,
             to_max_z_rot=0.0
         )
 
-    if 3 == int(finger_bone_position):
+    if 3 == finger_bone_position:
         add_transformation_constraint(
             pose_bone=finger_bone,
-            target_bone=bones[i - 1],
+            target_bone=previous_bone,
             target_object=armature,
             map_from='ROTATION',
             map_to='ROTATION',
@@ -1,12 +1,12 @@
-import bpy
 import math
+from bpy.types import Object
 from .constraints import add_transformation_constraint, add_copy_location_constraint, add_limit_rotation_constraint
 from .helpers import create_bone
 from .colorscheme import bright_blue
+from .rest_pose import RestPose, foot_roll_positions
 
-def setup_foot_roll_constraints():
-    armature = bpy.context.object
-    pose_bones = bpy.context.object.pose.bones
+def setup_foot_roll_constraints(armature: Object):
+    pose_bones = armature.pose.bones
 
     bone_mch_roll_toe = pose_bones['MCH-Roll-Toe.L']
     bone_mch_roll_foot = pose_bones['MCH-Roll-Foot.L']
@@ -59,15 +59,11 @@ def setup_foot_roll_constraints():
     )
 
 
-def create_foot_roll_control_bones():
-    all_collections = bpy.context.object.data.collections_all
-    collection = bpy.context.object.data.collections
-    mch_collection = all_collections.get('MCH')
-    leg_collection = all_collections.get('Legs')
-
-    mch_footroll_collection = collection.new('MCH Footroll', parent=mch_collection)
-    footroll_ctrl_collection = collection.new('Foot Roll', parent=leg_collection)
-    edit_bones = bpy.context.object.data.edit_bones
+def create_foot_roll_control_bones(armature: Object):
+    all_collections = armature.data.collections_all
+    mch_footroll_collection = all_collections.get('MCH Footroll')
+    footroll_ctrl_collection = all_collections.get('Foot Roll')
+    edit_bones = armature.data.edit_bones
 
     # create and position bones for foot roll mechanism
     # Bones (Symmetrized):
@@ -80,6 +76,10 @@ def create_foot_roll_control_bones():
     bone_ik_toe = edit_bones['IK-Toe.L']
     bone_ik_foot = edit_bones['IK-Foot.L']
     bone_ctrl_ik_foot = edit_bones['CTRL-IK-Foot.L']
+    rest = RestPose(armature)
+    positions = foot_roll_positions(
+        rest.head('IK-Foot.L'), rest.tail('IK-Foot.L'), rest.head('IK-Toe.L'), rest.tail('IK-Toe.L')
+    )
 
     create_bone(
         edit_bones=edit_bones,
@@ -87,8 +87,8 @@ def create_foot_roll_control_bones():
         custom_color=bright_blue,
         display_type='OCTAHEDRAL',
         parent=bone_ctrl_ik_foot,
-        head=[bone_ik_foot.head[0], bone_ik_foot.head[1] + 0.05, bone_ik_foot.head[2]],
-        tail=[bone_ik_foot.head[0], bone_ik_foot.head[1] + 0.075, bone_ik_foot.head[2]],
+        head=positions['CTRL-Foot-Roll'][0],
+        tail=positions['CTRL-Foot-Roll'][1],
         collection=footroll_ctrl_collection,
     )
 
@@ -98,8 +98,8 @@ def create_foot_roll_control_bones():
         custom_color=bright_blue,
         display_type='OCTAHEDRAL',
         parent=bone_ctrl_ik_foot,
-        head=bone_ik_foot.head,
-        tail=[bone_ik_foot.head[0], -0.05 , bone_ik_foot.head[2]],
+        head=positions['Roll-Foot'][0],
+        tail=positions['Roll-Foot'][1],
         collection=mch_footroll_collection,
     )
 
@@ -109,8 +109,8 @@ def create_foot_roll_control_bones():
         custom_color=bright_blue,
         display_type='OCTAHEDRAL',
         parent=bone_roll_foot,
-        head=[bone_ik_foot.head[0], bone_ik_foot.head[1], 0.025],
-        tail=[bone_ik_foot.head[0], bone_ik_foot.head[1] - 0.025, 0.025],
+        head=positions['MCH-Foot-Rollback'][0],
+        tail=positions['MCH-Foot-Rollback'][1],
         collection=mch_footroll_collection,
     )
 
@@ -120,8 +120,8 @@ def create_foot_roll_control_bones():
         custom_color=bright_blue,
         display_type='OCTAHEDRAL',
         parent=bone_mch_foot_rollback,
-        head=[bone_ik_toe.tail[0], bone_ik_toe.tail[1], 0],
-        tail = bone_ik_toe.head,
+        head=positions['MCH-Roll-Toe'][0],
+        tail=positions['MCH-Roll-Toe'][1],
         collection=mch_footroll_collection,
     )
 
@@ -131,8 +131,8 @@ def create_foot_roll_control_bones():
         custom_color=bright_blue,
         display_type='OCTAHEDRAL',
         parent=bone_mch_foot_rollback,
-        head=bone_ik_foot.tail,
-        tail= bone_ik_foot.head,
+        head=positions['MCH-Roll-Foot'][0],
+        tail=positions['MCH-Roll-Foot'][1],
         collection=mch_footroll_collection,
     )
 
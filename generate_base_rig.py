@@ -1,258 +1,368 @@
 """Main rig generation module for converting Poser FBX armatures to animation-ready rigs."""
 
+from contextlib import contextmanager
 from typing import Literal, LiteralString
 from bpy.types import BoneCollection, Object
+from mathutils import Matrix, Vector
 from .colorscheme import bright_green, bright_blue
 from .create_base import create_root, create_properties_bone
 from .footroll import create_foot_roll_control_bones, setup_foot_roll_constraints
 from .shoulder_collar import create_mch_shoulder_bones_and_controls, setup_collar_constraints
-from .fingers import create_finger_control_bones, create_finger_fkik_chains, create_finger_fk_ctrl_constraints
+from .fingers import create_finger_control_bones, create_finger_fk_ctrl_constraints
 from .create_eye_controls import create_eye_control_bones, setup_eye_tracking_constraints
-from .custom_properties import create_custom_properties
-from .constraints import add_copy_transforms_constraints, add_ik_constraints
-from .drivers import create_limb_fkik_switch_drivers, create_spine_fkik_switch_drivers, create_finger_fkik_switch_drivers
-from .helpers import rename_all_bones, create_bone, create_fkik_chains, assign_custom_color
-from .custom_shapes import import_custom_shapes, assign_all_custom_shapes
+from .helpers import create_bone, assign_custom_color
+from .bone_index import BoneIndex, parse_bone_name
+from .bone_rename import rename_all_bones
+from .constraint_pruning import prune_constraints
+from .custom_shapes import assign_all_custom_shapes
+from .figure_profiles import apply_figure_profile, detect_figure_profile, figure_profile, figure_profile_spec
+from .mirror import mirror_edit_bones, mirror_pose_bones
+from .preflight import validate_armature
+from .rest_pose import RestPose, pole_target, bone_z_axes, roll_to_align
+from .rig_manifest import record_manifest, record_source_skeleton, rig_inputs
+from .rig_spec import POSER_RIG_SPEC
+from .spec_compiler import (
+    compile_rig_spec, build_collections, build_chain_bones, build_constraints, build_drivers, build_properties,
+    build_chain_mutes
+)
 from .constants import (
-    ORIENTATION_NORMAL, ORIENTATION_GLOBAL, PIVOT_INDIVIDUAL, PIVOT_MEDIAN,
-    PREFIX_DEF, ROTATION_MODE_XYZ, BONE_SIZE_DEF, EYE_BONE_EXTENSION, TOE_BONE_EXTENSION
+    PREFIX_DEF, ROTATION_MODE_XYZ, BONE_SIZE_DEF, EYE_BONE_EXTENSION, TOE_BONE_EXTENSION, ROLL_GLOBAL_POS_Z,
+    ROLL_HAND_PLANE
 )
 import bpy
+import numpy as np
 
 
-def setup_poser_figure(armature: Object) -> None:
+def setup_poser_figure(armature: Object, spec: dict = None, widgets: bool = True, figure: str = None) -> dict:
     """
     Main function to convert a Poser FBX armature into an animation-ready rig.
     
     This function performs the complete rigging process:
-    1. Applies transforms and sets up viewport
-    2. Creates bone collections
-    3. Fixes bone positions and creates control structures
-    4. Generates FK/IK chains for all limbs
-    5. Sets up constraints and drivers
-    6. Assigns custom shapes
+    1. Detects the figure profile and validates the skeleton against the compiled spec
+    2. Applies the profile's renames, bakes the armature's rotation and scale and sets up the display
+    3. In one edit session: creates bone collections, fixes Poser bones, adds root, properties
+       and generated bones, renames deform bones, builds FK/IK chains and controls, rolls
+       bones and symmetrizes the armature
+    4. Assigns custom shapes, builds constraints, custom properties and drivers
+    5. Prunes constraints that cannot affect the pose and records the manifest
+
+    Everything works on the armature passed in, so it does not need to be the active
+    or selected object and no viewport or operator context is required. The only mode
+    change is a single edit-mode session for the bone work; the armature is left in
+    object mode.
+
+    Collections, FK/IK chains, IK controls, chain constraints, switch drivers and
+    custom properties come from a declarative rig spec, applied in bulk passes.
+
+    Constraints that can never affect the pose are pruned once everything is built.
+
+    The figure type (Millennium 3, Millennium 4, La Femme, ...) is detected from the
+    skeleton, and its profile's bone renames and offsets are applied first.
+
+    The source skeleton and a manifest of everything generated are stored on the
+    armature, so the rig can later be updated with regenerate.regenerate_poser_figure().
     
     Args:
         armature: The imported Poser armature object to rig
+        spec: Rig spec to build, defaults to ``rig_spec.POSER_RIG_SPEC``
+        widgets: Import and assign the custom shapes (widgets)
+        figure: Figure profile name (see ``figure_profiles.FIGURE_PROFILES``), detected if not given
+
+    Returns:
+        Constraint pruning report, see constraint_pruning.prune_constraints(), with the bone
+        rename conflicts (see bone_rename.plan_bone_renames()) as ``rename_conflicts``
         
     Raises:
         ValueError: If required bones are missing from the armature
         RuntimeError: If rig generation fails at any stage
     """
-    # Validate armature has required bones
-    _validate_armature(armature)
-    
-    # Before deselecting everything, apply scale/rotation
-    # Poser's scale is 1/100 smaller than Blender, plus rotation is different as well
-    bpy.ops.object.transform_apply(location=False, rotation=True, scale=True)
+    figure = figure or detect_figure_profile(armature)
+    # Validate armature has required bones, before anything in the scene changes
+    compiled = compile_rig_spec(figure_profile_spec(spec or POSER_RIG_SPEC, figure))
+    validate_armature(armature, compiled, figure_profile(figure)['bone_map'])
+    apply_figure_profile(armature, figure)
+    prepare_armature(armature)
+
+    with edit_mode(armature):
+        record_source_skeleton(armature)
+        armature.data.display_type = 'BBONE'
+
+        build_collections(armature, compiled)
+
+        # fix some issues with bones coming from Poser
+        fix_bones(armature)
+        create_root(armature)
+        create_properties_bone(armature)
+        create_lower_abdomen_bone(armature)
+        # create_pelvis_bones()  # Future feature: optional pelvis bone creation
+        rename_conflicts = rename_all_bones(armature, PREFIX_DEF)
+        assign_deform_collection(armature)
+        rolled = calculate_bone_roll(armature, compiled['roll_strategies'])
+
+        build_chain_bones(armature, compiled)
+        build_ik_controls(armature, compiled)
+        create_mch_shoulder_bones_and_controls(armature)
+        create_spine_control_bones(armature)
+        create_finger_control_bones(armature)
+        create_foot_roll_control_bones(armature)
+        create_eye_control_bones(armature)
+
+        misc_bone_creation_cleanup(armature)
+
+        # change bone-roll to Global +Z to prevent issues later on; bones rolled above and not moved since are kept
+        calculate_bone_roll(armature, compiled['roll_strategies'], rolled)
+        # every bone exists from here on; the index is shared by the remaining stages
+        bone_index = BoneIndex(bone.name for bone in armature.data.edit_bones)
+        mirrored_bones = symmetrize_armature(armature, bone_index)
+
+    # Pose data is edited straight on the object — setting up constraints
+    set_rotation_mode(armature)
+    if widgets:
+        # mirrored bones get their widgets from mirror_pose_bones below
+        mirrored = set(mirrored_bones)
+        unmirrored = [bone.name for bone in armature.pose.bones if bone.name not in mirrored]
+        assign_all_custom_shapes(armature, unmirrored, bone_index, compiled['widgets'])
 
-    bpy.ops.object.select_all(action='DESELECT')
-    bpy.context.scene.transform_orientation_slots[0].type = ORIENTATION_NORMAL
-    bpy.context.scene.tool_settings.transform_pivot_point = PIVOT_INDIVIDUAL
+    # add constraints
+    create_finger_fk_ctrl_constraints(armature, bone_index)
+    build_constraints(armature, compiled)
+    setup_collar_constraints(armature)
+    setup_foot_roll_constraints(armature)
+    setup_eye_tracking_constraints(armature)
+
+    build_properties(armature, compiled)
+
+    mirror_pose_bones(armature, mirrored_bones)
+    build_drivers(armature, compiled)
+    build_chain_mutes(armature, compiled)
+
+    armature.data.collections['Rigging'].is_visible = False
+    finalize_armature(armature)
+    pruning = prune_constraints(armature)
+    pruning['rename_conflicts'] = rename_conflicts
+    record_manifest(armature, inputs=rig_inputs(compiled, figure))
+    return pruning
 
-    bpy.context.view_layer.objects.active = bpy.context.view_layer.objects[armature.name]
-    bpy.context.active_object.select_set(state=True)
+
+@contextmanager
+def edit_mode(armature: Object):
+    """
+    Keep an armature in edit mode for the duration of a ``with`` block.
+
+    Edit bones only exist in edit mode and Blender has no data-API way to enter it,
+    so this is the one operator the rig generator still calls. It runs under a context
+    override, so the armature does not have to be active or selected and no window
+    is needed.
+
+    Args:
+        armature: Armature object to edit
+
+    Yields:
+        The armature's edit bones
+
+    Raises:
+        RuntimeError: If the armature did not enter or leave edit mode
+    """
+    override = {
+        'active_object': armature,
+        'object': armature,
+        'selected_objects': [armature],
+        'selected_editable_objects': [armature],
+    }
+    with bpy.context.temp_override(**override):
+        bpy.ops.object.editmode_toggle()
+    if armature.mode != 'EDIT':
+        raise RuntimeError(f"Could not enter edit mode on {armature.name}")
+    try:
+        yield armature.data.edit_bones
+    finally:
+        with bpy.context.temp_override(**override, edit_object=armature):
+            bpy.ops.object.editmode_toggle()
+        if armature.mode != 'OBJECT':
+            raise RuntimeError(f"Could not leave edit mode on {armature.name}")
+
+
+def prepare_armature(armature: Object) -> None:
+    """
+    Apply the armature's rotation and scale and set up its viewport display.
+
+    The transform is baked into the armature data and its children's parent inverse,
+    matching ``transform_apply(location=False, rotation=True, scale=True)`` without
+    touching the selection.
+
+    Args:
+        armature: The imported Poser armature object to rig
+    """
+    # Poser's scale is 1/100 smaller than Blender, plus rotation is different as well
+    location = armature.matrix_basis.to_translation()
+    matrix = armature.matrix_basis.copy()
+    matrix.translation = Vector()
+    armature.data.transform(matrix)
+    armature.matrix_basis = Matrix.Translation(location)
+    for child in armature.children:
+        child.matrix_parent_inverse = matrix @ child.matrix_parent_inverse
 
     # maybe we could also change display to b-bone or stick?
     armature.show_in_front = True
     armature.display_type = 'WIRE'
-    import_custom_shapes(armature.name)
-    bpy.ops.object.editmode_toggle()  # go into edit mode
-    bpy.context.object.data.display_type = 'BBONE'
 
-    create_collections()
-    collections = armature.data.collections_all
 
-    # fix some issues with bones coming from Poser
+def assign_deform_collection(armature: Object) -> None:
+    """
+    Put all DEF bones in the DEF collection.
+
+    Args:
+        armature: Armature object in edit mode
+    """
     edit_bones = armature.data.edit_bones
+    def_collection = armature.data.collections_all.get('DEF')
+    for name in BoneIndex(bone.name for bone in edit_bones).with_role('DEF'):
+        def_collection.assign(edit_bones[name])
 
-    fix_bones()
-    create_root()
-    create_properties_bone()
-    create_lower_abdomen_bone()
-    # create_pelvis_bones()  # Future feature: optional pelvis bone creation
-    rename_all_bones(PREFIX_DEF)
-
-    # put all DEF bones in their respective collection
-    def_collection = collections.get('DEF')
-    for bone in edit_bones:
-        if 'DEF-' in bone.name:
-            def_collection.assign(bone)
-
-    bpy.ops.armature.select_all(action='SELECT')
-    bpy.ops.armature.calculate_roll(type='GLOBAL_POS_Z')
-
-    create_spine_fkik_chains()
-    create_arm_fkik_chains()
-    create_leg_fkik_chains()
-    create_finger_fkik_chains()
-    arms_ik_collection = collections.get('Arms CTRL')
-    legs_ik_collection = collections.get('Legs CTRL')
-    spine_ik_collection = collections.get('Spine CTRL')
-    create_ik_control_bones(collection=arms_ik_collection, chain=['Hand', 'Forearm', 'Shoulder',], side='.L', pole_name='Elbow')
-    create_ik_control_bones(collection=legs_ik_collection, chain=['Foot', 'Shin', 'Thigh',], side='.L', pole_name='Knee', y_axis_position=-0.625, z_position_by='head')
-    create_ik_control_bones(collection=spine_ik_collection, chain=['LowerAbdomen', 'Hip',], pole_name='Hip')
-    create_ik_control_bones(collection=spine_ik_collection, chain=['Chest', 'Abdomen', ], pole_name='Chest')
-    create_ik_control_bones(collection=spine_ik_collection, chain=['Head', 'Neck',], pole_name='Head', y_axis_position=0.5)
-    create_mch_shoulder_bones_and_controls()
-    create_spine_control_bones()
-    create_finger_control_bones()
-    create_foot_roll_control_bones()
-    create_eye_control_bones()
-
-    misc_bone_creation_cleanup()
-
-    # change bone-roll to Global +Z to prevent issues later on
-    bpy.ops.armature.select_all(action='SELECT')
-    bpy.ops.armature.calculate_roll(type='GLOBAL_POS_Z')
-
-    bpy.ops.object.editmode_toggle()  # we're done here
-
-    bpy.ops.object.posemode_toggle()  # Pose mode now — setting up constraints
-    # Change all bones to XYZ euler rotation mode
-    pose_bones = armature.pose.bones
-    for bone in pose_bones:
-        bone.rotation_mode = ROTATION_MODE_XYZ
 
-    assign_all_custom_shapes(armature)
+def calculate_bone_roll(armature: Object, strategies: dict[str, str] = None,
+                        since: dict[str, np.ndarray] = None) -> dict[str, np.ndarray]:
+    """
+    Recalculate bone rolls from the bones' heads and tails in one vectorized pass.
 
-    # add constraints
-    create_finger_fk_ctrl_constraints()
-    add_copy_transforms_constraints('IK', 'FK', 'Copy Transforms (IK)')
-    add_copy_transforms_constraints('FK', 'DEF', 'Copy Transforms (FK)')
-
-    add_ik_constraints('CTRL-IK-Hand' , ['Forearm', 'Shoulder'], '.L', 'Elbow', 180)
-    add_ik_constraints('IK-Foot' , ['Shin', 'Thigh'], '.L', 'Knee', 90)
-    add_ik_constraints('CTRL-IK-LowerAbdomen', ['LowerAbdomen', 'Hip'], '', 'Hip', 90)
-    add_ik_constraints('CTRL-IK-Chest', ['Chest', 'Abdomen'], '', 'Chest', -90)
-    add_ik_constraints('CTRL-IK-Head', ['Head', 'Neck'], '', 'Head', 90)
-    # fingers
-    add_ik_constraints('CTRL-IK-Thumb-Joint', ['Thumb_1'], '.L', None)
-    add_ik_constraints('CTRL-IK-Thumb', ['Thumb_3', 'Thumb_2'], '.L', None)
-    add_ik_constraints('CTRL-IK-Index', ['Index_3', 'Index_2', 'Index_1'], '.L', None)
-    add_ik_constraints('CTRL-IK-Mid', ['Mid_3', 'Mid_2', 'Mid_1'], '.L', None)
-    add_ik_constraints('CTRL-IK-Ring', ['Ring_3', 'Ring_2', 'Ring_1'], '.L', None)
-    add_ik_constraints('CTRL-IK-Pinky', ['Pinky_3', 'Pinky_2', 'Pinky_1'], '.L', None)
-    setup_collar_constraints()
-    setup_foot_roll_constraints()
-    setup_eye_tracking_constraints()
-
-    create_custom_properties()
-
-    bpy.ops.object.editmode_toggle()
-    bpy.ops.armature.select_all(action='SELECT')
-    bpy.ops.armature.symmetrize(direction="POSITIVE_X")
-    bpy.ops.armature.select_all(action='DESELECT')
-    create_spine_fkik_switch_drivers(['FK-Hip', 'FK-LowerAbdomen', 'FK-Abdomen', 'FK-Chest', 'FK-Neck', 'FK-Head'], 'spine_fkik')
-    create_limb_fkik_switch_drivers(['FK-Hand', 'FK-Forearm', 'FK-Shoulder', 'FK-Collar'], 'arms_fkik')
-    create_limb_fkik_switch_drivers(['FK-Foot', 'FK-Shin', 'FK-Thigh', 'FK-Buttock'], 'legs_fkik')
-    create_finger_fkik_switch_drivers('fingers_fkik')
-
-    bpy.ops.object.posemode_toggle()
-    bpy.context.object.data.collections['Rigging'].is_visible = False
-
-    # force-update drivers
-    for fcurve in armature.animation_data.drivers:
-        original_expression = fcurve.driver.expression
-        fcurve.driver.expression += " "
-        fcurve.driver.expression = original_expression
-
-    bpy.context.scene.transform_orientation_slots[0].type = ORIENTATION_GLOBAL
-    bpy.context.scene.tool_settings.transform_pivot_point = PIVOT_MEDIAN
-    
-    # Hide buttock bones (not typically used for animation)
-    bones = armature.pose.bones
-    for side in ['.L', '.R']:
-        bones[f'FK-Buttock{side}'].hide = True
-        bones[f'IK-Buttock{side}'].hide = True
+    By default a bone's Z axis points towards global +Z. ``strategies`` picks another
+    alignment per bone base name: with ``'HAND_PLANE'`` (e.g. for finger chains) the Z
+    axis follows the Z axis of the same side's ``DEF-Hand`` bone, so fingers curl in the
+    plane of the hand. Bones that do not change direction keep their roll.
+
+    Args:
+        armature: Armature object in edit mode
+        strategies: Bone base name → roll strategy, see ``constants.ROLL_*``
+        since: Result of an earlier pass; only bones created, moved or re-rolled since
+            then (and bones aligned to a changed hand) are recalculated
 
+    Returns:
+        Bone name → head, tail and roll after this pass, for the next pass
 
-def _validate_armature(armature: Object) -> None:
+    Raises:
+        ValueError: If a roll strategy is unknown
     """
-    Validate that the armature has the required bones for rigging.
-    
+    strategies = strategies or {}
+    unknown = set(strategies.values()) - {ROLL_GLOBAL_POS_Z, ROLL_HAND_PLANE}
+    if unknown:
+        raise ValueError(f"Unknown roll strategy: {', '.join(sorted(unknown))}")
+
+    rest = RestPose(armature)
+    names = list(rest.rows)
+    placement = np.hstack([rest.heads, rest.tails, rest.rolls[:, None]])
+    if since is None:
+        dirty = np.ones(len(names), dtype=bool)
+    else:
+        dirty = np.array([
+            name not in since or not np.array_equal(since[name], placement[row]) for row, name in enumerate(names)
+        ], dtype=bool)
+
+    hands = {}
+    for row, name in enumerate(names):
+        parts = parse_bone_name(name)
+        if strategies.get(parts['base']) != ROLL_HAND_PLANE:
+            continue
+        hand = rest.rows.get(f"{PREFIX_DEF}Hand{parts['side']}")
+        # bones without a hand on their side fall back to global +Z
+        if hand is not None:
+            hands[row] = hand
+
+    # global +Z expressed in armature space, as calculate_roll(type='GLOBAL_POS_Z') does
+    z_axis = np.array(armature.matrix_world.to_3x3().inverted_safe() @ Vector((0.0, 0.0, 1.0)))
+    global_rows = np.flatnonzero(dirty)
+    global_rows = global_rows[~np.isin(global_rows, list(hands))]
+    _align_rolls(rest, global_rows, z_axis)
+
+    # aligned after the global pass, so a hand rolled just now is followed
+    hand_rows = np.array([row for row, hand in hands.items() if dirty[row] or dirty[hand]], dtype=int)
+    if len(hand_rows):
+        hand_of = np.array([hands[row] for row in hand_rows])
+        hand_axes = bone_z_axes(rest.heads[hand_of], rest.tails[hand_of], rest.rolls[hand_of])
+        _align_rolls(rest, hand_rows, hand_axes)
+
+    rest.write()
+    return dict(zip(names, np.hstack([rest.heads, rest.tails, rest.rolls[:, None]]), strict=True))
+
+
+def _align_rolls(rest: RestPose, rows: np.ndarray, axes: np.ndarray) -> None:
+    """Roll the snapshot bones in ``rows`` so their Z axes point along ``axes``."""
+    if not len(rows):
+        return
+
+    rolls, valid = roll_to_align(rest.heads[rows], rest.tails[rows], axes)
+    rest.rolls[rows[valid]] = rolls[valid]
+
+
+def set_rotation_mode(armature: Object) -> None:
+    """
+    Change all pose bones to XYZ euler rotation mode.
+
     Args:
-        armature: Armature object to validate
-        
-    Raises:
-        ValueError: If required bones are missing
+        armature: Armature object to update
     """
-    required_bones = ['Body', 'Hip', 'Chest', 'Head', 'Neck']
-    edit_bones = armature.data.bones
-    
-    missing_bones = [bone for bone in required_bones if bone not in edit_bones]
-    
-    if missing_bones:
-        raise ValueError(
-            f"Armature is missing required bones: {', '.join(missing_bones)}. "
-            "Make sure this is a valid Poser FBX import."
-        )
+    for bone in armature.pose.bones:
+        bone.rotation_mode = ROTATION_MODE_XYZ
 
 
-def create_collections() -> None:
+def symmetrize_armature(armature: Object, index: BoneIndex = None) -> list[str]:
     """
-    Create bone collections to organize the rig hierarchy.
-    
-    Creates hierarchical collections for:
-    - Root (main rig controls)
-    - Face (facial controls)
-    - Body (limbs and spine)
-    - Rigging (deform and mechanism bones)
+    Mirror all left-side edit bones to the right side.
+
+    Constraints and other pose data of these bones are mirrored once out of edit
+    mode by ``mirror_pose_bones``.
+
+    Args:
+        armature: Armature object in edit mode
+        index: Index of the armature's bone names; created bones are added to it
+
+    Returns:
+        Names of the right-side bones that were updated or created
     """
-    collections = bpy.context.object.data.collections
-    collections.new('Root')
-    face_collection = collections.new('Face')
-    collections.new('Eyes CTRL', parent=face_collection)
-
-    body_collection = collections.new('Body')
-    spine_collection = collections.new('Spine', parent=body_collection)
-    collections.new('Spine IK', parent=spine_collection)
-    collections.new('Spine FK', parent=spine_collection)
-    collections.new('Spine CTRL', parent=spine_collection)
-
-    legs_collection = collections.new('Legs', parent=body_collection)
-    collections.new('Legs IK', parent=legs_collection)
-    collections.new('Legs FK', parent=legs_collection)
-    collections.new('Legs CTRL', parent=legs_collection)
-
-    arms_collection = collections.new('Arms', parent=body_collection)
-    collections.new('Arms IK', parent=arms_collection)
-    collections.new('Arms FK', parent=arms_collection)
-    collections.new('Arms CTRL', parent=arms_collection)
-
-    fingers_collection = collections.new('Fingers', parent=body_collection)
-    collections.new('Fingers IK', parent=fingers_collection)
-    collections.new('Fingers FK', parent=fingers_collection)
-    collections.new('Fingers IK CTRL', parent=fingers_collection)
-    collections.new('Fingers FK CTRL', parent=fingers_collection)
-
-    rigging_collection = collections.new('Rigging')
-    collections.new('DEF', parent=rigging_collection)
-    collections.new('MCH', parent=rigging_collection)
-
-
-def misc_bone_creation_cleanup() -> None:
+    return mirror_edit_bones(armature, index)
+
+
+def finalize_armature(armature: Object) -> None:
+    """
+    Hide bones animators don't need.
+
+    Args:
+        armature: The rigged armature object
+    """
+    # Hide buttock bones (not typically used for animation)
+    bones = armature.pose.bones
+    for side in ['.L', '.R']:
+        bones[f'FK-Buttock{side}'].hide = True
+        bones[f'IK-Buttock{side}'].hide = True
+
+
+def misc_bone_creation_cleanup(armature: Object) -> None:
     """
     Finalize bone positions, parenting, and colors after initial creation.
     
     Adjusts spine IK controls to proper positions and parents, and applies
     consistent color schemes to control bones.
+
+    Args:
+        armature: Armature object in edit mode
     """
-    edit_bones = bpy.context.object.data.edit_bones
-    
-    # Reposition and parent spine IK controls
+    edit_bones = armature.data.edit_bones
+
+    # Move spine IK controls to the tips of their deform bones
+    rest = RestPose(armature)
+    for control_name in ('LowerAbdomen', 'Chest', 'Head'):
+        rest.place(f'CTRL-IK-{control_name}', head=rest.tail(f'DEF-{control_name}'))
+    rest.write()
+
+    # Parent and color spine IK controls
     bone_ctrl_ik_lowerabdomen = edit_bones['CTRL-IK-LowerAbdomen']
-    bone_ctrl_ik_lowerabdomen.head = edit_bones['DEF-LowerAbdomen'].tail
     bone_ctrl_ik_lowerabdomen.parent = edit_bones['CTRL-Hip']
     assign_custom_color(bone_ctrl_ik_lowerabdomen, bright_green)
 
     bone_ctrl_ik_chest = edit_bones['CTRL-IK-Chest']
-    bone_ctrl_ik_chest.head = edit_bones['DEF-Chest'].tail
     bone_ctrl_ik_chest.parent = edit_bones['CTRL-Chest']
     assign_custom_color(bone_ctrl_ik_chest, bright_green)
 
     bone_ctrl_ik_head = edit_bones['CTRL-IK-Head']
-    bone_ctrl_ik_head.head = edit_bones['DEF-Head'].tail
     bone_ctrl_ik_head.parent = edit_bones['CTRL-Chest']
     bone_ctrl_ik_head.color.palette = 'CUSTOM'
     assign_custom_color(bone_ctrl_ik_head, bright_green)
@@ -262,7 +372,7 @@ def misc_bone_creation_cleanup() -> None:
         assign_custom_color(edit_bones[f'CTRL-IK-Pole-{pole_name}'], bright_blue)
 
 
-def create_spine_control_bones() -> None:
+def create_spine_control_bones(armature: Object) -> None:
     """
     Create main control bones for spine manipulation.
     
@@ -272,9 +382,13 @@ def create_spine_control_bones() -> None:
     - CTRL-Chest: Chest control (child of torso)
     
     These provide independent control over major body sections.
+
+    Args:
+        armature: Armature object in edit mode
     """
-    edit_bones = bpy.context.object.data.edit_bones
-    spine_ctrl_collection = bpy.context.object.data.collections_all.get('Spine CTRL')
+    edit_bones = armature.data.edit_bones
+    rest = RestPose(armature)
+    spine_ctrl_collection = armature.data.collections_all.get('Spine CTRL')
     root_bone = edit_bones['root']
 
     # Create main torso control
@@ -282,8 +396,8 @@ def create_spine_control_bones() -> None:
         edit_bones=edit_bones,
         name='CTRL-Torso',
         use_deform=False,
-        head=edit_bones['DEF-Hip'].head,
-        tail=edit_bones['DEF-LowerAbdomen'].tail,
+        head=rest.head('DEF-Hip'),
+        tail=rest.tail('DEF-LowerAbdomen'),
         palette='THEME09',
         display_type='OCTAHEDRAL',
         collection=spine_ctrl_collection,
@@ -294,8 +408,8 @@ def create_spine_control_bones() -> None:
     create_bone(
         edit_bones=edit_bones,
         name='CTRL-Hip',
-        head=edit_bones['DEF-Hip'].head,
-        tail=edit_bones['DEF-Hip'].tail,
+        head=rest.head('DEF-Hip'),
+        tail=rest.tail('DEF-Hip'),
         palette='THEME09',
         display_type='OCTAHEDRAL',
         parent=bone_ctrl_torso,
@@ -306,8 +420,8 @@ def create_spine_control_bones() -> None:
     create_bone(
         edit_bones=edit_bones,
         name='CTRL-Chest',
-        head=edit_bones['DEF-Chest'].head,
-        tail=edit_bones['DEF-Chest'].tail,
+        head=rest.head('DEF-Chest'),
+        tail=rest.tail('DEF-Chest'),
         palette='THEME09',
         display_type='OCTAHEDRAL',
         parent=bone_ctrl_torso,
@@ -315,23 +429,41 @@ def create_spine_control_bones() -> None:
     )
 
 
-def create_ik_control_bones(chain: list[LiteralString], collection:BoneCollection = None, side:str = '', pole_name:str = None,
+def build_ik_controls(armature: Object, compiled: dict) -> None:
+    """
+    Create the IK control and pole target bones listed in a compiled rig spec.
+
+    Args:
+        armature: Armature object in edit mode
+        compiled: Compiled rig from spec_compiler.compile_rig_spec()
+    """
+    collections = armature.data.collections_all
+    rest = RestPose(armature)
+    for control in compiled['ik_controls']:
+        settings = {key: value for key, value in control.items() if key != 'collection'}
+        create_ik_control_bones(armature, collection=collections.get(control['collection']), rest=rest, **settings)
+
+
+def create_ik_control_bones(armature: Object, chain: list[LiteralString], collection:BoneCollection = None, side:str = '', pole_name:str = None,
                             y_axis_position:float = 0.625, z_position_by:Literal['head', 'tail'] = 'tail',
                             control_color: Literal["DEFAULT", "THEME01", "THEME02", "THEME03", "THEME04", "THEME05", "THEME06", "THEME07", "THEME08", "THEME09", "THEME10", "THEME11", "THEME12", "THEME13", "THEME14", "THEME15", "THEME16", "THEME17", "THEME18", "THEME19", "THEME20", "CUSTOM"] = 'THEME01',
-                            pole_color: Literal["DEFAULT", "THEME01", "THEME02", "THEME03", "THEME04", "THEME05", "THEME06", "THEME07", "THEME08", "THEME09", "THEME10", "THEME11", "THEME12", "THEME13", "THEME14", "THEME15", "THEME16", "THEME17", "THEME18", "THEME19", "THEME20", "CUSTOM"] = 'THEME09'):
-    edit_bones = bpy.context.object.data.edit_bones
+                            pole_color: Literal["DEFAULT", "THEME01", "THEME02", "THEME03", "THEME04", "THEME05", "THEME06", "THEME07", "THEME08", "THEME09", "THEME10", "THEME11", "THEME12", "THEME13", "THEME14", "THEME15", "THEME16", "THEME17", "THEME18", "THEME19", "THEME20", "CUSTOM"] = 'THEME09',
+                            rest: RestPose = None):
+    edit_bones = armature.data.edit_bones
+    rest = rest or RestPose(armature)
     ctrl_prefix = 'CTRL'
     prefix = 'IK'
     ik_control_bone_name = ctrl_prefix + '-' + prefix + '-' + chain[0] + side
-    first_bone = edit_bones[prefix + '-' + chain[0] + side]
+    first_bone_name = prefix + '-' + chain[0] + side
+    first_head, first_tail = rest.head(first_bone_name), rest.tail(first_bone_name)
     ik_control_bone = create_bone(
         edit_bones=edit_bones,
         name=ik_control_bone_name,
-        head=first_bone.head,
-        tail=first_bone.tail,
-        bbone_size=first_bone.bbone_x * 2,
+        head=first_head,
+        tail=first_tail,
+        bbone_size=rest.bbone_size(first_bone_name) * 2,
         palette=control_color,
-        length=first_bone.length - 0.01
+        length=float(np.linalg.norm(first_tail - first_head)) - 0.01
     )
 
     if collection is not None:
@@ -340,18 +472,17 @@ def create_ik_control_bones(chain: list[LiteralString], collection:BoneCollectio
     # create a pole target bone based off second bone in chain, but rotate 90 degrees and move on Y-axis
     if pole_name is not None:
         ik_pole_bone_name = ctrl_prefix + '-' + prefix + '-Pole-' + pole_name + side
-        ik_pole_position_bone = edit_bones[prefix + '-' + chain[1] + side]
-
-        z_position = ik_pole_position_bone.tail[2]
-        if z_position_by == 'head':
-            z_position = ik_pole_position_bone.head[2]
+        ik_pole_position_bone_name = prefix + '-' + chain[1] + side
+        pole_head, pole_tail = pole_target(
+            rest.head(ik_pole_position_bone_name), rest.tail(ik_pole_position_bone_name), y_axis_position, z_position_by
+        )
 
         ik_pole_bone = create_bone(
             edit_bones=edit_bones,
             name=ik_pole_bone_name,
-            head=[ik_pole_position_bone.tail[0], y_axis_position - 0.125, z_position],
-            tail=[ik_pole_position_bone.tail[0], y_axis_position, z_position],
-            bbone_size=ik_pole_position_bone.bbone_x * 2,
+            head=pole_head,
+            tail=pole_tail,
+            bbone_size=rest.bbone_size(ik_pole_position_bone_name) * 2,
             parent=ik_control_bone,
             palette=pole_color,
         )
@@ -360,93 +491,7 @@ def create_ik_control_bones(chain: list[LiteralString], collection:BoneCollectio
             collection.assign(ik_pole_bone)
 
 
-def create_leg_fkik_chains() -> None:
-    """
-    Create FK and IK bone chains for legs.
-    
-    Generates parallel FK and IK chains for the leg bones, allowing
-    seamless switching between FK and IK animation modes.
-    """
-    legs_ik_collection = bpy.context.object.data.collections_all.get('Legs IK')
-    legs_fk_collection = bpy.context.object.data.collections_all.get('Legs FK')
-
-    # Leg bone chain from hip to toe
-    leg_fkik_bone_chain = [
-        'Buttock',
-        'Thigh',
-        'Shin',
-        'Foot',
-        'Toe',
-    ]
-
-    ik_chain = create_fkik_chains(leg_fkik_bone_chain, 'IK-Hip', 'IK', '.L', 'THEME01', 0.004)
-    fk_chain = create_fkik_chains(leg_fkik_bone_chain, 'FK-Hip', 'FK', '.L', 'THEME03', 0.002)
-
-    for ik_bone in ik_chain:
-        legs_ik_collection.assign(ik_bone)
-
-    for fk_bone in fk_chain:
-        legs_fk_collection.assign(fk_bone)
-
-
-def create_arm_fkik_chains() -> None:
-    """
-    Create FK and IK bone chains for arms.
-    
-    Generates parallel FK and IK chains for the arm bones, allowing
-    seamless switching between FK and IK animation modes.
-    """
-    arms_ik_collection = bpy.context.object.data.collections_all.get('Arms IK')
-    arms_fk_collection = bpy.context.object.data.collections_all.get('Arms FK')
-
-    # Arm bone chain from collar to hand
-    arm_fkik_bone_chain = [
-        'Collar',
-        'Shoulder',
-        'Forearm',
-        'Hand',
-    ]
-    ik_chain = create_fkik_chains(arm_fkik_bone_chain, 'IK-Chest', 'IK', '.L', 'THEME01', 0.004)
-    fk_chain = create_fkik_chains(arm_fkik_bone_chain, 'FK-Chest', 'FK', '.L', 'THEME03', 0.002)
-
-    for ik_bone in ik_chain:
-        arms_ik_collection.assign(ik_bone)
-
-    for fk_bone in fk_chain:
-        arms_fk_collection.assign(fk_bone)
-
-
-def create_spine_fkik_chains() -> None:
-    """
-    Create FK and IK bone chains for spine.
-    
-    Generates parallel FK and IK chains for the spine bones, allowing
-    seamless switching between FK and IK animation modes. Spine chains
-    run from hip to head.
-    """
-    spine_ik_collection = bpy.context.object.data.collections_all.get('Spine IK')
-    spine_fk_collection = bpy.context.object.data.collections_all.get('Spine FK')
-
-    # Complete spine chain from hip to head
-    spine_fkik_bone_chain = [
-        'Hip',
-        'LowerAbdomen',
-        'Abdomen',
-        'Chest',
-        'Neck',
-        'Head'
-    ]
-    ik_chain = create_fkik_chains(spine_fkik_bone_chain, 'root', 'IK', '', 'THEME09', 0.004)
-    fk_chain = create_fkik_chains(spine_fkik_bone_chain, 'root', 'FK', '', 'THEME04', 0.002)
-
-    for ik_bone in ik_chain:
-        spine_ik_collection.assign(ik_bone)
-
-    for fk_bone in fk_chain:
-        spine_fk_collection.assign(fk_bone)
-
-
-def fix_bones() -> None:
+def fix_bones(armature: Object) -> None:
     """
     Fix bone positions imported from Poser FBX.
     
@@ -454,34 +499,37 @@ def fix_bones() -> None:
     - Centers head and neck bones on X-axis
     - Aligns chest/neck junction
     - Extends eye and toe bones for better control
-    """
-    edit_bones = bpy.context.object.data.edit_bones
-    
-    # Center head bone on X-axis (also moves connected neck tail)
-    edit_bones['Head'].head.x = 0
 
-    # Align chest tail and neck head to their midpoint
-    chest_tail_y = edit_bones['Chest'].tail.y
-    chest_tail_z = edit_bones['Chest'].tail.z
-    neck_head_y = edit_bones['Neck'].head.y
-    neck_head_z = edit_bones['Neck'].head.z
-    center_y = (neck_head_y + chest_tail_y) / 2
-    center_z = (neck_head_z + chest_tail_z) / 2
-
-    edit_bones['Neck'].head.y = center_y
-    edit_bones['Neck'].head.z = center_z
-    edit_bones['Chest'].tail.y = center_y
-    edit_bones['Chest'].tail.z = center_z
-
-    # Extend eye bones forward for better control
-    eye_y = edit_bones['Left_Eye'].tail.y
-    edit_bones['Left_Eye'].tail.y = eye_y + EYE_BONE_EXTENSION
-    edit_bones['Right_Eye'].tail.y = eye_y + EYE_BONE_EXTENSION
-
-    # Extend toe bones forward for better foot roll control
-    toe_y = edit_bones['Left_Toe'].tail.y
-    edit_bones['Left_Toe'].tail.y = toe_y + TOE_BONE_EXTENSION
-    edit_bones['Right_Toe'].tail.y = toe_y + TOE_BONE_EXTENSION
+    Args:
+        armature: Armature object in edit mode
+    """
+    rest = RestPose(armature)
+
+    # Center head bone on X-axis (writing also moves the connected neck tail)
+    head = rest.head('Head')
+    head[0] = 0
+    rest.place('Head', head=head)
+
+    # Align chest tail and neck head to their midpoint on Y and Z
+    neck_head = rest.head('Neck')
+    chest_tail = rest.tail('Chest')
+    center = (neck_head + chest_tail) / 2
+    neck_head[1:] = chest_tail[1:] = center[1:]
+    rest.place('Neck', head=neck_head)
+    rest.place('Chest', tail=chest_tail)
+
+    # Extend eye and toe bones forward, both sides level with the left one
+    for left, right, extension in (
+        ('Left_Eye', 'Right_Eye', EYE_BONE_EXTENSION),
+        ('Left_Toe', 'Right_Toe', TOE_BONE_EXTENSION),
+    ):
+        forward_y = rest.tail(left)[1] + extension
+        for name in (left, right):
+            tail = rest.tail(name)
+            tail[1] = forward_y
+            rest.place(name, tail=tail)
+
+    rest.write()
 
 
 def create_pelvis_bones():
@@ -500,7 +548,7 @@ def create_pelvis_bones():
     pass
 
 
-def create_lower_abdomen_bone() -> None:
+def create_lower_abdomen_bone(armature: Object) -> None:
     """
     Create a LowerAbdomen deform bone between Hip and Abdomen.
     
@@ -509,8 +557,11 @@ def create_lower_abdomen_bone() -> None:
     
     Note: Weight painting for this bone must be done manually, blending
     with Hip and Abdomen weight groups.
+
+    Args:
+        armature: Armature object in edit mode
     """
-    edit_bones = bpy.context.object.data.edit_bones
+    edit_bones = armature.data.edit_bones
 
     # Check if LowerAbdomen bone already exists
     if edit_bones.find('LowerAbdomen') != -1:
@@ -0,0 +1,401 @@
+"""Watch-folder ingest service backed by warm, reusable Blender workers.
+
+Starting Blender, importing the add-on and reading the widget library costs several
+seconds per figure. The ingest service pays that once per worker: it keeps a few
+Blender processes running with the add-on, the FBX importer and, for specs that
+use the widget library, the WGTS widgets already loaded, and streams each new FBX in
+the drop folder to the next idle worker.
+
+Workers talk to the service over their stdin/stdout pipes with one JSON message per
+line. Each finished job is appended to a JSON-lines log with its queue wait and
+end-to-end latency. Ctrl+C (or SIGTERM) stops watching and drains the queue; a second
+Ctrl+C abandons jobs that have not started yet.
+
+Usage::
+
+    blender -b --factory-startup --python cli.py -- ingest DROP_DIR -o OUTPUT_DIR [-j WORKERS]
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TextIO
+
+import bpy
+
+from .batch import CLI_SCRIPT, FBX_SUFFIX, enable_fbx_importer, reset_data, rig_fbx
+from .constants import WIDGET_SOURCE_LIBRARY
+from .custom_shapes import cache_widget_library
+from .rig_spec import POSER_RIG_SPEC
+from .rig_template import RigTemplates
+
+# Marks protocol lines on a worker's stdout, which may also carry Blender's own output
+MESSAGE_PREFIX = '@@poser-rig@@ '
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_RECYCLE_AFTER = 50
+WORKER_STOP_TIMEOUT = 30.0
+
+
+def send_message(stream: TextIO, message: dict | None) -> None:
+    """
+    Write one protocol message to a pipe.
+
+    Args:
+        stream: Pipe to write to
+        message: JSON-serializable message, or None to ask a worker to exit
+    """
+    # the leading newline terminates any partial line Blender left on the same pipe
+    stream.write('\n' + MESSAGE_PREFIX + json.dumps(message) + '\n')
+    stream.flush()
+
+
+def receive_message(stream: TextIO) -> dict | None:
+    """
+    Read the next protocol message from a pipe, skipping any other output.
+
+    Args:
+        stream: Pipe to read from
+
+    Returns:
+        The decoded message
+
+    Raises:
+        EOFError: If the other side closed the pipe
+    """
+    while True:
+        line = stream.readline()
+        if not line:
+            raise EOFError("Pipe closed")
+
+        if line.startswith(MESSAGE_PREFIX):
+            return json.loads(line[len(MESSAGE_PREFIX):])
+
+
+class WarmWorker:
+    """A Blender process that stays alive between ingest jobs."""
+
+    def __init__(self, blender: str, threads: int, recycle_after: int, templates: Path | None = None):
+        self.blender = blender
+        self.threads = threads
+        self.recycle_after = recycle_after
+        self.templates = templates
+        self.process = None
+        self.jobs_done = 0
+        self.startup_time = 0.0
+
+    def start(self) -> None:
+        """Start the Blender process and wait until it has warmed up."""
+        command = [
+            self.blender, '-b', '--factory-startup', '--threads', str(self.threads),
+            '--python', str(CLI_SCRIPT), '--', 'ingest-worker',
+        ]
+        if self.templates is not None:
+            command += ['--templates', str(self.templates)]
+        start = time.perf_counter()
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        receive_message(self.process.stdout)  # ready
+        self.startup_time = time.perf_counter() - start
+        self.jobs_done = 0
+
+    def stop(self) -> None:
+        """Ask the Blender process to exit, killing it if it does not."""
+        if self.process is None:
+            return
+
+        try:
+            send_message(self.process.stdin, None)
+            self.process.wait(timeout=WORKER_STOP_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def run(self, job: dict) -> dict:
+        """
+        Rig one figure on this worker, restarting the process if needed.
+
+        Args:
+            job: Job with ``fbx`` and ``output`` paths
+
+        Returns:
+            The worker's result record
+
+        Raises:
+            EOFError: If the worker died while rigging
+            OSError: If the worker's pipe broke
+        """
+        if self.process is None or self.process.poll() is not None or self.jobs_done >= self.recycle_after:
+            self.stop()
+            self.start()
+
+        try:
+            send_message(self.process.stdin, {'fbx': job['fbx'], 'output': job['output']})
+            record = receive_message(self.process.stdout)
+        except (EOFError, OSError):
+            self.stop()
+            raise
+
+        self.jobs_done += 1
+        return record
+
+
+def worker_main(argv: list[str]) -> int:
+    """
+    Serve rigging jobs over stdin/stdout until told to stop (``ingest-worker`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog='ingest-worker', description="Serve rigging jobs for the ingest service.")
+    parser.add_argument('--templates', type=Path, default=None, help="Directory of template rigs to fit from")
+    args = parser.parse_args(argv)
+    templates = RigTemplates(args.templates) if args.templates is not None else None
+
+    # keep the real stdout for protocol messages and send everything else printed to stderr
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    enable_fbx_importer()
+    if POSER_RIG_SPEC['widgets'] == WIDGET_SOURCE_LIBRARY:
+        cache_widget_library()
+    reset_data()
+    send_message(protocol, {'ready': True, 'pid': os.getpid()})
+
+    while True:
+        try:
+            job = receive_message(sys.stdin)
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        send_message(protocol, rig_fbx(Path(job['fbx']), Path(job['output']), templates=templates))
+
+    return 0
+
+
+def scan_drop_folder(drop_dir: Path) -> dict[Path, tuple[int, int]]:
+    """
+    List the FBX files in the drop folder.
+
+    Args:
+        drop_dir: Folder to scan recursively
+
+    Returns:
+        Mapping of FBX path to ``(size, mtime_ns)``
+    """
+    files = {}
+    for path in drop_dir.rglob('*'):
+        if path.suffix.lower() != FBX_SUFFIX:
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # removed while scanning
+        files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def _serve_jobs(worker: WarmWorker, jobs: queue.Queue, log: TextIO, log_lock: threading.Lock) -> None:
+    """
+    Feed queued jobs to one worker until a None sentinel arrives.
+
+    Args:
+        worker: Worker to run jobs on
+        jobs: Queue of pending jobs
+        log: JSON-lines log the result records are appended to
+        log_lock: Lock serializing writes to the log
+    """
+    try:
+        worker.start()
+        print(f"Worker {worker.process.pid} ready in {worker.startup_time:.1f}s")
+    except (EOFError, OSError) as e:
+        print(f"Worker failed to start, retrying on the first job: {e}", file=sys.stderr)
+        worker.stop()
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            jobs.task_done()
+            break
+
+        started_at = time.time()
+        try:
+            record = worker.run(job)
+        except (EOFError, OSError) as e:
+            record = {
+                'fbx': job['fbx'],
+                'output': job['output'],
+                'status': 'error',
+                'error': f"Worker died while rigging: {type(e).__name__}: {e}",
+                'timings': {},
+            }
+
+        finished_at = time.time()
+        record['timings']['queue_wait'] = started_at - job['detected_at']
+        record['timings']['latency'] = finished_at - job['detected_at']
+        record['finished_at'] = finished_at
+
+        with log_lock:
+            log.write(json.dumps(record) + '\n')
+            log.flush()
+        print(f"{record['status']}: {record['fbx']} ({record['timings']['latency']:.2f}s latency)")
+        jobs.task_done()
+
+    worker.stop()
+
+
+def run_ingest(
+    drop_dir: Path,
+    output_dir: Path,
+    log_path: Path,
+    blender: str,
+    workers: int,
+    threads: int = 1,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    recycle_after: int = DEFAULT_RECYCLE_AFTER,
+    once: bool = False,
+    templates: Path | None = None,
+) -> int:
+    """
+    Watch a drop folder and rig every new or changed FBX file on warm workers.
+
+    A file is queued once its size and modification time are unchanged between two
+    polls, so exports that are still being written are not picked up. Files whose
+    rigged output is already newer than the FBX are skipped.
+
+    Args:
+        drop_dir: Folder to watch
+        output_dir: Directory for rigged .blend files
+        log_path: JSON-lines file that result records are appended to
+        blender: Path to the Blender executable used for workers
+        workers: Number of warm workers
+        threads: Number of threads per worker Blender
+        poll_interval: Seconds between drop folder scans
+        recycle_after: Restart a worker after this many jobs to bound memory growth
+        once: Ingest the files present at start-up, then drain and exit
+        templates: Directory of template rigs to fit same-skeleton figures from, or None
+
+    Returns:
+        Number of jobs that were queued
+    """
+    stop = threading.Event()
+    abandon = threading.Event()
+
+    def handle_signal(_signum, _frame):
+        if stop.is_set():
+            abandon.set()
+        stop.set()
+
+    previous_handlers = {sig: signal.signal(sig, handle_signal) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    jobs = queue.Queue()
+    log_lock = threading.Lock()
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    queued = 0
+    seen = {}
+    previous_scan = {}
+
+    with log_path.open('a', encoding='utf-8') as log:
+        pool = [WarmWorker(blender, threads, recycle_after, templates) for _ in range(workers)]
+        servers = [
+            threading.Thread(target=_serve_jobs, args=(worker, jobs, log, log_lock), daemon=True)
+            for worker in pool
+        ]
+        for server in servers:
+            server.start()
+        print(f"Watching {drop_dir} with {workers} warm workers, Ctrl+C to drain and stop")
+
+        while not stop.is_set():
+            scan = scan_drop_folder(drop_dir)
+            for fbx_path, state in scan.items():
+                if seen.get(fbx_path) == state:
+                    continue
+
+                output_path = output_dir / fbx_path.relative_to(drop_dir).with_suffix('.blend')
+                if output_path.exists() and output_path.stat().st_mtime_ns >= state[1]:
+                    seen[fbx_path] = state  # rigged by an earlier run
+                    continue
+
+                if not once and previous_scan.get(fbx_path) != state:
+                    continue  # still being written, check again on the next poll
+
+                seen[fbx_path] = state
+                jobs.put({'fbx': str(fbx_path), 'output': str(output_path), 'detected_at': time.time()})
+                queued += 1
+
+            previous_scan = scan
+            if once:
+                break
+            stop.wait(poll_interval)
+
+        # drain: wait for queued jobs unless asked to abandon them
+        while jobs.unfinished_tasks and not abandon.is_set():
+            time.sleep(0.1)
+        if abandon.is_set():
+            while True:
+                try:
+                    jobs.get_nowait()
+                except queue.Empty:
+                    break
+                jobs.task_done()
+
+        for _ in pool:
+            jobs.put(None)
+        for server in servers:
+            server.join()
+
+    for sig, handler in previous_handlers.items():
+        signal.signal(sig, handler)
+    return queued
+
+
+def main(argv: list[str]) -> int:
+    """
+    Run the watch-folder ingest service (``ingest`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog='ingest', description="Rig FBX files dropped into a folder.")
+    parser.add_argument('drop_dir', type=Path, help="Folder to watch for FBX exports")
+    parser.add_argument('-o', '--output', type=Path, required=True, help="Directory for rigged .blend files")
+    parser.add_argument('-j', '--workers', type=int, default=2, help="Warm worker processes")
+    parser.add_argument('--threads', type=int, default=1, help="Threads per worker Blender")
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL_INTERVAL, help="Seconds between folder scans")
+    parser.add_argument(
+        '--recycle', type=int, default=DEFAULT_RECYCLE_AFTER, help="Restart a worker after this many jobs"
+    )
+    parser.add_argument('--once', action='store_true', help="Ingest the current files, then drain and exit")
+    parser.add_argument('--log', type=Path, default=None, help="JSON-lines result log (default: OUTPUT/ingest.jsonl)")
+    parser.add_argument('--blender', default=bpy.app.binary_path, help="Blender executable for workers")
+    parser.add_argument(
+        '--templates', type=Path, default=None, help="Directory of template rigs to fit same-skeleton figures from"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.drop_dir.is_dir():
+        print(f"Drop folder not found: {args.drop_dir}", file=sys.stderr)
+        return 2
+
+    log_path = args.log or args.output / 'ingest.jsonl'
+    queued = run_ingest(
+        args.drop_dir, args.output, log_path, args.blender, max(1, args.workers),
+        args.threads, args.poll, max(1, args.recycle), args.once, args.templates,
+    )
+    print(f"Stopped after queuing {queued} figures, log: {log_path}")
+    return 0
@@ -0,0 +1,240 @@
+"""Left-to-right mirroring of rig bones through the data API.
+
+A replacement for ``bpy.ops.armature.symmetrize`` that needs no operator context:
+every ``.L`` bone is mirrored across the X axis onto its ``.R`` counterpart, which is
+created if missing. Edit-bone data is mirrored inside the edit session, with heads,
+tails and rolls of all bones read and written in one array pass; pose data
+(constraints, locks, custom shapes) afterwards in object mode.
+"""
+
+import math
+
+import bpy
+import numpy as np
+from bpy.types import ArmatureEditBones, Constraint, EditBone, Object, PoseBone
+
+from .bone_index import BoneIndex
+from .constants import SUFFIX_LEFT, SUFFIX_RIGHT
+
+# Edit-bone settings copied onto newly created mirror bones
+MIRRORED_EDIT_BONE_PROPERTIES = (
+    'use_deform', 'bbone_x', 'bbone_z', 'display_type', 'envelope_distance', 'head_radius', 'tail_radius',
+    'inherit_scale', 'use_inherit_rotation', 'use_local_location', 'use_relative_parent', 'hide', 'lock',
+)
+# Pose-bone settings copied onto mirror bones
+MIRRORED_POSE_BONE_PROPERTIES = (
+    'rotation_mode', 'lock_location', 'lock_rotation', 'lock_rotation_w', 'lock_rotations_4d', 'lock_scale',
+    'custom_shape_scale_xyz', 'custom_shape_rotation_euler', 'use_custom_shape_bone_size', 'ik_stretch',
+    'lock_ik_x', 'lock_ik_y', 'lock_ik_z',
+)
+# Constraint properties naming bones of the owning armature
+SUBTARGET_PROPERTIES = ('subtarget', 'pole_subtarget')
+# Transformation constraint property suffix per mapped channel, and the axes a mirror across X flips
+TRANSFORM_CHANNELS = {'LOCATION': ('', 'x'), 'ROTATION': ('_rot', 'yz'), 'SCALE': ('_scale', '')}
+# Per-axis scale of a point mirrored across the X axis
+MIRROR_X = np.array([-1.0, 1.0, 1.0], dtype=np.float32)
+
+
+def flip_side_name(name: str) -> str:
+    """
+    Swap the side suffix of a bone or widget name.
+
+    Args:
+        name: Name ending in ``.L`` or ``.R``
+
+    Returns:
+        The name for the other side, or the name unchanged if it has no side
+    """
+    if name.endswith(SUFFIX_LEFT):
+        return name[:-len(SUFFIX_LEFT)] + SUFFIX_RIGHT
+    if name.endswith(SUFFIX_RIGHT):
+        return name[:-len(SUFFIX_RIGHT)] + SUFFIX_LEFT
+    return name
+
+
+def mirror_edit_bones(armature: Object, index: BoneIndex = None) -> list[str]:
+    """
+    Mirror every left-side edit bone onto the right side.
+
+    Right-side bones are created if missing, then every one of them gets its left
+    counterpart's settings, color and bone collections, and is moved to mirror it.
+
+    Args:
+        armature: Armature object in edit mode
+        index: Index of the armature's bone names, built if not given; created bones are added to it
+
+    Returns:
+        Names of the right-side bones that were updated or created
+    """
+    edit_bones = armature.data.edit_bones
+    index = index or BoneIndex(bone.name for bone in edit_bones)
+    pairs = []
+    for name in index.on_side(SUFFIX_LEFT):
+        mirror_name = flip_side_name(name)
+        mirror = edit_bones.get(mirror_name)
+        if mirror is None:
+            mirror = edit_bones.new(mirror_name)
+            index.add(mirror_name)
+        pairs.append((edit_bones[name], mirror))
+
+    for bone, mirror in pairs:
+        mirror.use_connect = False
+        _copy_edit_bone_settings(bone, mirror)
+
+    _mirror_bone_transforms(edit_bones, pairs)
+
+    # parent once every mirror exists, so chains can point at mirrored parents
+    for bone, mirror in pairs:
+        mirror.parent = _mirrored_parent(edit_bones, bone)
+        mirror.use_connect = bone.use_connect
+
+    return [mirror.name for _, mirror in pairs]
+
+
+def _mirror_bone_transforms(edit_bones: ArmatureEditBones, pairs: list[tuple[EditBone, EditBone]]) -> None:
+    """Set the head, tail and roll of every mirror bone from its source bone in one array pass."""
+    if not pairs:
+        return
+
+    positions = {bone.name: position for position, bone in enumerate(edit_bones)}
+    sources = np.array([positions[bone.name] for bone, _ in pairs])
+    targets = np.array([positions[mirror.name] for _, mirror in pairs])
+
+    for attribute in ('head', 'tail'):
+        points = np.empty(len(edit_bones) * 3, dtype=np.float32)
+        edit_bones.foreach_get(attribute, points)
+        points = points.reshape(-1, 3)
+        points[targets] = points[sources] * MIRROR_X
+        edit_bones.foreach_set(attribute, points.ravel())
+
+    rolls = np.empty(len(edit_bones), dtype=np.float32)
+    edit_bones.foreach_get('roll', rolls)
+    rolls[targets] = -rolls[sources]
+    edit_bones.foreach_set('roll', rolls)
+
+
+def _copy_edit_bone_settings(source: EditBone, target: EditBone) -> None:
+    """Copy display, deform and inheritance settings, color and collections to a mirror bone."""
+    for property_name in MIRRORED_EDIT_BONE_PROPERTIES:
+        setattr(target, property_name, getattr(source, property_name))
+
+    target.color.palette = source.color.palette
+    if source.color.palette == 'CUSTOM':
+        target.color.custom.normal = source.color.custom.normal
+        target.color.custom.select = source.color.custom.select
+        target.color.custom.active = source.color.custom.active
+
+    source_collections = set(source.collections)
+    for collection in list(target.collections):
+        if collection not in source_collections:
+            collection.unassign(target)
+    for collection in source_collections:
+        collection.assign(target)
+
+
+def _mirrored_parent(edit_bones: ArmatureEditBones, bone: EditBone) -> EditBone | None:
+    """Return the mirror of a bone's parent, or the parent itself if it has no other side."""
+    if bone.parent is None:
+        return None
+    return edit_bones.get(flip_side_name(bone.parent.name)) or bone.parent
+
+
+def mirror_pose_bones(armature: Object, bone_names: list[str]) -> None:
+    """
+    Replace the pose data of right-side bones with mirrored left-side pose data.
+
+    Copies locks, rotation mode, IK settings, custom shapes and constraints. Constraint
+    subtargets and custom shapes switch to their right-side counterparts where those
+    exist, and side-dependent constraint settings are mirrored across the X axis. This
+    is how right-side bones get their widgets; they are not assigned separately.
+
+    Args:
+        armature: Armature object whose edit bones have been mirrored
+        bone_names: Right-side bones to update, as returned by ``mirror_edit_bones``
+    """
+    pose_bones = armature.pose.bones
+    for name in bone_names:
+        mirror = pose_bones.get(name)
+        bone = pose_bones.get(flip_side_name(name))
+        if mirror is None or bone is None:
+            continue
+
+        for property_name in MIRRORED_POSE_BONE_PROPERTIES:
+            setattr(mirror, property_name, getattr(bone, property_name))
+        _mirror_custom_shape(pose_bones, bone, mirror)
+
+        mirror.constraints.clear()
+        for constraint in bone.constraints:
+            _mirror_constraint(armature, mirror.constraints.copy(constraint))
+
+
+def _mirror_custom_shape(pose_bones, source: PoseBone, target: PoseBone) -> None:
+    """Give a mirror bone the other side's widget and transform override, if they exist."""
+    shape = source.custom_shape
+    if shape is not None:
+        shape = bpy.data.objects.get(flip_side_name(shape.name), shape)
+    target.custom_shape = shape
+
+    override = source.custom_shape_transform
+    if override is not None:
+        override = pose_bones.get(flip_side_name(override.name), override)
+    target.custom_shape_transform = override
+
+    translation = source.custom_shape_translation
+    target.custom_shape_translation = (-translation[0], translation[1], translation[2])
+
+
+def _mirror_constraint(armature: Object, constraint: Constraint) -> None:
+    """Point a copied constraint at right-side bones and mirror its side-dependent settings."""
+    bones = armature.data.bones
+    for property_name in SUBTARGET_PROPERTIES:
+        target_property = 'pole_target' if property_name == 'pole_subtarget' else 'target'
+        subtarget = getattr(constraint, property_name, '')
+        if subtarget and getattr(constraint, target_property, None) == armature:
+            mirrored = flip_side_name(subtarget)
+            if mirrored in bones:
+                setattr(constraint, property_name, mirrored)
+
+    if constraint.type == 'IK' and constraint.pole_target is not None:
+        angle = -math.pi - constraint.pole_angle
+        constraint.pole_angle = math.atan2(math.sin(angle), math.cos(angle))
+    elif constraint.type == 'LIMIT_ROTATION':
+        for axis in 'yz':
+            minimum = getattr(constraint, f'min_{axis}')
+            setattr(constraint, f'min_{axis}', -getattr(constraint, f'max_{axis}'))
+            setattr(constraint, f'max_{axis}', -minimum)
+    elif constraint.type == 'LIMIT_LOCATION':
+        minimum = constraint.min_x
+        constraint.min_x, constraint.max_x = -constraint.max_x, -minimum
+        constraint.use_min_x, constraint.use_max_x = constraint.use_max_x, constraint.use_min_x
+    elif constraint.type == 'TRANSFORM':
+        _mirror_transformation_constraint(constraint)
+
+
+def _mirror_transformation_constraint(constraint: Constraint) -> None:
+    """
+    Mirror a Transformation constraint's ranges across the X axis.
+
+    X location and Y/Z rotation change sign. A negated source range is swapped back into
+    min/max order, and every destination axis mapped from it is swapped with it so the
+    mapping between the two ranges is preserved.
+    """
+    from_suffix, from_flipped = TRANSFORM_CHANNELS[constraint.map_from]
+    to_suffix, to_flipped = TRANSFORM_CHANNELS[constraint.map_to]
+
+    for axis in to_flipped:
+        for bound in ('min', 'max'):
+            name = f'to_{bound}_{axis}{to_suffix}'
+            setattr(constraint, name, -getattr(constraint, name))
+
+    for axis in from_flipped:
+        minimum = getattr(constraint, f'from_min_{axis}{from_suffix}')
+        setattr(constraint, f'from_min_{axis}{from_suffix}', -getattr(constraint, f'from_max_{axis}{from_suffix}'))
+        setattr(constraint, f'from_max_{axis}{from_suffix}', -minimum)
+
+        for to_axis in 'xyz':
+            if getattr(constraint, f'map_to_{to_axis}_from') != axis.upper():
+                continue
+            minimum = getattr(constraint, f'to_min_{to_axis}{to_suffix}')
+            setattr(constraint, f'to_min_{to_axis}{to_suffix}', getattr(constraint, f'to_max_{to_axis}{to_suffix}'))
+            setattr(constraint, f'to_max_{to_axis}{to_suffix}', minimum)
@@ -1,7 +1,15 @@
-"""Operators for the Poser Auto-Rigger add-on."""
+"""Operators for the Poser Auto-Rigger add-on.
+
+Only the operator shell is imported at registration. The rig generation modules are
+imported on first execute, so enabling the add-on and starting Blender stay fast.
+"""
+
+from pathlib import Path
 
 import bpy
-from .generate_base_rig import setup_poser_figure
+from bpy.props import BoolProperty, StringProperty
+
+from .constants import PROFILE_TEXT_NAME
 
 
 class OT_GenerateBaseRig_Operator(bpy.types.Operator):
@@ -12,17 +20,76 @@ class OT_GenerateBaseRig_Operator(bpy.types.Operator):
     bl_description = "Generate animation-ready control rig with IK/FK chains, custom shapes, and constraints"
     bl_options = {'REGISTER', 'UNDO'}
 
+    profile: BoolProperty(
+        name="Profile",
+        description=f"Time each generation stage and count operator calls, reported in the '{PROFILE_TEXT_NAME}' text",
+        default=False,
+    )
+    profile_python: BoolProperty(
+        name="Python Profile",
+        description="Also run cProfile and append its top functions to the report",
+        default=False,
+    )
+    profile_log: StringProperty(
+        name="Profile Log",
+        description="JSON-lines file each profiled run is appended to (optional)",
+        subtype='FILE_PATH',
+        default="",
+    )
+
     @classmethod
     def poll(cls, context):
         """Check if the operator can be executed."""
         return context.active_object is not None and context.active_object.type == 'ARMATURE'
 
     def execute(self, context):
-        """Execute the rig generation process."""
+        """Execute the rig generation process, or update a rig generated before."""
+        from .generate_base_rig import setup_poser_figure
+        from .profiler import profile_setup_poser_figure
+        from .regenerate import regenerate_poser_figure
+        from .rig_manifest import is_generated_rig
+
+        if context.active_object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
         try:
-            setup_poser_figure(context.active_object)
-            self.report({'INFO'}, "Base rig generated successfully")
+            if is_generated_rig(context.active_object):
+                report = regenerate_poser_figure(context.active_object)
+                self.report(
+                    {'INFO'},
+                    f"Rig regenerated: {len(report['created'])} created, {len(report['updated'])} updated, "
+                    f"{len(report['deleted'])} deleted, {len(report['kept'])} hand-edited items kept",
+                )
+                if self.profile:
+                    self.report(
+                        {'WARNING'},
+                        "Profiling only covers full generation and was skipped: this rig was regenerated in place",
+                    )
+            elif self.profile:
+                log_path = Path(bpy.path.abspath(self.profile_log)) if self.profile_log else None
+                record = profile_setup_poser_figure(context.active_object, log_path, self.profile_python)
+                self._report_generation(
+                    f"Base rig generated in {record['total_seconds']:.2f}s "
+                    f"(see the '{PROFILE_TEXT_NAME}' text for the stage breakdown)",
+                    record['generation'],
+                )
+            else:
+                generation = setup_poser_figure(context.active_object)
+                self._report_generation("Base rig generated successfully", generation)
+
+            # hand the finished rig over ready for posing
+            bpy.ops.object.mode_set(mode='POSE')
             return {'FINISHED'}
         except Exception as e:
             self.report({'ERROR'}, f"Failed to generate rig: {str(e)}")
             return {'CANCELLED'}
+
+    def _report_generation(self, summary: str, generation: dict) -> None:
+        """Report a generation run with its pruned constraints, and warn about each bone rename conflict."""
+        self.report(
+            {'INFO'},
+            f"{summary}, {len(generation['removed'])} no-op constraints pruned "
+            f"(~{generation['estimated_saving']:.0%} fewer constraint evaluations)",
+        )
+        for conflict in generation['rename_conflicts']:
+            self.report({'WARNING'}, f"Bone '{conflict['bone']}' {conflict['reason']}")
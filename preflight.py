@@ -0,0 +1,95 @@
+"""Pre-flight check of an imported figure, run before rig generation touches the scene.
+
+The bones the generator needs are derived from the compiled rig spec: every chain bone
+on both sides, plus the bones the bespoke modules read (see ``rig_spec.SOURCE_BONES``).
+The figure's bone names are compared with them in one pass of set operations, so a
+figure that cannot be rigged is rejected before any transform is applied, widget is
+loaded or bone is created, with every problem reported at once.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+
+from bpy.types import Object
+
+from .bone_index import parse_bone_name
+from .bone_rename import rename_bone
+from .constants import BONE_PROPERTIES, BONE_ROOT, SUFFIX_LEFT, SUFFIX_RIGHT
+
+# Poser FBX side prefixes, as rename_bone() reads them
+POSER_SIDE_PREFIXES = {SUFFIX_LEFT: 'Left_', SUFFIX_RIGHT: 'Right_'}
+
+
+def poser_bone_name(name: str) -> str:
+    """
+    Name a bone the way the Poser FBX export does, e.g. ``'Hand.L'`` gives ``'Left_Hand'``.
+
+    Args:
+        name: Bone name with an optional ``.L``/``.R`` suffix
+
+    Returns:
+        Poser bone name
+    """
+    for suffix, prefix in POSER_SIDE_PREFIXES.items():
+        if name.endswith(suffix):
+            return prefix + name[:-len(suffix)]
+    return name
+
+
+def preflight_report(bone_names: Iterable[str], compiled: dict, bone_map: dict[str, str] = None) -> dict:
+    """
+    Compare a figure's bones with the bones the generator needs.
+
+    Args:
+        bone_names: Bone names of the imported figure
+        compiled: Compiled rig spec, see spec_compiler.compile_rig_spec()
+        bone_map: Renames the figure profile will apply, see ``figure_profiles``
+
+    Returns:
+        Mapping with ``missing`` (Poser names of required bones the figure lacks) and
+        ``unexpected`` (figure bones that clash with each other or with generated bones)
+    """
+    bone_map = bone_map or {}
+    renamed = {name: rename_bone(name) or name for name in bone_names}
+    renamed = {name: bone_map.get(new_name, new_name) for name, new_name in renamed.items()}
+    counts = Counter(renamed.values())
+
+    missing = set(compiled['source_bones']) - counts.keys()
+    # two figure bones that end up with the same name, e.g. 'Left_Hand' and 'lHand'
+    unexpected = {name for name, new_name in renamed.items() if counts[new_name] > 1}
+    # bones named like generated ones: the figure has already been rigged
+    unexpected.update(
+        name for name, new_name in renamed.items()
+        if new_name in (BONE_ROOT, BONE_PROPERTIES) or parse_bone_name(new_name)['prefix']
+    )
+
+    return {
+        'missing': sorted(poser_bone_name(name) for name in missing),
+        'unexpected': sorted(unexpected),
+    }
+
+
+def validate_armature(armature: Object, compiled: dict, bone_map: dict[str, str] = None) -> None:
+    """
+    Check that an armature can be rigged, before anything is changed.
+
+    Args:
+        armature: Imported Poser armature object
+        compiled: Compiled rig spec, see spec_compiler.compile_rig_spec()
+        bone_map: Renames the figure profile will apply, see ``figure_profiles``
+
+    Raises:
+        ValueError: If required bones are missing or figure bones clash, listing all of them
+    """
+    report = preflight_report(armature.data.bones.keys(), compiled, bone_map)
+    problems = []
+    if report['missing']:
+        problems.append(f"missing required bones: {', '.join(report['missing'])}")
+    if report['unexpected']:
+        problems.append(f"unexpected bones: {', '.join(report['unexpected'])}")
+
+    if problems:
+        raise ValueError(
+            f"Armature {armature.name} cannot be rigged, {'; '.join(problems)}. "
+            "Make sure this is a valid, unrigged Poser FBX import."
+        )
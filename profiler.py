@@ -0,0 +1,299 @@
+"""Opt-in per-stage profiling of rig generation.
+
+Every function that :func:`setup_poser_figure` calls is treated as a stage. While
+profiling, those functions are temporarily wrapped so each call is timed, and
+``bpy.ops`` is temporarily hooked so operator calls and mode toggles are counted
+against the stage that made them. Context managers it calls, such as ``edit_mode``,
+are *sessions*: their whole ``with`` block is timed as a stage, including entering
+and leaving it. A stage's ``seconds`` leave out the stages nested in it, so they add
+up to the total; ``inclusive_seconds`` count them. The run can also be wrapped in cProfile.
+
+Results are written to a Blender text datablock and, optionally, appended as one
+JSON record per run to a JSON-lines file.
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import json
+import pstats
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from types import ModuleType
+
+import bpy
+from bpy.types import Object
+
+from . import generate_base_rig
+from .cache import get_addon_version
+from .constants import PROFILE_TEXT_NAME
+
+# time and operators spent in setup_poser_figure itself, outside of any stage
+UNSTAGED = '(setup_poser_figure)'
+MODE_TOGGLE_OPERATORS = {'object.editmode_toggle', 'object.posemode_toggle', 'object.mode_set'}
+CPROFILE_TOP_FUNCTIONS = 40
+
+
+def rig_statistics(armature: Object) -> dict[str, int]:
+    """
+    Count the bones, constraints and drivers of a rigged armature.
+
+    Args:
+        armature: Armature object to inspect
+
+    Returns:
+        Dictionary with ``bones``, ``constraints`` and ``drivers`` counts
+    """
+    animation_data = armature.animation_data
+    return {
+        'bones': len(armature.data.bones),
+        'constraints': sum(len(bone.constraints) for bone in armature.pose.bones),
+        'drivers': len(animation_data.drivers) if animation_data else 0,
+    }
+
+
+def _is_context_manager(function: Callable) -> bool:
+    """Tell whether a function is a ``@contextmanager`` factory."""
+    return inspect.isgeneratorfunction(inspect.unwrap(function))
+
+
+def _pipeline_functions(function: Callable) -> dict[str, Callable]:
+    """Return the module-level functions a pipeline function calls, in order of appearance."""
+    module = inspect.getmodule(function)
+    return {
+        name: value for name in dict.fromkeys(function.__code__.co_names)
+        if inspect.isfunction(value := getattr(module, name, None))
+    }
+
+
+def pipeline_stages(function: Callable = generate_base_rig.setup_poser_figure) -> list[str]:
+    """
+    List the stages of the generation pipeline.
+
+    Args:
+        function: Pipeline function whose direct calls are the stages
+
+    Returns:
+        Names of the module-level functions the pipeline function calls, in order of appearance,
+        without context managers (see pipeline_sessions())
+    """
+    return [name for name, value in _pipeline_functions(function).items() if not _is_context_manager(value)]
+
+
+def pipeline_sessions(function: Callable = generate_base_rig.setup_poser_figure) -> list[str]:
+    """
+    List the context managers of the generation pipeline, such as ``edit_mode``.
+
+    Args:
+        function: Pipeline function whose direct calls are the stages
+
+    Returns:
+        Names of the module-level context managers the pipeline function calls
+    """
+    return [name for name, value in _pipeline_functions(function).items() if _is_context_manager(value)]
+
+
+class RigProfiler:
+    """Collects time, operator calls and mode toggles per pipeline stage."""
+
+    def __init__(self):
+        self.stages = {}
+        # [stage name, seconds spent in stages nested in it] per running stage, innermost last
+        self._active = []
+
+    def _stage_stats(self, name: str) -> dict:
+        """Return the statistics entry for a stage, creating it on first use."""
+        if name not in self.stages:
+            self.stages[name] = {'calls': 0, 'seconds': 0.0, 'inclusive_seconds': 0.0, 'ops': 0, 'mode_toggles': 0}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block of code as (another call of) the named stage.
+
+        Args:
+            name: Stage name
+        """
+        stats = self._stage_stats(name)
+        entry = [name, 0.0]
+        self._active.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats['seconds'] += elapsed - entry[1]
+            stats['inclusive_seconds'] += elapsed
+            stats['calls'] += 1
+            self._active.pop()
+            if self._active:
+                self._active[-1][1] += elapsed
+
+    def count_operator(self, idname: str) -> None:
+        """
+        Count an operator call against the innermost active stage.
+
+        Args:
+            idname: Python operator id, e.g. ``'object.editmode_toggle'``
+        """
+        stats = self._stage_stats(self._active[-1][0] if self._active else UNSTAGED)
+        stats['ops'] += 1
+        if idname in MODE_TOGGLE_OPERATORS:
+            stats['mode_toggles'] += 1
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        """Return a version of a function that runs as the named stage."""
+
+        @functools.wraps(function)
+        def staged(*args, **kwargs):
+            with self.stage(name):
+                return function(*args, **kwargs)
+
+        return staged
+
+    def _wrap_session(self, name: str, factory: Callable) -> Callable:
+        """Return a version of a context manager whose whole ``with`` block runs as the named stage."""
+
+        @functools.wraps(factory)
+        @contextmanager
+        def staged(*args, **kwargs):
+            with self.stage(name), factory(*args, **kwargs) as value:
+                yield value
+
+        return staged
+
+    @contextmanager
+    def instrument(self, module: ModuleType, stage_names: list[str], session_names: list[str] = ()) -> Iterator[None]:
+        """
+        Temporarily wrap a module's stage functions and hook operator calls.
+
+        Args:
+            module: Module whose functions are looked up by the pipeline
+            stage_names: Names of the functions to time
+            session_names: Names of the context managers whose ``with`` blocks to time
+        """
+        operator_type = type(bpy.ops.object.mode_set)
+        original_call = operator_type.__call__
+        originals = {name: getattr(module, name) for name in [*stage_names, *session_names]}
+        sessions = set(session_names)
+        profiler = self
+
+        def counted_call(operator, *args, **kwargs):
+            profiler.count_operator(operator.idname_py())
+            return original_call(operator, *args, **kwargs)
+
+        operator_type.__call__ = counted_call
+        for name, function in originals.items():
+            wrap = self._wrap_session if name in sessions else self._wrap
+            setattr(module, name, wrap(name, function))
+        try:
+            yield
+        finally:
+            operator_type.__call__ = original_call
+            for name, function in originals.items():
+                setattr(module, name, function)
+
+
+def profile_setup_poser_figure(
+    armature: Object,
+    log_path: Path | None = None,
+    use_cprofile: bool = False,
+    text_name: str = PROFILE_TEXT_NAME,
+) -> dict:
+    """
+    Run setup_poser_figure() with per-stage instrumentation.
+
+    Args:
+        armature: The imported Poser armature object to rig
+        log_path: JSON-lines file to append the run record to, or None
+        use_cprofile: Also run the pipeline under cProfile and include its top functions
+        text_name: Name of the text datablock the report is written to
+
+    Returns:
+        Run record with total time, per-stage statistics and rig statistics, and the
+        report of setup_poser_figure() as ``generation``
+    """
+    profiler = RigProfiler()
+    armature_name = armature.name
+    profile = cProfile.Profile() if use_cprofile else None
+
+    start = time.perf_counter()
+    with profiler.instrument(generate_base_rig, pipeline_stages(), pipeline_sessions()):
+        if profile is not None:
+            profile.enable()
+        try:
+            generation = generate_base_rig.setup_poser_figure(armature)
+        finally:
+            if profile is not None:
+                profile.disable()
+    total = time.perf_counter() - start
+
+    staged_seconds = sum(stats['seconds'] for name, stats in profiler.stages.items() if name != UNSTAGED)
+    unstaged = profiler._stage_stats(UNSTAGED)
+    unstaged['seconds'] = unstaged['inclusive_seconds'] = total - staged_seconds
+
+    record = {
+        'timestamp': datetime.now(UTC).isoformat(),
+        'armature': armature_name,
+        'blender': bpy.app.version_string,
+        'addon': get_addon_version(),
+        'total_seconds': total,
+        'ops': sum(stats['ops'] for stats in profiler.stages.values()),
+        'mode_toggles': sum(stats['mode_toggles'] for stats in profiler.stages.values()),
+        **rig_statistics(armature),
+        'stages': [{'name': name, **stats} for name, stats in profiler.stages.items()],
+        'generation': generation,
+    }
+
+    cprofile_report = ''
+    if profile is not None:
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(CPROFILE_TOP_FUNCTIONS)
+        cprofile_report = stream.getvalue()
+        record['cprofile'] = cprofile_report
+
+    write_profile_text(record, cprofile_report, text_name)
+    if log_path is not None:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open('a', encoding='utf-8') as log:
+            log.write(json.dumps(record) + '\n')
+
+    return record
+
+
+def write_profile_text(record: dict, cprofile_report: str = '', text_name: str = PROFILE_TEXT_NAME) -> None:
+    """
+    Write a readable profile report to a Blender text datablock, replacing its content.
+
+    Args:
+        record: Run record from profile_setup_poser_figure()
+        cprofile_report: Optional cProfile output to append
+        text_name: Name of the text datablock
+    """
+    lines = [
+        f"Rig profile for {record['armature']} ({record['timestamp']})",
+        f"Blender {record['blender']}, add-on {record['addon']}",
+        f"Total {record['total_seconds'] * 1000:.1f} ms, {record['ops']} operator calls, "
+        f"{record['mode_toggles']} mode toggles, {record['bones']} bones, "
+        f"{record['constraints']} constraints, {record['drivers']} drivers",
+        '',
+        f"{'stage':<45}{'calls':>6}{'ms':>10}{'%':>7}{'ops':>6}{'modes':>7}",
+    ]
+    total = record['total_seconds'] or 1.0
+    for stage in sorted(record['stages'], key=lambda stage: stage['seconds'], reverse=True):
+        lines.append(
+            f"{stage['name']:<45}{stage['calls']:>6}{stage['seconds'] * 1000:>10.1f}"
+            f"{stage['seconds'] / total * 100:>7.1f}{stage['ops']:>6}{stage['mode_toggles']:>7}"
+        )
+
+    if cprofile_report:
+        lines += ['', cprofile_report]
+
+    text = bpy.data.texts.get(text_name) or bpy.data.texts.new(text_name)
+    text.clear()
+    text.write('\n'.join(lines) + '\n')
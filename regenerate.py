@@ -0,0 +1,627 @@
+"""Incremental regeneration of a rig that was generated before.
+
+The manifest records hashes of the generation inputs (see ``rig_manifest.rig_inputs``).
+When only pose records of the spec changed (constraints, switch drivers, chain mutes,
+custom properties), the bones are reused as they are: the changed records are rebuilt
+on a copy of the rig object that shares its armature data, and only the constraints
+and drivers of the bones they own are compared. When anything that shapes the bones
+changed, the rig the generator would produce today is built on a scratch armature from
+the source skeleton recorded on the rig, and everything is compared.
+
+Items are compared three ways, against the rig as it is now and the manifest of what
+the generator produced last time:
+
+- items the generator did not produce before are created;
+- items still as generated but different from the new target are updated or deleted;
+- items edited or deleted by hand since the last generation are left alone and reported;
+- items the generator never produced (hand-made bones, constraints, drivers) are ignored.
+
+Only the differences are written to the rig, so custom shapes, animation, vertex
+groups and hand-made additions survive, and regenerating twice changes nothing.
+"""
+
+import bpy
+from bpy.types import Bone, Object
+
+from .bone_rename import POSE_BONE_PATH
+from .constants import RIG_FIGURE_PROPERTY, WIDGET_DETAIL_DEFAULT
+from .custom_shapes import assign_all_custom_shapes
+from .figure_profiles import figure_profile_spec
+from .generate_base_rig import edit_mode, setup_poser_figure
+from .mirror import flip_side_name, mirror_pose_bones
+from .rig_manifest import (
+    POSE_BONE_PROPERTIES,
+    POSE_RECORD_KINDS,
+    bone_settings,
+    constraint_settings,
+    driver_key,
+    driver_settings,
+    manifest,
+    manifest_inputs,
+    record_manifest,
+    rig_inputs,
+    rig_signatures,
+    settings_digest,
+    source_skeleton,
+)
+from .rig_spec import POSER_RIG_SPEC
+from .spec_compiler import build_chain_mutes, build_constraints, build_drivers, build_properties, compile_rig_spec
+
+# Suffix of the temporary armature the target rig is built on
+SCRATCH_SUFFIX = '.regenerate'
+# Kinds of signatures in the manifest, and how the report names them
+MANIFEST_KINDS = ('bones', 'pose_bones', 'constraints', 'drivers')
+KIND_LABELS = {'bones': 'bone', 'pose_bones': 'pose bone', 'constraints': 'constraint', 'drivers': 'driver'}
+# Bone settings copied as-is from the target rig; head, tail, roll, parent, colors and
+# collections are handled separately
+EDIT_BONE_PROPERTIES = (
+    'use_deform', 'bbone_x', 'bbone_z', 'display_type', 'envelope_distance', 'head_radius', 'tail_radius',
+    'inherit_scale', 'use_inherit_rotation', 'use_local_location', 'use_relative_parent',
+)
+
+
+def regenerate_poser_figure(armature: Object, spec: dict = None) -> dict:
+    """
+    Bring a generated rig up to date with what the generator would produce now.
+
+    Args:
+        armature: Rig generated by setup_poser_figure(), in object mode
+        spec: Rig spec to build, defaults to ``rig_spec.POSER_RIG_SPEC``
+
+    Returns:
+        Report with ``created``, ``updated``, ``deleted`` and ``kept`` item lists (entries
+        like ``'bone FK-Hand.L'``) and the number of ``unchanged`` items
+
+    Raises:
+        ValueError: If the armature has no generation record to regenerate from
+    """
+    previous = manifest(armature)
+    source = source_skeleton(armature)
+    if previous is None or source is None:
+        raise ValueError(
+            f"'{armature.name}' has no generation record. "
+            "Generate it from a fresh Poser import before regenerating."
+        )
+
+    figure = armature.get(RIG_FIGURE_PROPERTY)
+    recorded = manifest_inputs(armature)
+    if figure is not None and recorded is not None:
+        compiled = compile_rig_spec(figure_profile_spec(spec or POSER_RIG_SPEC, figure))
+        inputs = rig_inputs(compiled, figure)
+        if inputs['base'] == recorded['base']:
+            return update_pose_records(armature, compiled, previous, recorded, inputs)
+
+    scratch = build_scratch_rig(armature, source, spec)
+    try:
+        # rigs generated before figure profiles get the profile detected for the scratch rig
+        figure = armature[RIG_FIGURE_PROPERTY] = scratch[RIG_FIGURE_PROPERTY]
+        compiled = compile_rig_spec(figure_profile_spec(spec or POSER_RIG_SPEC, figure))
+        return sync_rig(armature, scratch, previous, compiled['widgets'], rig_inputs(compiled, figure))
+    finally:
+        remove_scratch_rig(scratch)
+
+
+def changed_records(recorded: dict, current: dict) -> dict[str, list[str]]:
+    """
+    List the pose records that were added, removed or changed since the last generation.
+
+    Args:
+        recorded: ``records`` of the inputs recorded on the rig
+        current: ``records`` of the inputs of the spec being built
+
+    Returns:
+        Mapping of each of ``rig_manifest.POSE_RECORD_KINDS`` to changed record keys
+    """
+    changed = {}
+    for kind in POSE_RECORD_KINDS:
+        old, new = recorded.get(kind, {}), current.get(kind, {})
+        changed[kind] = sorted(
+            key for key in old.keys() | new.keys()
+            if key not in old or key not in new or old[key]['hash'] != new[key]['hash']
+        )
+    return changed
+
+
+def update_pose_records(armature: Object, compiled: dict, previous: dict, recorded: dict, inputs: dict) -> dict:
+    """
+    Regenerate only the pose data of changed spec records, reusing the rig's bones.
+
+    The changed records' constraints, the switch and mute drivers of their bones and
+    new custom properties are rebuilt on a copy of the rig object. Right-side bones get
+    their constraints mirrored from the left side, as in full generation. Only the
+    constraints those records name and the drivers of their bones are compared.
+
+    Args:
+        armature: Rig to update, whose bone-shaping inputs are unchanged
+        compiled: Compiled rig being built
+        previous: Signatures recorded when the rig was last generated
+        recorded: Generation inputs recorded on the rig
+        inputs: Generation inputs of ``compiled``
+
+    Returns:
+        Regeneration report, see regenerate_poser_figure()
+    """
+    changed = changed_records(recorded['records'], inputs['records'])
+    if not any(changed.values()):
+        return _finish(armature, previous, {}, {}, inputs, {})
+
+    # bones owning a changed record, before or after the change
+    owners = {
+        bone
+        for records in (recorded['records'], inputs['records'])
+        for kind, keys in changed.items()
+        for key in keys if key in records.get(kind, {})
+        for bone in records[kind][key]['bones']
+    }
+    # constraints the changed records name, on their own bones and the mirrored ones
+    names = {tuple(key.split('/', 1)) for key in changed['constraints']}
+    sources = {bone for bone, _ in names}
+    mirrored = {flip_side_name(bone) for bone in sources} - sources
+    names |= {(flip_side_name(bone), name) for bone, name in names}
+    pose_bones = armature.pose.bones
+    bones = {name for name in owners | mirrored if name in pose_bones}
+    compared = {
+        'constraints': {key for key in names if key[0] in bones},
+        'drivers': set(),
+    }
+
+    scratch = armature.copy()
+    try:
+        _rebuild_pose_records(scratch, compiled, changed, bones, mirrored & bones)
+        compared['drivers'] = _bone_drivers(armature, bones) | _bone_drivers(scratch, bones)
+        compared['drivers'] |= {key for key in previous.get('drivers', {}) if _driven_bone(key) in bones}
+
+        current = _item_signatures(armature, compared)
+        target = _item_signatures(scratch, compared)
+        plans = {
+            kind: plan_changes(
+                {key: value for key, value in _flatten(previous, kind).items() if key in compared[kind]},
+                current[kind],
+                target[kind],
+            )
+            for kind in compared
+        }
+        sync_constraints(armature, scratch, plans['constraints'])
+        sync_drivers(armature, scratch, plans['drivers'])
+        sync_properties(armature, scratch)
+        return _finish(armature, previous, plans, target, inputs, compared)
+    finally:
+        bpy.data.objects.remove(scratch)
+
+
+def _rebuild_pose_records(scratch: Object, compiled: dict, changed: dict, bones: set[str],
+                          mirrored: set[str]) -> None:
+    """
+    Rebuild the pose data of changed records on a copy of the rig.
+
+    Constraints the changed records name are replaced in place, so they keep their
+    position in the stack; new ones are appended. Every driver of the given bones is
+    rebuilt, as constraints that replace others lose the drivers of the old ones.
+    """
+    pose_bones = scratch.pose.bones
+    changed_constraints = {tuple(key.split('/', 1)) for key in changed['constraints']}
+    positions = {}
+    for bone_name, name in changed_constraints:
+        bone = pose_bones.get(bone_name)
+        constraint = bone.constraints.get(name) if bone else None
+        if constraint is not None:
+            positions[bone_name, name] = bone.constraints.find(name)
+            bone.constraints.remove(constraint)
+
+    build_constraints(scratch, {
+        **compiled,
+        'constraints': [
+            record for record in compiled['constraints'] if (record['bone'], record['name']) in changed_constraints
+        ],
+    })
+    for (bone_name, name), index in sorted(positions.items(), key=lambda item: item[1]):
+        constraints = pose_bones[bone_name].constraints
+        current_index = constraints.find(name)
+        if current_index not in (-1, index) and index < len(constraints):
+            constraints.move(current_index, index)
+    if mirrored:
+        mirror_pose_bones(scratch, sorted(mirrored))
+
+    drivers = scratch.animation_data.drivers if scratch.animation_data else []
+    for fcurve in [fcurve for fcurve in drivers if _driven_bone(fcurve.data_path) in bones]:
+        drivers.remove(fcurve)
+    build_drivers(scratch, {
+        **compiled,
+        'drivers': [record for record in compiled['drivers'] if record['bone'] in bones],
+    })
+    build_chain_mutes(scratch, {
+        **compiled,
+        'chain_mutes': [
+            {
+                **record,
+                'ik_bones': [name for name in record['ik_bones'] if name in bones],
+                'fk_bones': [name for name in record['fk_bones'] if name in bones],
+            }
+            for record in compiled['chain_mutes']
+        ],
+    })
+
+    properties = set(changed['properties'])
+    build_properties(scratch, {
+        **compiled,
+        'properties': [prop for prop in compiled['properties'] if prop['name'] in properties],
+    })
+
+
+def _driven_bone(data_path: str) -> str | None:
+    """Return the pose bone a driver or driver key drives, or None."""
+    match = POSE_BONE_PATH.match(data_path)
+    return match.group(1).replace('\\"', '"') if match else None
+
+
+def _bone_drivers(armature: Object, bones: set[str]) -> set[str]:
+    """Return the keys of the drivers on the given pose bones."""
+    drivers = armature.animation_data.drivers if armature.animation_data else []
+    return {driver_key(fcurve) for fcurve in drivers if _driven_bone(fcurve.data_path) in bones}
+
+
+def _item_signatures(armature: Object, compared: dict) -> dict:
+    """Hash only the given constraints, keyed (bone, constraint), and drivers of a rig."""
+    pose_bones = armature.pose.bones
+    constraints = {}
+    for bone_name, name in compared['constraints']:
+        bone = pose_bones.get(bone_name)
+        constraint = bone.constraints.get(name) if bone else None
+        if constraint is not None:
+            constraints[bone_name, name] = settings_digest(constraint_settings(armature, bone, constraint))
+
+    drivers = armature.animation_data.drivers if armature.animation_data else []
+    return {
+        'constraints': constraints,
+        'drivers': {
+            key: settings_digest(driver_settings(armature, fcurve))
+            for fcurve in drivers if (key := driver_key(fcurve)) in compared['drivers']
+        },
+    }
+
+
+def build_scratch_rig(armature: Object, source: list[dict], spec: dict = None) -> Object:
+    """
+    Generate the target rig on a temporary armature rebuilt from a source skeleton.
+
+    Widgets are not imported for the scratch rig.
+
+    Args:
+        armature: Rig the target is built for; the scratch rig is linked to its scene
+        source: Source skeleton recorded on the rig
+        spec: Rig spec to build
+
+    Returns:
+        The generated scratch armature object
+    """
+    data = bpy.data.armatures.new(armature.data.name + SCRATCH_SUFFIX)
+    scratch = bpy.data.objects.new(armature.name + SCRATCH_SUFFIX, data)
+    scene = armature.users_scene[0] if armature.users_scene else bpy.context.scene
+    scene.collection.objects.link(scratch)
+    scratch.matrix_basis = armature.matrix_basis
+
+    with edit_mode(scratch) as edit_bones:
+        for record in source:
+            bone = edit_bones.new(record['name'])
+            bone.head = record['head']
+            bone.tail = record['tail']
+            bone.roll = record['roll']
+            bone.use_deform = record['use_deform']
+        for record in source:
+            if record['parent'] is not None:
+                edit_bones[record['name']].parent = edit_bones[record['parent']]
+                edit_bones[record['name']].use_connect = record['use_connect']
+
+    # the source skeleton already has the profile's bone names, so the figure cannot be detected from it
+    setup_poser_figure(scratch, spec, widgets=False, figure=armature.get(RIG_FIGURE_PROPERTY))
+    return scratch
+
+
+def remove_scratch_rig(scratch: Object) -> None:
+    """Delete a scratch rig together with its armature data."""
+    data = scratch.data
+    bpy.data.objects.remove(scratch)
+    bpy.data.armatures.remove(data)
+
+
+def plan_changes(previous: dict, current: dict, target: dict) -> dict[str, list]:
+    """
+    Decide per item whether to create, update, delete or keep it.
+
+    Args:
+        previous: Signatures recorded when the rig was last generated
+        current: Signatures of the rig as it is now
+        target: Signatures of the rig the generator produces now
+
+    Returns:
+        Mapping of ``create``, ``update``, ``delete``, ``keep`` and ``unchanged`` to item keys
+    """
+    plan = {'create': [], 'update': [], 'delete': [], 'keep': [], 'unchanged': []}
+    for key, signature in target.items():
+        if key not in current:
+            # deleted by hand since the last generation
+            plan['keep' if key in previous else 'create'].append(key)
+        elif current[key] == signature:
+            plan['unchanged'].append(key)
+        elif current[key] == previous.get(key):
+            plan['update'].append(key)
+        else:
+            plan['keep'].append(key)
+
+    for key, signature in current.items():
+        if key in target or key not in previous:
+            continue
+        plan['delete' if signature == previous[key] else 'keep'].append(key)
+
+    return plan
+
+
+def sync_rig(armature: Object, scratch: Object, previous: dict, widgets: str = WIDGET_DETAIL_DEFAULT,
+             inputs: dict = None) -> dict:
+    """
+    Apply the differences between a rig and a freshly generated target rig.
+
+    Args:
+        armature: Rig to update
+        scratch: Freshly generated target rig
+        previous: Signatures recorded when the rig was last generated
+        widgets: Widget source for new bones, see custom_shapes.assign_all_custom_shapes()
+        inputs: Generation inputs of the target, recorded in the manifest
+
+    Returns:
+        Regeneration report, see regenerate_poser_figure()
+    """
+    current = rig_signatures(armature)
+    target = rig_signatures(scratch)
+    plans = {
+        kind: plan_changes(_flatten(previous, kind), _flatten(current, kind), _flatten(target, kind))
+        for kind in MANIFEST_KINDS
+    }
+
+    sync_collections(armature, scratch)
+    sync_bones(armature, scratch, plans['bones'])
+    sync_pose_bones(armature, scratch, plans['pose_bones'])
+    sync_constraints(armature, scratch, plans['constraints'])
+    sync_drivers(armature, scratch, plans['drivers'])
+    sync_properties(armature, scratch)
+    sync_widgets(armature, plans['bones']['create'], widgets)
+
+    flat_target = {kind: _flatten(target, kind) for kind in MANIFEST_KINDS}
+    return _finish(armature, previous, plans, flat_target, inputs)
+
+
+def _finish(armature: Object, previous: dict, plans: dict, target: dict, inputs: dict,
+            compared: dict = None) -> dict:
+    """
+    Record the manifest of a synced rig and report what changed.
+
+    Args:
+        armature: Synced rig
+        previous: Signatures recorded when the rig was last generated
+        plans: Plan per kind of the items compared, from plan_changes()
+        target: Target signatures per kind of the items compared, flattened
+        inputs: Generation inputs of the target
+        compared: Keys per kind of the items compared, if not every item was; the previous
+            signatures of the others are kept and they count as unchanged
+
+    Returns:
+        Regeneration report, see regenerate_poser_figure()
+    """
+    signatures = {}
+    unchanged = 0
+    for kind in MANIFEST_KINDS:
+        flat_previous = _flatten(previous, kind)
+        recorded = {}
+        if compared is not None:
+            recorded = {key: value for key, value in flat_previous.items() if key not in compared.get(kind, ())}
+            unchanged += len(recorded)
+        plan = plans.get(kind)
+        if plan is not None:
+            recorded.update({key: target[kind][key] for key in plan['create'] + plan['update'] + plan['unchanged']})
+            recorded.update({key: flat_previous[key] for key in plan['keep'] if key in flat_previous})
+        signatures[kind] = _unflatten(recorded, kind)
+    record_manifest(armature, signatures, inputs)
+
+    report = {'created': [], 'updated': [], 'deleted': [], 'kept': [], 'unchanged': unchanged}
+    for kind, plan in plans.items():
+        for action, entry in (('create', 'created'), ('update', 'updated'), ('delete', 'deleted'), ('keep', 'kept')):
+            report[entry] += [f'{KIND_LABELS[kind]} {_label(key)}' for key in plan[action]]
+        report['unchanged'] += len(plan['unchanged'])
+
+    return report
+
+
+def _flatten(signatures: dict, kind: str) -> dict:
+    """Return one kind of signatures keyed by item; constraints are keyed (bone, constraint)."""
+    items = signatures.get(kind, {})
+    if kind != 'constraints':
+        return dict(items)
+    return {(bone, name): signature for bone, constraints in items.items() for name, signature in constraints.items()}
+
+
+def _unflatten(items: dict, kind: str) -> dict:
+    """Reverse _flatten() for storing signatures in the manifest."""
+    if kind != 'constraints':
+        return items
+    nested = {}
+    for (bone, name), signature in items.items():
+        nested.setdefault(bone, {})[name] = signature
+    return nested
+
+
+def _label(key) -> str:
+    """Format an item key for the report."""
+    return '/'.join(key) if isinstance(key, tuple) else key
+
+
+def sync_collections(armature: Object, scratch: Object) -> None:
+    """Create the target rig's bone collections that the rig does not have yet."""
+    collections = armature.data.collections_all
+    for collection in scratch.data.collections_all:
+        if collection.name in collections:
+            continue
+        parent = collections.get(collection.parent.name) if collection.parent else None
+        armature.data.collections.new(collection.name, parent=parent)
+
+
+def sync_bones(armature: Object, scratch: Object, plan: dict) -> None:
+    """
+    Create, update and delete bones in a single edit session.
+
+    Args:
+        armature: Rig to update
+        scratch: Target rig
+        plan: Bone plan from plan_changes()
+    """
+    if not (plan['create'] or plan['update'] or plan['delete']):
+        return
+
+    target_bones = scratch.data.bones
+    collections = armature.data.collections_all
+    with edit_mode(armature) as edit_bones:
+        for name in plan['create']:
+            edit_bones.new(name)
+
+        for name in plan['create'] + plan['update']:
+            source = target_bones[name]
+            bone = edit_bones[name]
+            settings = bone_settings(source)
+            bone.use_connect = False
+            bone.head = source.head_local
+            bone.tail = source.tail_local
+            bone.roll = settings['roll']
+            bone.parent = edit_bones.get(settings['parent']) if settings['parent'] else None
+            bone.use_connect = source.use_connect
+            for property_name in EDIT_BONE_PROPERTIES:
+                setattr(bone, property_name, getattr(source, property_name))
+            _copy_color(source, bone)
+
+            for collection in list(bone.collections):
+                if collection.name not in settings['collections']:
+                    collection.unassign(bone)
+            for collection_name in settings['collections']:
+                collections[collection_name].assign(bone)
+
+        for name in plan['delete']:
+            bone = edit_bones.get(name)
+            if bone is not None:
+                edit_bones.remove(bone)
+
+
+def _copy_color(source: Bone, target) -> None:
+    """Copy a bone's color palette and custom colors."""
+    target.color.palette = source.color.palette
+    target.color.custom.normal = source.color.custom.normal
+    target.color.custom.select = source.color.custom.select
+    target.color.custom.active = source.color.custom.active
+
+
+def sync_pose_bones(armature: Object, scratch: Object, plan: dict) -> None:
+    """Copy rotation mode, locks and IK settings onto created and updated pose bones."""
+    pose_bones = armature.pose.bones
+    target_bones = scratch.pose.bones
+    for name in plan['create'] + plan['update']:
+        if name not in pose_bones:
+            continue
+        for property_name in POSE_BONE_PROPERTIES:
+            setattr(pose_bones[name], property_name, getattr(target_bones[name], property_name))
+
+
+def sync_constraints(armature: Object, scratch: Object, plan: dict) -> None:
+    """
+    Create, update and delete constraints, keeping the target's stack order.
+
+    Constraints are copied from the target rig and re-pointed from the scratch
+    armature to the rig itself.
+
+    Args:
+        armature: Rig to update
+        scratch: Target rig
+        plan: Constraint plan from plan_changes(), keyed (bone, constraint)
+    """
+    pose_bones = armature.pose.bones
+    target_bones = scratch.pose.bones
+    for bone_name, name in plan['delete'] + plan['update']:
+        bone = pose_bones.get(bone_name)
+        constraint = bone.constraints.get(name) if bone else None
+        if constraint is not None:
+            bone.constraints.remove(constraint)
+
+    touched = set()
+    for bone_name, name in plan['create'] + plan['update']:
+        bone = pose_bones.get(bone_name)
+        if bone is None:
+            continue
+        constraint = bone.constraints.copy(target_bones[bone_name].constraints[name])
+        constraint.name = name
+        _retarget(constraint, scratch, armature)
+        touched.add(bone_name)
+
+    for bone_name in touched:
+        constraints = pose_bones[bone_name].constraints
+        for index, target in enumerate(target_bones[bone_name].constraints):
+            current_index = constraints.find(target.name)
+            if current_index not in (-1, index) and index < len(constraints):
+                constraints.move(current_index, index)
+
+
+def _retarget(struct, old: Object, new: Object) -> None:
+    """Point every ID pointer of a struct that references ``old`` at ``new``."""
+    for prop in struct.bl_rna.properties:
+        if prop.type == 'POINTER' and not prop.is_readonly and getattr(struct, prop.identifier) == old:
+            setattr(struct, prop.identifier, new)
+
+
+def sync_drivers(armature: Object, scratch: Object, plan: dict) -> None:
+    """
+    Create, update and delete drivers by copying them from the target rig.
+
+    Args:
+        armature: Rig to update
+        scratch: Target rig
+        plan: Driver plan from plan_changes()
+    """
+    if not (plan['create'] or plan['update'] or plan['delete']):
+        return
+
+    drivers = armature.animation_data_create().drivers
+    existing = {driver_key(fcurve): fcurve for fcurve in drivers}
+    for key in plan['delete'] + plan['update']:
+        if key in existing:
+            drivers.remove(existing[key])
+
+    targets = {driver_key(fcurve): fcurve for fcurve in scratch.animation_data.drivers}
+    for key in plan['create'] + plan['update']:
+        fcurve = drivers.from_existing(src_driver=targets[key])
+        for variable in fcurve.driver.variables:
+            for target in variable.targets:
+                if target.id == scratch:
+                    target.id = armature
+
+
+def sync_properties(armature: Object, scratch: Object) -> None:
+    """
+    Add custom properties the target rig has and the rig lacks.
+
+    Existing properties keep their values, as animators may have changed them.
+    """
+    for target_bone in scratch.pose.bones:
+        bone = armature.pose.bones.get(target_bone.name)
+        if bone is None:
+            continue
+        for prop_name in target_bone.keys():  # noqa: SIM118 - ID property groups only iterate via keys()
+            if prop_name in bone:
+                continue
+            bone[prop_name] = target_bone[prop_name]
+            bone.property_overridable_library_set(f'["{prop_name}"]', True)
+            bone.id_properties_ui(prop_name).update_from(target_bone.id_properties_ui(prop_name))
+
+
+def sync_widgets(armature: Object, bone_names: list[str], source: str = WIDGET_DETAIL_DEFAULT) -> None:
+    """
+    Give new bones their widgets, importing the ones the shared widget set is missing.
+
+    Widgets already assigned to existing bones are left as they are.
+    """
+    if bone_names:
+        assign_all_custom_shapes(armature, bone_names, source=source)
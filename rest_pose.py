@@ -0,0 +1,296 @@
+"""Bulk rest-pose snapshot and the placement rules for derived bones.
+
+``RestPose`` reads the heads, tails, rolls and B-Bone sizes of every edit bone with one
+``foreach_get`` per property, so placement code reads NumPy arrays instead of making
+an RNA access per vector component. Bones it moves are written back in one
+``foreach_set`` per property.
+
+The placement functions below are pure math on ``(3,)`` or ``(n, 3)`` arrays: they
+compute where control, mechanism and pole bones go from the snapshot, and the
+generation modules create the bones at those positions. ``roll_to_align`` and
+``bone_z_axes`` reproduce Blender's roll conventions, so rolls can be computed for
+many bones at once instead of calling ``EditBone.align_roll`` per bone.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+from bpy.types import Object
+
+from .constants import POLE_LENGTH
+
+# Blender's thresholds for bones pointing (almost) straight down -Y, see vec_roll_to_mat3_normalized()
+ROLL_SAFE_THRESHOLD = 6.1e-3
+ROLL_CRITICAL_THRESHOLD = 2.5e-4
+# Shortest projected alignment axis that still defines a roll
+ROLL_EPSILON = 1e-6
+
+
+class RestPose:
+    """Heads, tails, rolls and B-Bone sizes of every edit bone, read in bulk."""
+
+    def __init__(self, armature: Object):
+        """
+        Read the rest pose of an armature.
+
+        Bones created after the snapshot are not in it, but the rows of existing
+        bones stay valid, since new edit bones are appended at the end.
+
+        Args:
+            armature: Armature object in edit mode
+        """
+        self.edit_bones = armature.data.edit_bones
+        self.rows = {bone.name: row for row, bone in enumerate(self.edit_bones)}
+        self.heads = self._read('head', 3)
+        self.tails = self._read('tail', 3)
+        self.rolls = self._read('roll', 1)
+        self.bbone_sizes = self._read('bbone_x', 1)
+        self._written_heads = self.heads.copy()
+        self._written_tails = self.tails.copy()
+        self._written_rolls = self.rolls.copy()
+
+    def _read(self, attribute: str, width: int) -> np.ndarray:
+        """Read one float property of every snapshot bone."""
+        values = np.empty(len(self.rows) * width, dtype=np.float32)
+        self.edit_bones.foreach_get(attribute, values)
+        return values.reshape(-1, width) if width > 1 else values
+
+    def head(self, name: str) -> np.ndarray:
+        """Return a copy of a bone's head position."""
+        return self.heads[self.rows[name]].copy()
+
+    def tail(self, name: str) -> np.ndarray:
+        """Return a copy of a bone's tail position."""
+        return self.tails[self.rows[name]].copy()
+
+    def bbone_size(self, name: str) -> float:
+        """Return a bone's B-Bone X size."""
+        return float(self.bbone_sizes[self.rows[name]])
+
+    def place(self, name: str, head: Iterable[float] = None, tail: Iterable[float] = None) -> None:
+        """
+        Move a bone in the snapshot; write() applies it to the armature.
+
+        Args:
+            name: Bone name
+            head: New head position, or None to keep it
+            tail: New tail position, or None to keep it
+        """
+        row = self.rows[name]
+        if head is not None:
+            self.heads[row] = head
+        if tail is not None:
+            self.tails[row] = tail
+
+    def _write(self, attribute: str, values: np.ndarray, width: int) -> None:
+        """Write one float property of every snapshot bone, leaving bones created since untouched."""
+        current = np.empty(len(self.edit_bones) * width, dtype=np.float32)
+        self.edit_bones.foreach_get(attribute, current)
+        current[:values.size] = values.ravel()
+        self.edit_bones.foreach_set(attribute, current)
+
+    def write(self) -> None:
+        """
+        Write the moved heads and tails and the changed rolls back to the armature in one batch.
+
+        Connected bones are kept connected the way moving them by hand would: a moved
+        child head moves its parent's tail, and a moved parent tail moves the heads of
+        its connected children. Bones created after the snapshot are left alone.
+        """
+        if np.any(self.rolls != self._written_rolls):
+            self._write('roll', self.rolls, 1)
+            self._written_rolls = self.rolls.copy()
+
+        moved = np.any(self.heads != self._written_heads, axis=1) | np.any(self.tails != self._written_tails, axis=1)
+        if not moved.any():
+            return
+
+        count = len(self.rows)
+        connected = np.zeros(len(self.edit_bones), dtype=bool)
+        self.edit_bones.foreach_get('use_connect', connected)
+        parents = np.array([
+            self.rows.get(bone.parent.name, -1) if is_connected and bone.parent is not None else -1
+            for bone, is_connected in zip(self.edit_bones[:count], connected[:count], strict=True)
+        ], dtype=np.int64)
+        children = np.flatnonzero(parents >= 0)
+
+        moved_heads = children[np.any(self.heads[children] != self._written_heads[children], axis=1)]
+        self.tails[parents[moved_heads]] = self.heads[moved_heads]
+        self.heads[children] = self.tails[parents[children]]
+
+        self._write('head', self.heads, 3)
+        self._write('tail', self.tails, 3)
+
+        self._written_heads = self.heads.copy()
+        self._written_tails = self.tails.copy()
+
+
+def _bone_axes(heads: np.ndarray, tails: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the unit Y axes of bones and their Z axes at zero roll."""
+    y_axes = tails - heads
+    y_axes = y_axes / np.linalg.norm(y_axes, axis=-1, keepdims=True)
+    x, y, z = np.moveaxis(y_axes, -1, 0)
+
+    theta = 1.0 + y
+    theta_alt = x * x + z * z
+    theta = np.where(theta <= ROLL_SAFE_THRESHOLD, theta_alt * 0.5 + theta_alt * theta_alt * 0.125, theta)
+    downward = (1.0 + y <= ROLL_SAFE_THRESHOLD) & (theta_alt <= ROLL_CRITICAL_THRESHOLD ** 2)
+    theta = np.where(downward, 1.0, theta)
+
+    z_axes = np.stack([-x * z / theta, -z, 1.0 - z * z / theta], axis=-1)
+    z_axes[downward] = (0.0, 0.0, 1.0)
+    return y_axes, z_axes
+
+
+def roll_to_align(heads: np.ndarray, tails: np.ndarray, axes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the rolls that point bones' Z axes as close as possible to given axes.
+
+    The same result as ``EditBone.align_roll``, for many bones at once.
+
+    Args:
+        heads: Head positions, ``(n, 3)``
+        tails: Tail positions, ``(n, 3)``
+        axes: Axis to align each bone's Z axis to, ``(n, 3)`` or one ``(3,)`` axis for all
+
+    Returns:
+        ``(rolls, valid)``: roll per bone in radians, and False where a bone lies along
+        its axis, so no roll aligns it
+    """
+    y_axes, z_axes = _bone_axes(heads, tails)
+    projected = axes - np.sum(axes * y_axes, axis=-1, keepdims=True) * y_axes
+    lengths = np.linalg.norm(projected, axis=-1)
+    valid = lengths > ROLL_EPSILON
+    projected = projected / np.where(valid, lengths, 1.0)[..., None]
+
+    rolls = np.arccos(np.clip(np.sum(projected * z_axes, axis=-1), -1.0, 1.0))
+    turning = np.sum(np.cross(z_axes, projected) * y_axes, axis=-1)
+    return np.where(turning < 0.0, -rolls, rolls), valid
+
+
+def bone_z_axes(heads: np.ndarray, tails: np.ndarray, rolls: np.ndarray) -> np.ndarray:
+    """
+    Compute bones' Z axes from their heads, tails and rolls.
+
+    Args:
+        heads: Head positions, ``(n, 3)``
+        tails: Tail positions, ``(n, 3)``
+        rolls: Rolls in radians, ``(n,)``
+
+    Returns:
+        Unit Z axes, ``(n, 3)``
+    """
+    y_axes, z_axes = _bone_axes(heads, tails)
+    cosines = np.cos(rolls)[..., None]
+    sines = np.sin(rolls)[..., None]
+    return z_axes * cosines + np.cross(y_axes, z_axes) * sines
+
+
+def axis_offset(heads: np.ndarray, tails: np.ndarray, distance: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Slide bones along their own axis.
+
+    Args:
+        heads: Head positions, ``(3,)`` or ``(n, 3)``
+        tails: Tail positions, same shape
+        distance: Distance to move, positive towards the tail
+
+    Returns:
+        The moved ``(heads, tails)``
+    """
+    axes = tails - heads
+    offsets = axes / np.linalg.norm(axes, axis=-1, keepdims=True) * distance
+    return heads + offsets, tails + offsets
+
+
+def pole_target(head: np.ndarray, tail: np.ndarray, y_position: float, z_by: str = 'tail',
+                length: float = POLE_LENGTH) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Place an IK pole target in front of a chain's middle bone.
+
+    Args:
+        head: Head of the bone the pole is placed from
+        tail: Tail of that bone
+        y_position: Y coordinate of the pole's tail
+        z_by: Take the height from the bone's ``'head'`` or ``'tail'``
+        length: Pole bone length, along Y
+
+    Returns:
+        The pole bone's ``(head, tail)``
+    """
+    z_position = head[2] if z_by == 'head' else tail[2]
+    pole_tail = np.array([tail[0], y_position, z_position], dtype=np.float32)
+    return pole_tail - np.array([0.0, length, 0.0], dtype=np.float32), pole_tail
+
+
+def finger_control_positions(fk_heads: np.ndarray, fk_tails: np.ndarray, ik_heads: np.ndarray,
+                             ik_tails: np.ndarray, length: float) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    Place the FK and IK curl controls of a hand's fingers.
+
+    FK controls end at the first FK segment's head, pointing along it. IK controls
+    start at the last IK segment's tail and point back towards a spot two control
+    lengths past its head.
+
+    Args:
+        fk_heads: Heads of each finger's first FK segment, ``(n, 3)``
+        fk_tails: Tails of each finger's first FK segment
+        ik_heads: Heads of each finger's last IK segment
+        ik_tails: Tails of each finger's last IK segment
+        length: Control bone length
+
+    Returns:
+        ``'fk'`` and ``'ik'`` control ``(heads, tails)``, one row per finger
+    """
+    fk_ctrl_heads = axis_offset(fk_heads, fk_tails, -length)[0]
+
+    ik_axes = ik_tails - ik_heads
+    aims = ik_heads + ik_axes / np.linalg.norm(ik_axes, axis=-1, keepdims=True) * length * 2 - ik_tails
+    ik_ctrl_tails = ik_tails + aims / np.linalg.norm(aims, axis=-1, keepdims=True) * length
+    return {'fk': (fk_ctrl_heads, fk_heads.copy()), 'ik': (ik_tails.copy(), ik_ctrl_tails)}
+
+
+def foot_roll_positions(foot_head: np.ndarray, foot_tail: np.ndarray,
+                        toe_head: np.ndarray, toe_tail: np.ndarray) -> dict[str, tuple[list, list]]:
+    """
+    Place the foot roll control and mechanism bones of one foot.
+
+    Args:
+        foot_head: IK foot head
+        foot_tail: IK foot tail
+        toe_head: IK toe head
+        toe_tail: IK toe tail
+
+    Returns:
+        ``(head, tail)`` per bone name without side suffix
+    """
+    x, y, z = foot_head.tolist()
+    return {
+        'CTRL-Foot-Roll': ([x, y + 0.05, z], [x, y + 0.075, z]),
+        'Roll-Foot': ([x, y, z], [x, -0.05, z]),
+        'MCH-Foot-Rollback': ([x, y, 0.025], [x, y - 0.025, 0.025]),
+        'MCH-Roll-Toe': ([*toe_tail[:2].tolist(), 0.0], toe_head.tolist()),
+        'MCH-Roll-Foot': (foot_tail.tolist(), [x, y, z]),
+    }
+
+
+def eye_control_positions(eye_head: np.ndarray, eye_tail: np.ndarray,
+                          target_distance: float) -> dict[str, tuple[list, list]]:
+    """
+    Place the eye tracking mechanism and targets for the left eye.
+
+    Args:
+        eye_head: Left eye head
+        eye_tail: Left eye tail
+        target_distance: Distance of the targets in front of the face, along -Y
+
+    Returns:
+        ``(head, tail)`` per bone name
+    """
+    x, _, z = eye_head.tolist()
+    tail_x, tail_y, tail_z = eye_tail.tolist()
+    return {
+        'MCH-Eye.L': (eye_head.tolist(), [tail_x, tail_y + 0.005, tail_z]),
+        'CTRL-Eye_Target': ([0.0, -target_distance, z], [0.0, -target_distance - 0.02, z]),
+        'CTRL-Eye_Target.L': ([x, -target_distance, z], [x, -target_distance - 0.02, z]),
+    }
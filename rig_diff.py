@@ -0,0 +1,203 @@
+"""Structural diff between two generated rigs.
+
+Both rigs are indexed into a *snapshot*: per kind of item (bone, pose bone, constraint,
+driver, custom property), a mapping of item key to its plain settings, read with the
+same functions as the regeneration manifest. Items are matched by key, so the two rigs
+may live in different armature objects or files. Each item is hashed once, and only
+items whose hashes differ have their settings compared, so diffing two rigs of a
+thousand bones costs little more than reading them.
+
+Constraint and custom-property keys are ``'<bone>/<name>'``; driver keys are the data
+path and array index of the driven property.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import bpy
+from bpy.types import Object, PoseBone
+
+from .rig_export import find_armature
+from .rig_manifest import plain_value, rig_settings, settings_digest
+
+# Kinds of items in a snapshot, in report order
+DIFF_KINDS = ('bones', 'pose_bones', 'constraints', 'drivers', 'properties')
+# Exit code of the diff command when the rigs differ
+DIFF_EXIT_CHANGED = 1
+
+
+def property_settings(pose_bone: PoseBone, name: str) -> dict:
+    """
+    Read a custom property of a pose bone with its UI data.
+
+    Args:
+        pose_bone: Pose bone holding the property
+        name: Property name
+
+    Returns:
+        Mapping with the property's value, and the UI settings of its slider
+    """
+    ui = pose_bone.id_properties_ui(name).as_dict()
+    settings = {f'ui_{key}': plain_value(value) for key, value in ui.items()}
+    settings['value'] = plain_value(pose_bone[name])
+    return settings
+
+
+def rig_snapshot(armature: Object) -> dict:
+    """
+    Index every item of a rig by kind and key.
+
+    Args:
+        armature: Armature object to index
+
+    Returns:
+        Mapping of kind (see ``DIFF_KINDS``) to a mapping of item key to plain settings
+    """
+    settings = rig_settings(armature)
+    return {
+        'bones': settings['bones'],
+        'pose_bones': settings['pose_bones'],
+        'constraints': {
+            f'{bone}/{name}': constraint
+            for bone, constraints in settings['constraints'].items()
+            for name, constraint in constraints.items()
+        },
+        'drivers': settings['drivers'],
+        'properties': {
+            f'{bone.name}/{name}': property_settings(bone, name)
+            for bone in armature.pose.bones
+            for name in bone.keys()  # noqa: SIM118 - ID property groups only iterate via keys()
+        },
+    }
+
+
+def diff_snapshots(old: dict, new: dict) -> dict:
+    """
+    Compare two rig snapshots.
+
+    Args:
+        old: Snapshot of the reference rig, from rig_snapshot()
+        new: Snapshot of the rig to compare with it
+
+    Returns:
+        Mapping of kind to ``added`` and ``removed`` item keys, ``changed`` items (key to a
+        mapping of setting name to ``[old, new]`` values) and the count of ``unchanged`` items
+    """
+    report = {}
+    for kind in DIFF_KINDS:
+        old_items, new_items = old.get(kind, {}), new.get(kind, {})
+        old_hashes = {key: settings_digest(settings) for key, settings in old_items.items()}
+        new_hashes = {key: settings_digest(settings) for key, settings in new_items.items()}
+
+        common = old_hashes.keys() & new_hashes.keys()
+        changed = sorted(key for key in common if old_hashes[key] != new_hashes[key])
+        report[kind] = {
+            'added': sorted(new_hashes.keys() - old_hashes.keys()),
+            'removed': sorted(old_hashes.keys() - new_hashes.keys()),
+            'changed': {key: _changed_settings(old_items[key], new_items[key]) for key in changed},
+            'unchanged': len(common) - len(changed),
+        }
+
+    return report
+
+
+def _changed_settings(old: dict, new: dict) -> dict:
+    """List the settings that differ between two versions of an item, as ``[old, new]`` pairs."""
+    return {
+        name: [old.get(name), new.get(name)]
+        for name in sorted(old.keys() | new.keys())
+        if old.get(name) != new.get(name)
+    }
+
+
+def diff_rigs(old: Object, new: Object) -> dict:
+    """
+    Compare two rigs item by item.
+
+    Args:
+        old: Reference armature object
+        new: Armature object to compare with it
+
+    Returns:
+        Report, see diff_snapshots()
+    """
+    return diff_snapshots(rig_snapshot(old), rig_snapshot(new))
+
+
+def has_differences(report: dict) -> bool:
+    """
+    Tell whether a diff report holds any added, removed or changed item.
+
+    Args:
+        report: Report from diff_rigs() or diff_snapshots()
+
+    Returns:
+        True if the rigs differ
+    """
+    return any(entry['added'] or entry['removed'] or entry['changed'] for entry in report.values())
+
+
+def format_report(report: dict) -> list[str]:
+    """
+    Describe a diff report as lines of text.
+
+    Args:
+        report: Report from diff_rigs() or diff_snapshots()
+
+    Returns:
+        One summary line per kind, followed by one line per added, removed or changed item
+    """
+    lines = []
+    for kind, entry in report.items():
+        lines.append(
+            f"{kind}: {len(entry['added'])} added, {len(entry['removed'])} removed, "
+            f"{len(entry['changed'])} changed, {entry['unchanged']} unchanged"
+        )
+        lines += [f"  + {key}" for key in entry['added']]
+        lines += [f"  - {key}" for key in entry['removed']]
+        for key, settings in entry['changed'].items():
+            lines.append(f"  ~ {key}: {', '.join(settings)}")
+
+    return lines
+
+
+def _file_snapshot(path: Path, armature_name: str = None) -> dict:
+    """Open a .blend file and index its rig."""
+    if not path.exists():
+        raise ValueError(f"File not found: {path}")
+    bpy.ops.wm.open_mainfile(filepath=str(path))
+    return rig_snapshot(find_armature(armature_name))
+
+
+def main(argv: list[str]) -> int:
+    """
+    Compare the rigs in two ``.blend`` files (``diff`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code: 0 if the rigs match, ``DIFF_EXIT_CHANGED`` if they differ
+    """
+    parser = argparse.ArgumentParser(prog='diff', description="Compare the generated rigs in two .blend files.")
+    parser.add_argument('old', type=Path, help="Reference .blend file")
+    parser.add_argument('new', type=Path, help=".blend file to compare with it")
+    parser.add_argument('--armature', default=None, help="Armature object name, defaults to the largest armature")
+    parser.add_argument('--json', type=Path, default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    old = _file_snapshot(args.old, args.armature)
+    new = _file_snapshot(args.new, args.armature)
+    start = time.perf_counter()
+    report = diff_snapshots(old, new)
+    elapsed = time.perf_counter() - start
+
+    print('\n'.join(format_report(report)))
+    print(f"Compared {len(old['bones'])} and {len(new['bones'])} bones in {elapsed:.3f}s")
+    if args.json is not None:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    return DIFF_EXIT_CHANGED if has_differences(report) else 0
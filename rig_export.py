@@ -0,0 +1,490 @@
+"""Export of a generated rig to a compact spec file, and rebuilding a rig from one.
+
+The spec file is JSON, small enough to keep under version control next to a figure:
+
+- bone collections, and per bone its parent, collections, colors and the settings that
+  differ from Blender's defaults;
+- the rest pose as one packed array section: head, tail and roll of every bone, as
+  little-endian float32 in bone order, base64 encoded;
+- pose-bone settings, constraints and driver variables, again only where they differ
+  from the defaults, with pointers to the rig itself stored as ``'<self>'``;
+- drivers, custom properties with their UI settings, and widget bindings.
+
+``load_rig`` rebuilds the rig on an armature in one edit session: every bone is created,
+the packed transforms are written with one ``foreach_set`` per property, and the pose
+data is applied afterwards. No generation step runs, so it is much faster than
+``setup_poser_figure``.
+"""
+
+import argparse
+import base64
+import json
+import time
+from pathlib import Path
+
+import bpy
+import numpy as np
+from bpy.types import Bone, Object
+
+from .bone_rename import plan_bone_renames, rename_bone_users
+from .constants import PREFIX_DEF, RIG_FIGURE_PROPERTY, WIDGET_DETAIL_SEGMENTS, WIDGET_SOURCE_LIBRARY
+from .custom_shapes import WIDGET_PREFIX, assign_all_custom_shapes
+from .figure_profiles import apply_figure_profile
+from .generate_base_rig import edit_mode
+from .rig_manifest import (
+    BONE_PROPERTIES,
+    POSE_BONE_PROPERTIES,
+    SELF_REFERENCE,
+    plain_value,
+    rna_settings,
+)
+
+RIG_SPEC_FORMAT = 'poser-rig-spec'
+RIG_SPEC_VERSION = 1
+# Columns of the packed transform array: head, tail, roll
+TRANSFORM_COLUMNS = 7
+# Pose-bone settings exported besides the ones the manifest hashes
+EXPORTED_POSE_BONE_PROPERTIES = (*POSE_BONE_PROPERTIES, 'hide')
+# Settings applied before the others: the ID type before the ID, pointers before subtargets
+SETTING_ORDER = ('id_type', 'target', 'pole_target')
+# bpy.data collection per pointer type, and per driver target ``id_type``
+ID_COLLECTIONS = {
+    'Object': 'objects', 'Action': 'actions', 'Text': 'texts',
+    'OBJECT': 'objects', 'ARMATURE': 'armatures', 'MESH': 'meshes', 'SCENE': 'scenes', 'ACTION': 'actions',
+    'TEXT': 'texts',
+}
+# Sections written one entry per line, so a changed bone changes one line
+LINE_SECTIONS = ('collections', 'bones', 'pose_bones', 'constraints', 'drivers', 'properties', 'widgets')
+
+
+def _rna_default(prop):
+    """Return the default value of an RNA property, as a plain value."""
+    if prop.type == 'POINTER':
+        return None
+    if prop.type == 'ENUM':
+        return plain_value(prop.default_flag if prop.is_enum_flag else prop.default)
+    if getattr(prop, 'is_array', False):
+        return plain_value(list(prop.default_array))
+    return plain_value(prop.default)
+
+
+def _changed(struct, settings: dict) -> dict:
+    """Keep only the settings that differ from the struct type's defaults."""
+    properties = struct.bl_rna.properties
+    return {
+        name: value for name, value in settings.items()
+        if name not in properties or value != _rna_default(properties[name])
+    }
+
+
+def _pack(array: np.ndarray) -> dict:
+    """Pack a float array into a JSON-friendly dict."""
+    data = np.ascontiguousarray(array, dtype='<f4')
+    return {'dtype': 'float32', 'shape': list(data.shape), 'data': base64.b64encode(data.tobytes()).decode('ascii')}
+
+
+def _unpack(packed: dict) -> np.ndarray:
+    """Unpack an array written by _pack()."""
+    return np.frombuffer(base64.b64decode(packed['data']), dtype='<f4').reshape(packed['shape'])
+
+
+def export_rig(armature: Object) -> dict:
+    """
+    Describe a generated rig as a spec, without its meshes or source skeleton.
+
+    Args:
+        armature: Generated armature object, in object mode
+
+    Returns:
+        Rig spec, see the module docstring; write it with write_rig_spec()
+    """
+    bones = armature.data.bones
+    transforms = np.empty((len(bones), TRANSFORM_COLUMNS), dtype=np.float32)
+    heads = np.empty(len(bones) * 3, dtype=np.float32)
+    tails = np.empty(len(bones) * 3, dtype=np.float32)
+    bones.foreach_get('head_local', heads)
+    bones.foreach_get('tail_local', tails)
+    transforms[:, 0:3] = heads.reshape(-1, 3)
+    transforms[:, 3:6] = tails.reshape(-1, 3)
+    transforms[:, 6] = [Bone.AxisRollFromMatrix(bone.matrix_local.to_3x3())[1] for bone in bones]
+
+    pose_bones = armature.pose.bones
+    animation_data = armature.animation_data
+    return {
+        'format': RIG_SPEC_FORMAT,
+        'version': RIG_SPEC_VERSION,
+        'name': armature.name,
+        'figure': armature.get(RIG_FIGURE_PROPERTY),
+        'display': {
+            'type': armature.display_type,
+            'show_in_front': armature.show_in_front,
+            'bone_type': armature.data.display_type,
+        },
+        'collections': [
+            {
+                'name': collection.name,
+                'parent': collection.parent.name if collection.parent else None,
+                'is_visible': collection.is_visible,
+            }
+            for collection in armature.data.collections_all
+        ],
+        'bones': [_export_bone(bone) for bone in bones],
+        'transforms': _pack(transforms),
+        'pose_bones': {
+            bone.name: settings for bone in pose_bones
+            if (settings := _changed(bone, _read(bone, EXPORTED_POSE_BONE_PROPERTIES)))
+        },
+        'constraints': {
+            bone.name: [
+                {'name': constraint.name, 'type': constraint.type,
+                 'settings': _changed(constraint, rna_settings(constraint, armature, {'name'}))}
+                for constraint in bone.constraints
+            ]
+            for bone in pose_bones if bone.constraints
+        },
+        'drivers': [_export_driver(armature, fcurve) for fcurve in (animation_data.drivers if animation_data else [])],
+        'properties': {
+            bone.name: {
+                name: {'value': plain_value(bone[name]), 'ui': _plain_ui(bone.id_properties_ui(name).as_dict())}
+                for name in bone.keys()  # noqa: SIM118 - ID property groups only iterate via keys()
+            }
+            for bone in pose_bones if bone.keys()
+        },
+        'widgets': {
+            bone.name: {
+                'shape': bone.custom_shape.name,
+                'transform': bone.custom_shape_transform.name if bone.custom_shape_transform else None,
+            }
+            for bone in pose_bones if bone.custom_shape is not None
+        },
+    }
+
+
+def _export_bone(bone: Bone) -> dict:
+    """Describe a bone without its transform."""
+    record = {
+        'name': bone.name,
+        'parent': bone.parent.name if bone.parent else None,
+        'collections': [collection.name for collection in bone.collections],
+        'palette': bone.color.palette,
+        'settings': _changed(bone, _read(bone, BONE_PROPERTIES)),
+    }
+    if bone.color.palette == 'CUSTOM':
+        custom = bone.color.custom
+        record['custom_color'] = plain_value([custom.normal, custom.select, custom.active])
+    return record
+
+
+def _read(struct, names: tuple[str, ...]) -> dict:
+    """Read named properties of a struct as plain values."""
+    return {name: plain_value(getattr(struct, name)) for name in names}
+
+
+def _export_driver(armature: Object, fcurve) -> dict:
+    """Describe a driver F-curve: its target path, driver, variables and keyframes."""
+    driver = fcurve.driver
+    return {
+        'data_path': fcurve.data_path,
+        'array_index': fcurve.array_index,
+        'type': driver.type,
+        'expression': driver.expression,
+        'use_self': driver.use_self,
+        'variables': [
+            {
+                'name': variable.name,
+                'type': variable.type,
+                'targets': [_changed(target, rna_settings(target, armature)) for target in variable.targets],
+            }
+            for variable in driver.variables
+        ],
+        # switch mute drivers map the switch through constant keyframes instead of a modifier
+        'keyframes': [[*plain_value(point.co), point.interpolation] for point in fcurve.keyframe_points],
+        'modifiers': [modifier.type for modifier in fcurve.modifiers],
+        'extrapolation': fcurve.extrapolation,
+    }
+
+
+def _plain_ui(ui: dict) -> dict:
+    """Convert custom property UI data into plain values."""
+    return {name: plain_value(value) for name, value in ui.items()}
+
+
+def _compact(value) -> str:
+    """Encode a value as JSON without whitespace."""
+    return json.dumps(value, separators=(',', ':'))
+
+
+def write_rig_spec(spec: dict, path: Path) -> None:
+    """
+    Write a rig spec to a file, one bone, constraint stack or driver per line for readable diffs.
+
+    Args:
+        spec: Spec from export_rig()
+        path: Destination file, e.g. ``figure.rig.json``
+    """
+    sections = []
+    for key, value in spec.items():
+        if key in LINE_SECTIONS and isinstance(value, list) and value:
+            lines = ',\n'.join(_compact(entry) for entry in value)
+            sections.append(f'{json.dumps(key)}: [\n{lines}\n]')
+        elif key in LINE_SECTIONS and value:
+            lines = ',\n'.join(f'{json.dumps(name)}:{_compact(entry)}' for name, entry in value.items())
+            sections.append(f'{json.dumps(key)}: {{\n{lines}\n}}')
+        else:
+            sections.append(f'{json.dumps(key)}: {_compact(value)}')
+    path.write_text('{\n' + ',\n'.join(sections) + '\n}\n', encoding='utf-8')
+
+
+def read_rig_spec(path: Path) -> dict:
+    """
+    Read a rig spec file.
+
+    Args:
+        path: Spec file written by write_rig_spec()
+
+    Returns:
+        Rig spec
+
+    Raises:
+        ValueError: If the file is not a rig spec or has an unsupported version
+    """
+    spec = json.loads(path.read_text(encoding='utf-8'))
+    if spec.get('format') != RIG_SPEC_FORMAT:
+        raise ValueError(f"{path} is not a rig spec file")
+    if spec.get('version') != RIG_SPEC_VERSION:
+        raise ValueError(f"{path} has rig spec version {spec.get('version')}, expected {RIG_SPEC_VERSION}")
+    return spec
+
+
+def load_rig(armature: Object, spec: dict) -> None:
+    """
+    Rebuild a rig from a spec on an armature, replacing its bones.
+
+    The armature may be empty or a fresh Poser import: vertex groups and bone parents of
+    the meshes it deforms are renamed the way generation renames the source bones.
+    Widgets are bound by name; the ones the file lacks are built or imported.
+
+    Args:
+        armature: Armature object, in object mode
+        spec: Rig spec from export_rig() or read_rig_spec()
+
+    Raises:
+        ValueError: If the spec's transforms do not match its bones
+    """
+    bone_records = spec['bones']
+    transforms = _unpack(spec['transforms'])
+    if len(transforms) != len(bone_records):
+        raise ValueError(f"Rig spec has {len(bone_records)} bones but {len(transforms)} transforms")
+    names = [record['name'] for record in bone_records]
+    if spec.get('figure'):
+        apply_figure_profile(armature, spec['figure'])
+    known = set(names)
+    renames = plan_bone_renames(armature.data.bones.keys(), PREFIX_DEF)['renames']
+    rename_bone_users(armature, {name: new_name for name, new_name in renames.items() if new_name in known})
+
+    armature.display_type = spec['display']['type']
+    armature.show_in_front = spec['display']['show_in_front']
+    armature.data.display_type = spec['display']['bone_type']
+
+    collections = armature.data.collections_all
+    for record in spec['collections']:
+        if record['name'] not in collections:
+            parent = collections.get(record['parent']) if record['parent'] else None
+            armature.data.collections.new(record['name'], parent=parent)
+        collections[record['name']].is_visible = record['is_visible']
+
+    with edit_mode(armature) as edit_bones:
+        for bone in list(edit_bones):
+            edit_bones.remove(bone)
+        for name in names:
+            edit_bones.new(name)
+
+        edit_bones.foreach_set('head', transforms[:, 0:3].ravel())
+        edit_bones.foreach_set('tail', transforms[:, 3:6].ravel())
+        edit_bones.foreach_set('roll', transforms[:, 6].copy())
+
+        for bone, record in zip(edit_bones, bone_records, strict=True):
+            if record['parent'] is not None:
+                bone.parent = edit_bones[record['parent']]
+            for name, value in record['settings'].items():
+                setattr(bone, name, value)
+            bone.color.palette = record['palette']
+            if 'custom_color' in record:
+                bone.color.custom.normal, bone.color.custom.select, bone.color.custom.active = record['custom_color']
+            for collection_name in record['collections']:
+                collections[collection_name].assign(bone)
+
+    pose_bones = armature.pose.bones
+    for name, settings in spec['pose_bones'].items():
+        for property_name, value in settings.items():
+            setattr(pose_bones[name], property_name, value)
+
+    for bone_name, properties in spec['properties'].items():
+        bone = pose_bones[bone_name]
+        for name, prop in properties.items():
+            bone[name] = prop['value']
+            bone.property_overridable_library_set(f'["{name}"]', True)
+            bone.id_properties_ui(name).update(**prop['ui'])
+
+    for bone_name, constraints in spec['constraints'].items():
+        for record in constraints:
+            constraint = pose_bones[bone_name].constraints.new(record['type'])
+            constraint.name = record['name']
+            _apply_settings(constraint, record['settings'], armature)
+
+    drivers = armature.animation_data_create().drivers
+    for record in spec['drivers']:
+        _load_driver(armature, drivers, record)
+
+    _load_widgets(armature, spec['widgets'])
+
+
+def _apply_settings(struct, settings: dict, armature: Object) -> None:
+    """Set exported settings on an RNA struct, resolving ID pointers by name."""
+    properties = struct.bl_rna.properties
+    ordered = sorted(
+        settings.items(), key=lambda item: (item[0] not in SETTING_ORDER, properties[item[0]].type != 'POINTER')
+    )
+    for name, value in ordered:
+        prop = properties[name]
+        if prop.type == 'POINTER':
+            # driver targets point at any ID type, given by their id_type
+            id_type = struct.id_type if prop.fixed_type.identifier == 'ID' else prop.fixed_type.identifier
+            value = armature if value == SELF_REFERENCE else _id_by_name(id_type, value)
+        setattr(struct, name, value)
+
+
+def _id_by_name(id_type: str, name: str | None):
+    """Find an ID datablock of a type by name, or None."""
+    if name is None or id_type not in ID_COLLECTIONS:
+        return None
+    return getattr(bpy.data, ID_COLLECTIONS[id_type]).get(name)
+
+
+def _load_driver(armature: Object, drivers, record: dict) -> None:
+    """Create a driver from its exported record, replacing any driver on the same path."""
+    existing = drivers.find(record['data_path'], index=record['array_index'])
+    if existing is not None:
+        drivers.remove(existing)
+
+    fcurve = drivers.new(record['data_path'], index=record['array_index'])
+    driver = fcurve.driver
+    driver.type = record['type']
+    driver.expression = record['expression']
+    driver.use_self = record['use_self']
+    for variable_record in record['variables']:
+        variable = driver.variables.new()
+        variable.name = variable_record['name']
+        variable.type = variable_record['type']
+        for target, settings in zip(variable.targets, variable_record['targets'], strict=True):
+            _apply_settings(target, settings, armature)
+
+    # drivers.new() adds its own keyframes; rebuild the curve exactly as exported
+    fcurve.keyframe_points.clear()
+    for modifier in list(fcurve.modifiers):
+        fcurve.modifiers.remove(modifier)
+    for x, y, interpolation in record['keyframes']:
+        fcurve.keyframe_points.insert(x, y).interpolation = interpolation
+    for modifier_type in record['modifiers']:
+        fcurve.modifiers.new(modifier_type)
+    fcurve.extrapolation = record['extrapolation']
+
+
+def _load_widgets(armature: Object, widgets: dict) -> None:
+    """Bind widgets by name, building or importing the ones the file lacks."""
+    pose_bones = armature.pose.bones
+    missing = {}
+    for bone_name, binding in widgets.items():
+        shape = bpy.data.objects.get(binding['shape'])
+        if shape is None:
+            missing.setdefault(_widget_source(binding['shape']), []).append(bone_name)
+            continue
+        pose_bones[bone_name].custom_shape = shape
+        if binding['transform'] is not None:
+            pose_bones[bone_name].custom_shape_transform = pose_bones[binding['transform']]
+
+    for source, bone_names in missing.items():
+        assign_all_custom_shapes(armature, bone_names, source=source)
+
+
+def _widget_source(shape_name: str) -> str:
+    """Tell the widget source a widget was made by from its name."""
+    if shape_name.startswith(WIDGET_PREFIX):
+        return WIDGET_SOURCE_LIBRARY
+    # procedural widgets are named 'WGT-<shape>-<segments>-...'
+    segments = shape_name.split('-')[2] if shape_name.count('-') >= 2 else ''
+    details = {str(count): detail for detail, count in WIDGET_DETAIL_SEGMENTS.items()}
+    return details.get(segments, WIDGET_SOURCE_LIBRARY)
+
+
+def find_armature(name: str = None) -> Object:
+    """
+    Find the rig in the open file.
+
+    Args:
+        name: Armature object name, defaults to the armature with the most bones
+
+    Returns:
+        Armature object
+
+    Raises:
+        ValueError: If the file holds no such armature
+    """
+    armatures = [obj for obj in bpy.data.objects if obj.type == 'ARMATURE' and (name is None or obj.name == name)]
+    if not armatures:
+        raise ValueError(f"No armature named {name}" if name else "The file contains no armature")
+    return max(armatures, key=lambda obj: len(obj.data.bones))
+
+
+def export_main(argv: list[str]) -> int:
+    """
+    Write the rig in the open ``.blend`` to a spec file (``export-rig`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog='export-rig', description="Export a generated rig to a rig spec file.")
+    parser.add_argument('-o', '--output', type=Path, required=True, help="Rig spec file to write")
+    parser.add_argument('--armature', default=None, help="Armature object name, defaults to the largest armature")
+    args = parser.parse_args(argv)
+
+    spec = export_rig(find_armature(args.armature))
+    write_rig_spec(spec, args.output)
+    print(f"Exported {len(spec['bones'])} bones to {args.output} ({args.output.stat().st_size / 1024:.1f} KiB)")
+    return 0
+
+
+def load_main(argv: list[str]) -> int:
+    """
+    Rebuild a rig from a spec file and save it (``load-rig`` command).
+
+    Args:
+        argv: Command arguments
+
+    Returns:
+        Process exit code
+    """
+    from .batch import import_fbx
+
+    parser = argparse.ArgumentParser(prog='load-rig', description="Rebuild a rig from a rig spec file.")
+    parser.add_argument('spec', type=Path, help="Rig spec file")
+    parser.add_argument('-o', '--output', type=Path, required=True, help="Destination .blend file")
+    parser.add_argument('--fbx', type=Path, default=None, help="Poser FBX export to rig, instead of a bare armature")
+    args = parser.parse_args(argv)
+
+    spec = read_rig_spec(args.spec)
+    if args.fbx is not None:
+        armature = import_fbx(args.fbx)
+    else:
+        armature = bpy.data.objects.new(spec['name'], bpy.data.armatures.new(spec['name']))
+        bpy.context.scene.collection.objects.link(armature)
+
+    start = time.perf_counter()
+    load_rig(armature, spec)
+    print(f"Rebuilt {len(spec['bones'])} bones in {time.perf_counter() - start:.3f}s")
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    bpy.ops.wm.save_as_mainfile(filepath=str(args.output), check_existing=False)
+    return 0
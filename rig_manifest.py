@@ -0,0 +1,412 @@
+"""Records kept on a generated rig so it can be regenerated incrementally.
+
+Two custom properties are stored on the armature object when a rig is generated:
+
+- the *source skeleton*: the Poser bones as they were before any generation step ran,
+  so the rig can be rebuilt from scratch without re-importing the FBX;
+- the *manifest*: a short hash per bone, pose bone, constraint and driver the generator
+  produced. Comparing it with the rig's current signatures tells generated items that
+  are still untouched apart from ones that were edited by hand. It also holds hashes of
+  the generation inputs, so a regeneration can tell which spec records changed.
+"""
+
+import hashlib
+import json
+
+from bpy.types import ID, Bone, Constraint, FCurve, Object, PoseBone
+
+from .cache import GENERATOR_VERSION
+from .constants import RIG_MANIFEST_PROPERTY, RIG_SOURCE_PROPERTY
+
+MANIFEST_VERSION = 1
+# Decimal places kept for float values, so tiny float noise does not count as a change
+SIGNATURE_PRECISION = 5
+# Length of the hex digest stored per item
+SIGNATURE_LENGTH = 16
+# Stand-in for pointers to the rig itself, so signatures compare across armature objects
+SELF_REFERENCE = '<self>'
+# RNA properties that only hold UI state
+UI_PROPERTIES = {'rna_type', 'show_expanded', 'active', 'is_override_data_editable', 'is_valid'}
+# Constraint properties the generator may drive; driven values change with the pose
+DRIVABLE_CONSTRAINT_PROPERTIES = ('influence', 'mute', 'enabled')
+
+# Compiled spec records that only add pose data (constraints, drivers, custom properties)
+# to existing bones; every other input shapes the bones themselves
+POSE_RECORD_KINDS = ('constraints', 'drivers', 'chain_mutes', 'properties')
+
+BONE_PROPERTIES = (
+    'use_connect', 'use_deform', 'bbone_x', 'bbone_z', 'display_type', 'envelope_distance', 'head_radius',
+    'tail_radius', 'inherit_scale', 'use_inherit_rotation', 'use_local_location', 'use_relative_parent',
+)
+POSE_BONE_PROPERTIES = (
+    'rotation_mode', 'lock_location', 'lock_rotation', 'lock_rotation_w', 'lock_rotations_4d', 'lock_scale',
+    'ik_stretch', 'lock_ik_x', 'lock_ik_y', 'lock_ik_z',
+)
+
+
+def plain_value(value, owner: Object = None):
+    """
+    Convert an RNA value into a hashable, JSON-friendly Python value.
+
+    Floats are rounded to ``SIGNATURE_PRECISION`` places, ID pointers stored by name
+    and pointers to ``owner`` as ``'<self>'``.
+
+    Args:
+        value: RNA value
+        owner: Armature the value belongs to
+
+    Returns:
+        Plain value
+    """
+    if isinstance(value, float):
+        return round(value, SIGNATURE_PRECISION)
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, ID):
+        return SELF_REFERENCE if value == owner else value.name
+    if hasattr(value, '__len__'):
+        return [plain_value(item, owner) for item in value]
+    return str(value)
+
+
+def _digest(data) -> str:
+    """Hash plain data into a short hex string."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def rna_settings(struct, owner: Object = None, skip: set[str] = frozenset()) -> dict:
+    """
+    Read the editable RNA properties of a struct, such as a constraint.
+
+    Pointers to ID datablocks are stored by name, pointers to ``owner`` as ``'<self>'``.
+    Collections and pointers to non-ID structs are left out.
+
+    Args:
+        struct: RNA struct to read
+        owner: Armature the struct belongs to
+        skip: Property identifiers to leave out
+
+    Returns:
+        Mapping of property identifier to plain value
+    """
+    settings = {}
+    for prop in struct.bl_rna.properties:
+        identifier = prop.identifier
+        if identifier in UI_PROPERTIES or identifier in skip or prop.is_readonly or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, identifier)
+        if prop.type == 'POINTER' and value is not None and not isinstance(value, ID):
+            continue
+        settings[identifier] = plain_value(value, owner)
+
+    return settings
+
+
+def bone_settings(bone: Bone) -> dict:
+    """
+    Read the rest-pose data of a bone that the generator controls.
+
+    Args:
+        bone: Armature bone (object-mode data, no edit mode needed)
+
+    Returns:
+        Mapping with head, tail, roll, parent, colors, collections and bone settings
+    """
+    _, roll = Bone.AxisRollFromMatrix(bone.matrix_local.to_3x3())
+    settings = {name: plain_value(getattr(bone, name)) for name in BONE_PROPERTIES}
+    settings.update({
+        'head': plain_value(bone.head_local),
+        'tail': plain_value(bone.tail_local),
+        'roll': plain_value(roll),
+        'parent': bone.parent.name if bone.parent else None,
+        'palette': bone.color.palette,
+        'custom_color': plain_value([bone.color.custom.normal, bone.color.custom.select, bone.color.custom.active]),
+        'collections': sorted(collection.name for collection in bone.collections),
+    })
+    return settings
+
+
+def pose_bone_settings(pose_bone: PoseBone) -> dict:
+    """
+    Read the pose-bone settings the generator controls, without custom shapes.
+
+    Args:
+        pose_bone: Pose bone to read
+
+    Returns:
+        Mapping of setting name to plain value
+    """
+    return {name: plain_value(getattr(pose_bone, name)) for name in POSE_BONE_PROPERTIES}
+
+
+def constraint_settings(armature: Object, pose_bone: PoseBone, constraint: Constraint) -> dict:
+    """
+    Read a constraint's settings, leaving out the influence or mute flag when a driver controls it.
+
+    Args:
+        armature: Armature owning the constraint
+        pose_bone: Pose bone owning the constraint
+        constraint: Constraint to read
+
+    Returns:
+        Mapping of setting name to plain value, including the constraint type
+    """
+    constraint_path = f'pose.bones["{pose_bone.name}"].constraints["{constraint.name}"]'
+    animation_data = armature.animation_data
+    driven = {
+        name for name in DRIVABLE_CONSTRAINT_PROPERTIES
+        if animation_data is not None and animation_data.drivers.find(f'{constraint_path}.{name}') is not None
+    }
+    if 'mute' in driven:
+        driven.add('enabled')
+    settings = rna_settings(constraint, armature, driven)
+    settings['type'] = constraint.type
+    return settings
+
+
+def driver_settings(armature: Object, fcurve: FCurve) -> dict:
+    """
+    Read a driver's type, expression and variables.
+
+    Args:
+        armature: Armature owning the driver
+        fcurve: Driver F-curve
+
+    Returns:
+        Mapping describing the driver
+    """
+    driver = fcurve.driver
+    return {
+        'type': driver.type,
+        'expression': driver.expression,
+        'use_self': driver.use_self,
+        'variables': [
+            {
+                'name': variable.name,
+                'type': variable.type,
+                'targets': [rna_settings(target, armature) for target in variable.targets],
+            }
+            for variable in driver.variables
+        ],
+    }
+
+
+def driver_key(fcurve: FCurve) -> str:
+    """Return the manifest key of a driver: its data path and array index."""
+    return f'{fcurve.data_path}[{fcurve.array_index}]'
+
+
+def rig_settings(armature: Object) -> dict:
+    """
+    Read the settings of every bone, pose bone, constraint and driver of a rig.
+
+    Args:
+        armature: Armature object to read
+
+    Returns:
+        Mapping with ``bones``, ``pose_bones``, ``constraints`` (per bone, per constraint name)
+        and ``drivers`` (per driver key) settings
+    """
+    animation_data = armature.animation_data
+    return {
+        'bones': {bone.name: bone_settings(bone) for bone in armature.data.bones},
+        'pose_bones': {bone.name: pose_bone_settings(bone) for bone in armature.pose.bones},
+        'constraints': {
+            bone.name: {
+                constraint.name: constraint_settings(armature, bone, constraint)
+                for constraint in bone.constraints
+            }
+            for bone in armature.pose.bones if bone.constraints
+        },
+        'drivers': {
+            driver_key(fcurve): driver_settings(armature, fcurve)
+            for fcurve in (animation_data.drivers if animation_data else [])
+        },
+    }
+
+
+def settings_digest(settings: dict) -> str:
+    """
+    Hash settings read by this module into a short signature.
+
+    Args:
+        settings: Plain settings, e.g. from bone_settings()
+
+    Returns:
+        Hex digest of ``SIGNATURE_LENGTH`` characters
+    """
+    return _digest(settings)
+
+
+def rig_signatures(armature: Object) -> dict:
+    """
+    Hash every bone, pose bone, constraint and driver of a rig.
+
+    Args:
+        armature: Armature object to hash
+
+    Returns:
+        Mapping with ``bones``, ``pose_bones``, ``constraints`` (per bone, per constraint name)
+        and ``drivers`` (per driver key) hashes
+    """
+    settings = rig_settings(armature)
+    return {
+        'bones': {name: _digest(item) for name, item in settings['bones'].items()},
+        'pose_bones': {name: _digest(item) for name, item in settings['pose_bones'].items()},
+        'constraints': {
+            bone: {name: _digest(item) for name, item in constraints.items()}
+            for bone, constraints in settings['constraints'].items()
+        },
+        'drivers': {key: _digest(item) for key, item in settings['drivers'].items()},
+    }
+
+
+def record_source_skeleton(armature: Object) -> None:
+    """
+    Store the armature's current bones as the rig's source skeleton.
+
+    Called at the start of generation, before any bone is changed.
+
+    Args:
+        armature: Armature object in edit mode
+    """
+    armature[RIG_SOURCE_PROPERTY] = json.dumps([
+        {
+            'name': bone.name,
+            'head': list(bone.head),
+            'tail': list(bone.tail),
+            'roll': bone.roll,
+            'parent': bone.parent.name if bone.parent else None,
+            'use_connect': bone.use_connect,
+            'use_deform': bone.use_deform,
+        }
+        for bone in armature.data.edit_bones
+    ])
+
+
+def source_skeleton(armature: Object) -> list[dict] | None:
+    """
+    Return the source skeleton stored on a generated rig.
+
+    Args:
+        armature: Armature object
+
+    Returns:
+        List of bone records, or None if the rig has no source skeleton
+    """
+    source = armature.get(RIG_SOURCE_PROPERTY)
+    return json.loads(source) if source else None
+
+
+def _record_bones(kind: str, record: dict, compiled: dict) -> list[str]:
+    """List the bones whose pose data a compiled record produces."""
+    if kind == 'chain_mutes':
+        return record['ik_bones'] + record['fk_bones']
+    if kind == 'properties':
+        return [compiled['properties_bone']]
+    return [record['bone']]
+
+
+def _record_key(kind: str, record: dict) -> str:
+    """Return the key of a compiled record: its owner and name."""
+    if kind == 'constraints':
+        return f"{record['bone']}/{record['name']}"
+    if kind == 'drivers':
+        return f"{record['bone']}/{record['constraint']}"
+    if kind == 'chain_mutes':
+        return record['data_path']
+    return record['name']
+
+
+def rig_inputs(compiled: dict, figure: str | None) -> dict:
+    """
+    Hash the inputs of a generation run.
+
+    Args:
+        compiled: Compiled rig from spec_compiler.compile_rig_spec()
+        figure: Figure profile name
+
+    Returns:
+        Mapping with a ``base`` hash of every input that shapes the bones (the compiled spec
+        without its pose records, the figure and ``cache.GENERATOR_VERSION``), and per kind of
+        ``POSE_RECORD_KINDS`` a ``hash`` and owner ``bones`` per record key
+    """
+    base = {key: value for key, value in compiled.items() if key not in POSE_RECORD_KINDS}
+    return {
+        'base': _digest({'compiled': base, 'figure': figure, 'generator': GENERATOR_VERSION}),
+        'records': {
+            kind: {
+                _record_key(kind, record): {'hash': _digest(record), 'bones': _record_bones(kind, record, compiled)}
+                for record in compiled[kind]
+            }
+            for kind in POSE_RECORD_KINDS
+        },
+    }
+
+
+def record_manifest(armature: Object, signatures: dict = None, inputs: dict = None) -> None:
+    """
+    Store the signatures of everything the generator produced on the rig.
+
+    Args:
+        armature: Generated armature object
+        signatures: Signatures to store, defaults to the rig's current signatures
+        inputs: Generation inputs from rig_inputs(), if known
+    """
+    armature[RIG_MANIFEST_PROPERTY] = json.dumps({
+        'version': MANIFEST_VERSION,
+        'signatures': signatures if signatures is not None else rig_signatures(armature),
+        'inputs': inputs,
+    })
+
+
+def manifest(armature: Object) -> dict | None:
+    """
+    Return the signatures recorded when the rig was last generated.
+
+    Args:
+        armature: Armature object
+
+    Returns:
+        Signatures as returned by rig_signatures(), or None for rigs without a manifest
+    """
+    data = armature.get(RIG_MANIFEST_PROPERTY)
+    if not data:
+        return None
+
+    data = json.loads(data)
+    return data['signatures'] if data.get('version') == MANIFEST_VERSION else None
+
+
+def manifest_inputs(armature: Object) -> dict | None:
+    """
+    Return the generation inputs recorded when the rig was last generated.
+
+    Args:
+        armature: Armature object
+
+    Returns:
+        Inputs as returned by rig_inputs(), or None if the rig was generated without them
+    """
+    data = armature.get(RIG_MANIFEST_PROPERTY)
+    if not data:
+        return None
+
+    data = json.loads(data)
+    return data.get('inputs') if data.get('version') == MANIFEST_VERSION else None
+
+
+def is_generated_rig(armature: Object) -> bool:
+    """
+    Check whether an armature was generated with a manifest and source skeleton.
+
+    Args:
+        armature: Armature object
+
+    Returns:
+        True if the rig can be regenerated incrementally
+    """
+    return manifest(armature) is not None and source_skeleton(armature) is not None
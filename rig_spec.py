@@ -0,0 +1,240 @@
+"""Declarative description of the Poser rig.
+
+The rig is described as data: bone collections, FK/IK chains, IK controls, constraints,
+FK/IK switch drivers and custom properties. Only the left side and the centre line are
+described; right-side bones are mirrored from them. ``spec_compiler.compile_rig_spec``
+resolves a spec into the flat bone, constraint and driver lists the generator applies.
+
+Chains are built from deform bones, so every chain bone needs a ``DEF-`` bone of the
+same name. Bespoke mechanisms (foot roll, collar, eyes, finger controls) stay in their
+own modules and run between the spec passes.
+"""
+
+from .constants import (
+    ARM_CHAIN,
+    BONE_PROPERTIES,
+    BONE_ROOT,
+    BONE_SIZE_FK,
+    BONE_SIZE_IK,
+    COLLECTION_ARMS,
+    COLLECTION_ARMS_CTRL,
+    COLLECTION_ARMS_FK,
+    COLLECTION_ARMS_IK,
+    COLLECTION_BODY,
+    COLLECTION_DEF,
+    COLLECTION_EYES_CTRL,
+    COLLECTION_FACE,
+    COLLECTION_FINGERS,
+    COLLECTION_FINGERS_FK,
+    COLLECTION_FINGERS_FK_CTRL,
+    COLLECTION_FINGERS_IK,
+    COLLECTION_FINGERS_IK_CTRL,
+    COLLECTION_LEGS,
+    COLLECTION_LEGS_CTRL,
+    COLLECTION_LEGS_FK,
+    COLLECTION_LEGS_IK,
+    COLLECTION_MCH,
+    COLLECTION_RIGGING,
+    COLLECTION_ROOT,
+    COLLECTION_SPINE,
+    COLLECTION_SPINE_CTRL,
+    COLLECTION_SPINE_FK,
+    COLLECTION_SPINE_IK,
+    FINGER_INDEX_CHAIN,
+    FINGER_MID_CHAIN,
+    FINGER_NAMES,
+    FINGER_PINKY_CHAIN,
+    FINGER_RING_CHAIN,
+    FINGER_THUMB_CHAIN,
+    FKIK_DEFAULT,
+    FKIK_MAX,
+    FKIK_MIN,
+    LEG_CHAIN,
+    PROP_ARMS_FKIK,
+    PROP_COLLAR_TRACKING,
+    PROP_FINGERS_FKIK_LEFT,
+    PROP_FINGERS_FKIK_RIGHT,
+    PROP_HEAD_TRACKING,
+    PROP_LEGS_FKIK,
+    PROP_SPINE_FKIK,
+    SPINE_CHAIN,
+    SUFFIX_LEFT,
+    SUFFIX_RIGHT,
+    WIDGET_DETAIL_DEFAULT,
+)
+
+# Copy Transforms constraint that blends a chain between its IK and FK layers
+SWITCH_CONSTRAINT = 'Copy Transforms (IK)'
+
+# (name, parent) in creation order, parents first
+COLLECTIONS = [
+    (COLLECTION_ROOT, None),
+    (COLLECTION_FACE, None),
+    (COLLECTION_EYES_CTRL, COLLECTION_FACE),
+    (COLLECTION_BODY, None),
+    (COLLECTION_SPINE, COLLECTION_BODY),
+    (COLLECTION_SPINE_IK, COLLECTION_SPINE),
+    (COLLECTION_SPINE_FK, COLLECTION_SPINE),
+    (COLLECTION_SPINE_CTRL, COLLECTION_SPINE),
+    (COLLECTION_LEGS, COLLECTION_BODY),
+    (COLLECTION_LEGS_IK, COLLECTION_LEGS),
+    (COLLECTION_LEGS_FK, COLLECTION_LEGS),
+    (COLLECTION_LEGS_CTRL, COLLECTION_LEGS),
+    ('Foot Roll', COLLECTION_LEGS),
+    (COLLECTION_ARMS, COLLECTION_BODY),
+    (COLLECTION_ARMS_IK, COLLECTION_ARMS),
+    (COLLECTION_ARMS_FK, COLLECTION_ARMS),
+    (COLLECTION_ARMS_CTRL, COLLECTION_ARMS),
+    (COLLECTION_FINGERS, COLLECTION_BODY),
+    (COLLECTION_FINGERS_IK, COLLECTION_FINGERS),
+    (COLLECTION_FINGERS_FK, COLLECTION_FINGERS),
+    (COLLECTION_FINGERS_IK_CTRL, COLLECTION_FINGERS),
+    (COLLECTION_FINGERS_FK_CTRL, COLLECTION_FINGERS),
+    (COLLECTION_RIGGING, None),
+    (COLLECTION_DEF, COLLECTION_RIGGING),
+    (COLLECTION_MCH, COLLECTION_RIGGING),
+    ('MCH Shoulder', COLLECTION_MCH),
+    ('MCH Footroll', COLLECTION_MCH),
+    ('MCH Eye', COLLECTION_MCH),
+]
+
+# FK/IK chains. Each layer is a copy of the chain's deform bones named '<layer>-<bone><side>'.
+# The switch names the custom property blending the chain between IK and FK: 'index' is
+# 'side' for per-side array properties, a fixed array index, or None for a single value.
+CHAINS = [
+    {
+        'bones': SPINE_CHAIN,
+        'side': '',
+        'layers': {
+            'IK': {'parent': BONE_ROOT, 'palette': 'THEME09', 'bbone_size': BONE_SIZE_IK,
+                   'collection': COLLECTION_SPINE_IK},
+            'FK': {'parent': BONE_ROOT, 'palette': 'THEME04', 'bbone_size': BONE_SIZE_FK,
+                   'collection': COLLECTION_SPINE_FK},
+        },
+        'switch': {'property': PROP_SPINE_FKIK, 'index': None},
+    },
+    {
+        'bones': ARM_CHAIN,
+        'side': SUFFIX_LEFT,
+        'layers': {
+            'IK': {'parent': 'IK-Chest', 'palette': 'THEME01', 'bbone_size': BONE_SIZE_IK,
+                   'collection': COLLECTION_ARMS_IK},
+            'FK': {'parent': 'FK-Chest', 'palette': 'THEME03', 'bbone_size': BONE_SIZE_FK,
+                   'collection': COLLECTION_ARMS_FK},
+        },
+        'switch': {'property': PROP_ARMS_FKIK, 'index': 'side'},
+    },
+    {
+        'bones': LEG_CHAIN,
+        'side': SUFFIX_LEFT,
+        'layers': {
+            'IK': {'parent': 'IK-Hip', 'palette': 'THEME01', 'bbone_size': BONE_SIZE_IK,
+                   'collection': COLLECTION_LEGS_IK},
+            'FK': {'parent': 'FK-Hip', 'palette': 'THEME03', 'bbone_size': BONE_SIZE_FK,
+                   'collection': COLLECTION_LEGS_FK},
+        },
+        # FK-Toe has no switch driver, so it always follows IK-Toe
+        'switch': {'property': PROP_LEGS_FKIK, 'index': 'side', 'bones': LEG_CHAIN[:-1]},
+    },
+] + [
+    {
+        'bones': finger_chain,
+        'side': SUFFIX_LEFT,
+        'layers': {
+            'IK': {'parent': 'IK-Hand.L', 'palette': 'THEME01', 'bbone_size': BONE_SIZE_IK,
+                   'collection': COLLECTION_FINGERS_IK, 'use_connect': True},
+            'FK': {'parent': 'FK-Hand.L', 'palette': 'THEME03', 'bbone_size': BONE_SIZE_FK,
+                   'collection': COLLECTION_FINGERS_FK},
+        },
+        'switch': {
+            'property': {SUFFIX_LEFT: PROP_FINGERS_FKIK_LEFT, SUFFIX_RIGHT: PROP_FINGERS_FKIK_RIGHT},
+            'index': finger_index,
+        },
+    }
+    for finger_index, finger_chain in enumerate([
+        FINGER_THUMB_CHAIN, FINGER_INDEX_CHAIN, FINGER_MID_CHAIN, FINGER_RING_CHAIN, FINGER_PINKY_CHAIN,
+    ])
+]
+
+# (head, tail) offsets applied after chain creation. Bending the middle IK finger
+# joints forward gives the finger IK a preferred direction without pole targets.
+BONE_OFFSETS = {
+    'IK-Thumb_2.L': ((0.0, -0.005, 0.0), (0.0, -0.005, 0.005)),
+    'IK-Index_2.L': ((0.0, 0.0, 0.005), (0.0, 0.0, 0.005)),
+    'IK-Mid_2.L': ((0.0, 0.0, 0.005), (0.0, 0.0, 0.005)),
+    'IK-Ring_2.L': ((0.0, 0.0, 0.005), (0.0, 0.0, 0.005)),
+    'IK-Pinky_2.L': ((0.0, 0.0, 0.005), (0.0, 0.0, 0.005)),
+}
+
+# IK control and pole target bones, see generate_base_rig.create_ik_control_bones()
+IK_CONTROLS = [
+    {'chain': ['Hand', 'Forearm', 'Shoulder'], 'side': SUFFIX_LEFT, 'pole_name': 'Elbow',
+     'collection': COLLECTION_ARMS_CTRL},
+    {'chain': ['Foot', 'Shin', 'Thigh'], 'side': SUFFIX_LEFT, 'pole_name': 'Knee',
+     'y_axis_position': -0.625, 'z_position_by': 'head', 'collection': COLLECTION_LEGS_CTRL},
+    {'chain': ['LowerAbdomen', 'Hip'], 'pole_name': 'Hip', 'collection': COLLECTION_SPINE_CTRL},
+    {'chain': ['Chest', 'Abdomen'], 'pole_name': 'Chest', 'collection': COLLECTION_SPINE_CTRL},
+    {'chain': ['Head', 'Neck'], 'pole_name': 'Head', 'y_axis_position': 0.5, 'collection': COLLECTION_SPINE_CTRL},
+]
+
+# Copy Transforms constraints from one chain layer onto another, in stack order.
+# 'extra_bones' are linked as well although they are not part of a chain.
+LAYER_LINKS = [
+    {'from': 'IK', 'to': 'FK', 'name': SWITCH_CONSTRAINT, 'extra_bones': ['Fingers-CTRL.L']},
+    {'from': 'FK', 'to': 'DEF', 'name': 'Copy Transforms (FK)'},
+]
+
+# IK solvers: the constraint sits on 'IK-<first chain bone><side>' and targets '<target><side>'
+IK_CONSTRAINTS = [
+    {'target': 'CTRL-IK-Hand', 'chain': ['Forearm', 'Shoulder'], 'side': SUFFIX_LEFT,
+     'pole_name': 'Elbow', 'pole_angle': 180},
+    {'target': 'IK-Foot', 'chain': ['Shin', 'Thigh'], 'side': SUFFIX_LEFT, 'pole_name': 'Knee', 'pole_angle': 90},
+    {'target': 'CTRL-IK-LowerAbdomen', 'chain': ['LowerAbdomen', 'Hip'], 'pole_name': 'Hip', 'pole_angle': 90},
+    {'target': 'CTRL-IK-Chest', 'chain': ['Chest', 'Abdomen'], 'pole_name': 'Chest', 'pole_angle': -90},
+    {'target': 'CTRL-IK-Head', 'chain': ['Head', 'Neck'], 'pole_name': 'Head', 'pole_angle': 90},
+    {'target': 'CTRL-IK-Thumb-Joint', 'chain': ['Thumb_1'], 'side': SUFFIX_LEFT},
+    {'target': 'CTRL-IK-Thumb', 'chain': ['Thumb_3', 'Thumb_2'], 'side': SUFFIX_LEFT},
+    {'target': 'CTRL-IK-Index', 'chain': ['Index_3', 'Index_2', 'Index_1'], 'side': SUFFIX_LEFT},
+    {'target': 'CTRL-IK-Mid', 'chain': ['Mid_3', 'Mid_2', 'Mid_1'], 'side': SUFFIX_LEFT},
+    {'target': 'CTRL-IK-Ring', 'chain': ['Ring_3', 'Ring_2', 'Ring_1'], 'side': SUFFIX_LEFT},
+    {'target': 'CTRL-IK-Pinky', 'chain': ['Pinky_3', 'Pinky_2', 'Pinky_1'], 'side': SUFFIX_LEFT},
+]
+
+# Poser bones the bespoke modules read besides the chain bones: 'Body' becomes the root
+SOURCE_BONES = ['Body', 'Eye.L']
+# Chain bones the generator creates when the figure lacks them, see create_lower_abdomen_bone()
+GENERATED_BONES = ['LowerAbdomen']
+
+# Custom properties on the PROPERTIES bone (FK/IK switches: 1.0 = FK, 0.0 = IK)
+PROPERTIES = [
+    {'name': PROP_HEAD_TRACKING, 'default': False},
+    {'name': PROP_COLLAR_TRACKING, 'default': 0.05, 'min': FKIK_MIN, 'max': FKIK_MAX},
+    {'name': PROP_ARMS_FKIK, 'default': [FKIK_DEFAULT, FKIK_DEFAULT], 'min': FKIK_MIN, 'max': FKIK_MAX},
+    {'name': PROP_LEGS_FKIK, 'default': [FKIK_DEFAULT, FKIK_DEFAULT], 'min': FKIK_MIN, 'max': FKIK_MAX},
+    {'name': PROP_SPINE_FKIK, 'default': FKIK_DEFAULT, 'min': FKIK_MIN, 'max': FKIK_MAX},
+    {'name': PROP_FINGERS_FKIK_LEFT, 'default': [FKIK_DEFAULT] * len(FINGER_NAMES), 'min': FKIK_MIN,
+     'max': FKIK_MAX},
+    {'name': PROP_FINGERS_FKIK_RIGHT, 'default': [FKIK_DEFAULT] * len(FINGER_NAMES), 'min': FKIK_MIN,
+     'max': FKIK_MAX},
+]
+
+POSER_RIG_SPEC = {
+    'name': 'poser',
+    'properties_bone': BONE_PROPERTIES,
+    'switch_constraint': SWITCH_CONSTRAINT,
+    'collections': COLLECTIONS,
+    'chains': CHAINS,
+    'bone_offsets': BONE_OFFSETS,
+    'ik_controls': IK_CONTROLS,
+    'layer_links': LAYER_LINKS,
+    'ik_constraints': IK_CONSTRAINTS,
+    'properties': PROPERTIES,
+    'source_bones': SOURCE_BONES,
+    'generated_bones': GENERATED_BONES,
+    # mute IK solvers and overridden FK constraints while the switch blends their layer away
+    'mute_inactive_chains': True,
+    # procedural widget detail level, or 'library' for the hand-made WGTS.blend widgets
+    'widgets': WIDGET_DETAIL_DEFAULT,
+    # bone base name → roll strategy, e.g. {'Index': 'HAND_PLANE'}; other bones roll to global +Z
+    'roll_strategies': {},
+}
@@ -0,0 +1,282 @@
+"""Rig templates: reuse a generated rig for later figures with the same skeleton.
+
+Figures built on the same Poser base share a skeleton topology (bone names and
+parents) and differ only in their joint positions, so the rig the generator builds
+for them is the same apart from where its bones sit. The first figure of a topology
+is generated in full and its rig is written to a template ``.blend``. Later figures
+copy that rig's bones, constraints, drivers and custom properties, and every bone
+end is moved to keep its offset from the nearest joint of the new source skeleton.
+
+Bone ends that sit on a source joint, which is most of them, land exactly where
+full generation would put them. Bones the generator places at absolute positions
+(``root`` and ``PROPERTIES`` at the origin) stay where the template has them, and the
+eye targets keep their fixed distance in front of the face. Ends placed at fixed
+offsets from a joint (pole and heel targets) keep their offset from the nearest joint
+and may differ slightly from a full generation for very different proportions.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import bpy
+from bpy.types import Object, PoseBone
+from mathutils import Vector
+from mathutils.kdtree import KDTree
+
+from .bone_rename import plan_bone_renames, rename_bone_users
+from .cache import get_addon_version
+from .constants import BONE_PROPERTIES, BONE_ROOT, PREFIX_DEF, WIDGET_DETAIL_DEFAULT
+from .custom_shapes import assign_all_custom_shapes
+from .figure_profiles import apply_figure_profile, detect_figure_profile, figure_profile, figure_profile_spec
+from .generate_base_rig import calculate_bone_roll, edit_mode, prepare_armature, setup_poser_figure
+from .mirror import mirror_edit_bones
+from .preflight import validate_armature
+from .regenerate import sync_constraints, sync_drivers, sync_properties
+from .rig_manifest import driver_key, record_manifest, record_source_skeleton, rig_inputs, source_skeleton
+from .rig_spec import POSER_RIG_SPEC
+from .spec_compiler import compile_rig_spec
+
+# Bump when the template layout changes, so older templates are no longer matched
+TEMPLATE_VERSION = 1
+# Bones the generator places at absolute positions, left where the template has them
+PINNED_BONES = (BONE_ROOT, BONE_PROPERTIES)
+# Bones the generator places at a fixed Y in front of the face, see rest_pose.eye_control_positions()
+PINNED_Y_BONES = ('CTRL-Eye_Target', 'CTRL-Eye_Target.L', 'CTRL-Eye_Target.R')
+
+
+def template_key(armature: Object, spec: dict = None) -> str:
+    """
+    Compute the template key of an imported, not yet rigged figure.
+
+    The key covers the skeleton's topology, the rig spec, the add-on version and the
+    Blender version; joint positions are not part of it.
+
+    Args:
+        armature: Imported Poser armature object
+        spec: Rig spec the figure will be built with, defaults to ``rig_spec.POSER_RIG_SPEC``
+
+    Returns:
+        Hex SHA-256 key
+    """
+    key_data = {
+        'version': TEMPLATE_VERSION,
+        'addon': get_addon_version(),
+        'blender': bpy.app.version_string,
+        'spec': spec or POSER_RIG_SPEC,
+        'skeleton': sorted([bone.name, bone.parent.name if bone.parent else None] for bone in armature.data.bones),
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class RigTemplates:
+    """Directory of template rigs addressed by template key."""
+
+    def __init__(self, root: Path):
+        """
+        Open a template directory.
+
+        Args:
+            root: Template directory, created if missing
+        """
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """Return the template ``.blend`` path for a key."""
+        return self.root / f'{key}.blend'
+
+    def load(self, key: str) -> Object | None:
+        """
+        Append a template rig to the current file.
+
+        The widgets written along with the rig are removed right away; the fitted rig
+        uses the file's shared widget set instead.
+
+        Args:
+            key: Template key from template_key()
+
+        Returns:
+            The template armature object, not linked to any scene, or None if there is no template
+        """
+        path = self.path(key)
+        if not path.exists():
+            return None
+
+        with bpy.data.libraries.load(str(path), link=False) as (data_from, data_to):
+            data_to.objects = list(data_from.objects)
+
+        objects = [obj for obj in data_to.objects if obj is not None]
+        templates = [obj for obj in objects if obj.type == 'ARMATURE']
+        others = [obj for obj in objects if obj.type != 'ARMATURE']
+        bpy.data.batch_remove([*others, *{obj.data for obj in others if obj.data is not None}])
+        return templates[0] if templates else None
+
+    def store(self, key: str, armature: Object) -> None:
+        """
+        Write a freshly generated rig as the template for its topology.
+
+        Args:
+            key: Template key computed before the rig was generated
+            armature: Generated armature object
+        """
+        # write to a temporary name first so a concurrent load never sees a partial file
+        path = self.path(key)
+        temp_path = path.with_name(f'{key}.{os.getpid()}.{threading.get_ident()}.tmp')
+        bpy.data.libraries.write(str(temp_path), {armature})
+        temp_path.replace(path)
+
+
+def setup_poser_figure_from_template(armature: Object, templates: RigTemplates, spec: dict = None) -> bool:
+    """
+    Rig a Poser figure by fitting a template rig, generating and storing one if needed.
+
+    Args:
+        armature: The imported Poser armature object to rig
+        templates: Template directory to read from and add to
+        spec: Rig spec to build, defaults to ``rig_spec.POSER_RIG_SPEC``
+
+    Returns:
+        True if the rig was fitted from a template, False if it was generated in full
+
+    Raises:
+        ValueError: If required bones are missing from the armature
+    """
+    figure = detect_figure_profile(armature)
+    # rejected before a template is read from disk
+    compiled = compile_rig_spec(figure_profile_spec(spec or POSER_RIG_SPEC, figure))
+    validate_armature(armature, compiled, figure_profile(figure)['bone_map'])
+    key = template_key(armature, spec)
+    template = templates.load(key)
+    if template is None:
+        setup_poser_figure(armature, spec, figure=figure)
+        templates.store(key, armature)
+        return False
+
+    apply_figure_profile(armature, figure)
+    try:
+        fit_template(armature, template, compiled['widgets'], rig_inputs(compiled, figure))
+    finally:
+        remove_template(template)
+    return True
+
+
+def fit_template(armature: Object, template: Object, widgets: str = WIDGET_DETAIL_DEFAULT,
+                 inputs: dict = None) -> None:
+    """
+    Turn an imported Poser armature into a copy of a template rig fitted to its joints.
+
+    The armature gets a copy of the template's armature data with every bone moved
+    onto the figure's skeleton, then the template's pose-bone settings, constraints,
+    drivers and custom properties. Vertex groups and bone parents of the figure's
+    meshes are renamed the way full generation renames the source bones.
+
+    Args:
+        armature: Imported Poser armature object with the template's topology
+        template: Template rig from RigTemplates.load()
+        widgets: Widget source, see custom_shapes.assign_all_custom_shapes()
+        inputs: Generation inputs to record in the manifest, see rig_manifest.rig_inputs()
+    """
+    prepare_armature(armature)
+    with edit_mode(armature):
+        record_source_skeleton(armature)
+
+    rename_bone_users(armature, plan_bone_renames(armature.data.bones.keys(), PREFIX_DEF)['renames'])
+
+    source_data = armature.data
+    data_name = source_data.name
+    armature.data = template.data.copy()
+    if source_data.users == 0:
+        bpy.data.armatures.remove(source_data)
+    armature.data.name = data_name
+
+    with edit_mode(armature):
+        fit_bones(armature, source_skeleton(template), source_skeleton(armature))
+        calculate_bone_roll(armature)
+        mirror_edit_bones(armature)
+
+    pose_bones = armature.pose.bones
+    for template_bone in template.pose.bones:
+        copy_pose_bone_settings(template_bone, pose_bones[template_bone.name])
+
+    # the fitted rig starts without constraints or drivers, so everything is created
+    constraints = [(bone.name, constraint.name) for bone in template.pose.bones for constraint in bone.constraints]
+    sync_constraints(armature, template, {'create': constraints, 'update': [], 'delete': []})
+    if template.animation_data is not None:
+        drivers = [driver_key(fcurve) for fcurve in template.animation_data.drivers]
+        sync_drivers(armature, template, {'create': drivers, 'update': [], 'delete': []})
+    sync_properties(armature, template)
+
+    assign_all_custom_shapes(armature, source=widgets)
+    record_manifest(armature, inputs=inputs)
+
+
+def fit_bones(armature: Object, template_source: list[dict], figure_source: list[dict]) -> None:
+    """
+    Move every bone end to keep its offset from the nearest source joint.
+
+    Joints are the heads and tails of the source skeleton's bones. Each bone end is
+    matched with the template's nearest joint, then placed at the same offset from
+    that joint in the figure's source skeleton. Bones at absolute positions
+    (``PINNED_BONES``) are not moved, and the eye targets keep their Y coordinate.
+
+    Args:
+        armature: Armature object in edit mode, holding a copy of the template's bones
+        template_source: Source skeleton recorded on the template rig
+        figure_source: Source skeleton of the figure being rigged
+    """
+    figure_joints = {record['name']: record for record in figure_source}
+    tree = KDTree(len(template_source) * 2)
+    joints = []
+    for record in template_source:
+        for end in ('head', 'tail'):
+            tree.insert(record[end], len(joints))
+            joints.append((record['name'], end))
+    tree.balance()
+
+    edit_bones = armature.data.edit_bones
+    connected = [bone for bone in edit_bones if bone.use_connect]
+    for bone in connected:
+        bone.use_connect = False
+
+    for bone in edit_bones:
+        if bone.name in PINNED_BONES:
+            continue
+        for end in ('head', 'tail'):
+            point = getattr(bone, end).copy()
+            joint, index, _ = tree.find(point)
+            name, joint_end = joints[index]
+            fitted = Vector(figure_joints[name][joint_end]) + (point - joint)
+            if bone.name in PINNED_Y_BONES:
+                fitted.y = point.y
+            setattr(bone, end, fitted)
+
+    for bone in connected:
+        bone.use_connect = True
+
+
+def copy_pose_bone_settings(source: PoseBone, target: PoseBone) -> None:
+    """
+    Copy a pose bone's editable settings, apart from its name and widget.
+
+    Widgets are pointers, which are assigned by assign_all_custom_shapes() instead.
+
+    Args:
+        source: Template pose bone
+        target: Pose bone of the fitted rig
+    """
+    for prop in source.bl_rna.properties:
+        identifier = prop.identifier
+        if prop.is_readonly or prop.type in {'POINTER', 'COLLECTION'} or identifier == 'name':
+            continue
+        setattr(target, identifier, getattr(source, identifier))
+
+
+def remove_template(template: Object) -> None:
+    """Delete a loaded template rig together with its armature data."""
+    data = template.data
+    bpy.data.objects.remove(template)
+    if data.users == 0:
+        bpy.data.armatures.remove(data)
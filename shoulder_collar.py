@@ -1,12 +1,12 @@
 from .constraints import add_copy_location_constraint
 from .colorscheme import bright_orange, bright_yellow
 from .helpers import align_bone_to_source, create_bone
-import bpy
+from .rest_pose import RestPose
+from bpy.types import Object
 
-def setup_collar_constraints():
+def setup_collar_constraints(armature: Object):
     # todo: refactor to use new method for adding damped track constraints
-    armature = bpy.context.object
-    bones = bpy.context.object.pose.bones
+    bones = armature.pose.bones
 
     bone_ik_ctrl_hand = bones['CTRL-IK-Hand.L']
     bone_ik_collar = bones['IK-Collar.L']
@@ -58,25 +58,21 @@ def setup_collar_constraints():
     )
 
 
-def create_mch_shoulder_bones_and_controls():
-    edit_bones = bpy.context.object.data.edit_bones
-    collections = bpy.context.object.data.collections
-    all_collections = bpy.context.object.data.collections_all
-    mch_collection = all_collections.get('MCH')
-    mch_shoulder_collection = collections.new('MCH Shoulder', parent=mch_collection)
+def create_mch_shoulder_bones_and_controls(armature: Object):
+    edit_bones = armature.data.edit_bones
+    mch_shoulder_collection = armature.data.collections_all.get('MCH Shoulder')
 
     # what we need:
     # IK-Collar (both sides)
     # X/Y axis of Hand tail
     # grab existing bones for coordinates and alignment
-    bpy.ops.armature.select_all(action='DESELECT')
 
     # get references to bones that we either need to determine position for
     # our MCH bones, or need to be parented to
     bone_ik_collar_bone = edit_bones['IK-Collar.L']
-    bone_ik_hand_bone = edit_bones['IK-Hand.L']
     bone_ik_ctrl_hand = edit_bones['CTRL-IK-Hand.L']
     bone_def_chest = edit_bones['DEF-Chest']
+    rest = RestPose(armature)
 
     # create new bones
     bone_mch_collar_bone = create_bone(
@@ -85,8 +81,8 @@ def create_mch_shoulder_bones_and_controls():
         parent=bone_def_chest,
         display_type='OCTAHEDRAL',
         palette='CUSTOM',
-        head=bone_ik_collar_bone.head,
-        tail=bone_ik_collar_bone.tail,
+        head=rest.head('IK-Collar.L'),
+        tail=rest.tail('IK-Collar.L'),
         custom_color=bright_orange,
         collection=mch_shoulder_collection,
     )
@@ -100,8 +96,8 @@ def create_mch_shoulder_bones_and_controls():
         parent=bone_def_chest,
         display_type='STICK',
         palette='CUSTOM',
-        head=bone_ik_collar_bone.head,
-        tail=bone_ik_hand_bone.head,
+        head=rest.head('IK-Collar.L'),
+        tail=rest.head('IK-Hand.L'),
         custom_color=bright_yellow,
         collection=mch_shoulder_collection,
     )
@@ -0,0 +1,303 @@
+"""Compile a declarative rig spec and apply it to an armature in bulk passes.
+
+``compile_rig_spec`` resolves every name in a spec (see ``rig_spec``) once, producing
+flat lists of bones, constraints and drivers. The ``build_*`` passes then apply one
+kind of change at a time: all collections, all chain bones, all constraints, all
+drivers, without searching the armature for matching bones.
+"""
+
+import math
+
+import numpy as np
+from bpy.types import Object
+
+from .constants import FKIK_MAX, FKIK_MIN, PREFIX_DEF, SUFFIX_LEFT, SUFFIX_RIGHT, WIDGET_DETAIL_DEFAULT
+from .custom_properties import set_custom_property
+from .drivers import add_fkik_driver, add_switch_mute_driver
+from .helpers import create_bone
+from .mirror import flip_side_name
+from .rest_pose import RestPose
+
+
+def compile_rig_spec(spec: dict) -> dict:
+    """
+    Resolve a rig spec into the flat lists the build passes apply.
+
+    Args:
+        spec: Rig spec, e.g. ``rig_spec.POSER_RIG_SPEC``
+
+    Returns:
+        Compiled rig with ``collections``, ``bones``, ``bone_offsets``, ``ik_controls``,
+        ``constraints``, ``drivers``, ``chain_mutes``, ``properties``, ``widgets``,
+        ``roll_strategies`` and ``source_bones`` entries
+    """
+    return {
+        'name': spec['name'],
+        'collections': list(spec['collections']),
+        'bones': _compile_chain_bones(spec['chains']),
+        'bone_offsets': dict(spec['bone_offsets']),
+        'ik_controls': list(spec['ik_controls']),
+        'constraints': _compile_layer_links(spec) + _compile_ik_constraints(spec['ik_constraints']),
+        'drivers': _compile_switch_drivers(spec),
+        'switch_constraint': spec['switch_constraint'],
+        'chain_mutes': _compile_chain_mutes(spec) if spec.get('mute_inactive_chains') else [],
+        'properties_bone': spec['properties_bone'],
+        'properties': list(spec['properties']),
+        'widgets': spec.get('widgets', WIDGET_DETAIL_DEFAULT),
+        'roll_strategies': dict(spec.get('roll_strategies', {})),
+        'source_bones': _compile_source_bones(spec),
+    }
+
+
+def _compile_source_bones(spec: dict) -> list[str]:
+    """List the figure bones the generator reads, both sides, named as ``rename_bone`` names them."""
+    names = {f'{bone}{chain["side"]}' for chain in spec['chains'] for bone in chain['bones']}
+    names.update(spec.get('source_bones', []))
+    names |= {flip_side_name(name) for name in names}
+    return sorted(names - set(spec.get('generated_bones', [])))
+
+
+def _compile_chain_bones(chains: list[dict]) -> list[dict]:
+    """List every chain layer bone with its deform source, parent, look and collection."""
+    bones = []
+    for chain in chains:
+        side = chain['side']
+        for layer, settings in chain['layers'].items():
+            parent = settings['parent']
+            for index, bone_name in enumerate(chain['bones']):
+                name = f'{layer}-{bone_name}{side}'
+                bones.append({
+                    'name': name,
+                    'source': f'{PREFIX_DEF}{bone_name}{side}',
+                    'parent': parent,
+                    'use_connect': settings.get('use_connect', False) and index != 0,
+                    'palette': settings['palette'],
+                    'bbone_size': settings['bbone_size'],
+                    'collection': settings['collection'],
+                })
+                parent = name
+
+    return bones
+
+
+def _compile_layer_links(spec: dict) -> list[dict]:
+    """List the Copy Transforms constraints linking chain layers, one per linked bone."""
+    bone_names = [f'{bone}{chain["side"]}' for chain in spec['chains'] for bone in chain['bones']]
+    constraints = []
+    for link in spec['layer_links']:
+        for bone_name in bone_names + link.get('extra_bones', []):
+            constraints.append({
+                'bone': f'{link["to"]}-{bone_name}',
+                'type': 'COPY_TRANSFORMS',
+                'name': link['name'],
+                'settings': {'subtarget': f'{link["from"]}-{bone_name}'},
+            })
+
+    return constraints
+
+
+def _compile_ik_constraints(ik_constraints: list[dict]) -> list[dict]:
+    """List the IK constraints with their resolved targets, chain length and pole."""
+    constraints = []
+    for ik in ik_constraints:
+        side = ik.get('side', '')
+        settings = {'subtarget': ik['target'] + side, 'chain_count': len(ik['chain'])}
+        if ik.get('pole_name') is not None:
+            settings['pole_subtarget'] = f'CTRL-IK-Pole-{ik["pole_name"]}{side}'
+            settings['pole_angle'] = math.radians(ik.get('pole_angle', 180))
+
+        constraints.append({'bone': f'IK-{ik["chain"][0]}{side}', 'type': 'IK', 'name': 'IK', 'settings': settings})
+
+    return constraints
+
+
+def _chain_switches(spec: dict) -> list[tuple[dict, str, dict, str]]:
+    """
+    List every switched chain side with its switch property's data path.
+
+    Drivers are added after mirroring, so right-side chains are listed here as well.
+    """
+    properties_bone = spec['properties_bone']
+    switches = []
+    for chain in spec['chains']:
+        switch = chain.get('switch')
+        if switch is None:
+            continue
+
+        sides = [chain['side'], flip_side_name(chain['side'])] if chain['side'] else ['']
+        for side in sides:
+            prop_name = switch['property']
+            if isinstance(prop_name, dict):
+                prop_name = prop_name[side]
+
+            data_path = f'pose.bones["{properties_bone}"]["{prop_name}"]'
+            index = switch['index']
+            if index == 'side':
+                index = [SUFFIX_LEFT, SUFFIX_RIGHT].index(side)
+            if index is not None:
+                data_path += f'[{index}]'
+
+            switches.append((chain, side, switch, data_path))
+
+    return switches
+
+
+def _compile_switch_drivers(spec: dict) -> list[dict]:
+    """List the FK/IK switch drivers for both sides of every chain."""
+    return [
+        {'bone': f'FK-{bone_name}{side}', 'constraint': spec['switch_constraint'], 'data_path': data_path}
+        for chain, side, switch, data_path in _chain_switches(spec)
+        for bone_name in switch.get('bones', chain['bones'])
+    ]
+
+
+def _compile_chain_mutes(spec: dict) -> list[dict]:
+    """
+    List, per switched chain side, the bones whose constraints the switch can mute.
+
+    ``ik_bones`` own the chain's IK solvers, muted while the chain is fully FK.
+    ``fk_bones`` are the switched FK bones, whose own constraints are overridden by the
+    switch constraint while the chain is fully IK.
+    """
+    mutes = []
+    for chain, side, switch, data_path in _chain_switches(spec):
+        ik_bones = [
+            f'IK-{ik["chain"][0]}{side}' for ik in spec['ik_constraints']
+            if ik.get('side', '') == chain['side'] and set(ik['chain']) <= set(chain['bones'])
+        ]
+        mutes.append({
+            'data_path': data_path,
+            'ik_bones': ik_bones,
+            'fk_bones': [f'FK-{bone_name}{side}' for bone_name in switch.get('bones', chain['bones'])],
+        })
+
+    return mutes
+
+
+def build_collections(armature: Object, compiled: dict) -> None:
+    """
+    Create the compiled rig's bone collections, reusing any that already exist.
+
+    Args:
+        armature: Armature object to add the collections to
+        compiled: Compiled rig from compile_rig_spec()
+    """
+    collections = armature.data.collections_all
+    for name, parent in compiled['collections']:
+        if name not in collections:
+            armature.data.collections.new(name, parent=collections.get(parent))
+
+
+def build_chain_bones(armature: Object, compiled: dict) -> None:
+    """
+    Create every FK/IK chain bone in one pass.
+
+    Bones are created first and parented afterwards, so chains may be listed in any
+    order. Collection membership and the spec's bone offsets are applied last.
+
+    Args:
+        armature: Armature object in edit mode
+        compiled: Compiled rig from compile_rig_spec()
+    """
+    edit_bones = armature.data.edit_bones
+    new_bones = []
+    for bone in compiled['bones']:
+        source = edit_bones[bone['source']]
+        new_bones.append(create_bone(
+            edit_bones=edit_bones,
+            name=bone['name'],
+            head=source.head,
+            tail=source.tail,
+            palette=bone['palette'],
+            bbone_size=bone['bbone_size'],
+        ))
+
+    collections = armature.data.collections_all
+    for bone, new_bone in zip(compiled['bones'], new_bones, strict=True):
+        new_bone.parent = edit_bones[bone['parent']]
+        new_bone.use_connect = bone['use_connect']
+        collections[bone['collection']].assign(new_bone)
+
+    offsets = compiled['bone_offsets']
+    if offsets:
+        rest = RestPose(armature)
+        rows = [rest.rows[name] for name in offsets]
+        head_offsets, tail_offsets = np.array(list(offsets.values()), dtype=np.float32).transpose(1, 0, 2)
+        rest.heads[rows] += head_offsets
+        rest.tails[rows] += tail_offsets
+        rest.write()
+
+
+def build_constraints(armature: Object, compiled: dict) -> None:
+    """
+    Add every compiled constraint, targeting bones of the armature itself.
+
+    Args:
+        armature: Armature object with pose bones for all constraint owners and targets
+        compiled: Compiled rig from compile_rig_spec()
+    """
+    pose_bones = armature.pose.bones
+    for record in compiled['constraints']:
+        constraint = pose_bones[record['bone']].constraints.new(record['type'])
+        constraint.name = record['name']
+        constraint.target = armature
+        if 'pole_subtarget' in record['settings']:
+            constraint.pole_target = armature
+        for setting, value in record['settings'].items():
+            setattr(constraint, setting, value)
+
+
+def build_drivers(armature: Object, compiled: dict) -> None:
+    """
+    Add the FK/IK switch drivers to the compiled switch constraints.
+
+    The drivers read their switch property without an expression, so they need no
+    forced re-evaluation once created.
+
+    Args:
+        armature: Armature object owning the constraints and the switch properties
+        compiled: Compiled rig from compile_rig_spec()
+    """
+    pose_bones = armature.pose.bones
+    for record in compiled['drivers']:
+        constraint = pose_bones[record['bone']].constraints[record['constraint']]
+        add_fkik_driver(constraint, armature, record['data_path'])
+
+
+def build_properties(armature: Object, compiled: dict) -> None:
+    """
+    Create the compiled custom properties on the properties bone.
+
+    Args:
+        armature: Armature object owning the properties bone
+        compiled: Compiled rig from compile_rig_spec()
+    """
+    properties_bone = armature.pose.bones[compiled['properties_bone']]
+    for prop in compiled['properties']:
+        set_custom_property(properties_bone, prop['name'], prop['default'], prop.get('min'), prop.get('max'))
+
+
+def build_chain_mutes(armature: Object, compiled: dict) -> None:
+    """
+    Mute each chain layer's constraints while its FK/IK switch blends it away.
+
+    IK solvers are muted while the chain is fully FK. Constraints stacked before the
+    switch constraint on FK bones are muted while the chain is fully IK, as the switch
+    then replaces their result. Both come back as soon as the switch moves.
+
+    Args:
+        armature: Armature object owning the constraints and the switch properties
+        compiled: Compiled rig from compile_rig_spec()
+    """
+    pose_bones = armature.pose.bones
+    for record in compiled['chain_mutes']:
+        for bone_name in record['ik_bones']:
+            for constraint in pose_bones[bone_name].constraints:
+                if constraint.type == 'IK':
+                    add_switch_mute_driver(constraint, armature, record['data_path'], FKIK_MIN)
+
+        for bone_name in record['fk_bones']:
+            for constraint in pose_bones[bone_name].constraints:
+                if constraint.name == compiled['switch_constraint']:
+                    break
+                add_switch_mute_driver(constraint, armature, record['data_path'], FKIK_MAX)
@@ -0,0 +1,161 @@
+"""Procedural widget geometry for rig control bones.
+
+Widgets are wire meshes in bone space: Y runs along the bone from head (0) to tail (1),
+and Blender scales a custom shape by the bone's length, so every shape is built at unit
+size. ``widget_shape`` picks a shape and its parameters from a bone's name, and
+``widget_geometry`` builds the shape's vertices and edges at a vertex budget given as
+the number of segments per full circle.
+"""
+
+import math
+from functools import cache
+
+from .bone_index import parse_bone_name
+from .constants import BONE_PROPERTIES, BONE_ROOT, FINGER_NAMES
+
+# Spine controls drawn as a large ring around the body
+BODY_CONTROLS = {'Torso': 1.0, 'Hip': 0.8, 'Chest': 0.8}
+
+
+def widget_shape(bone_name: str) -> tuple[str, dict] | None:
+    """
+    Choose the procedural widget for a control bone.
+
+    Args:
+        bone_name: Bone name
+
+    Returns:
+        ``(shape, parameters)`` for widget_geometry(), or None for bones without a widget
+    """
+    parts = parse_bone_name(bone_name)
+    prefix, base = parts['prefix'], parts['base']
+    roles = prefix.split('-')
+
+    if 'DEF' in roles or 'MCH' in roles:
+        return None
+    if base == BONE_ROOT:
+        return 'circle', {'radius': 1.0, 'y': 0.0}
+    if base == BONE_PROPERTIES:
+        return 'cube', {'size': 0.25}
+    if base.startswith('Pole-'):
+        return 'pole', {'radius': 0.2}
+    if base == 'Foot-Roll':
+        return 'arrow', {}
+    if base == 'Fingers-CTRL' or (prefix in ('CTRL-FK', 'CTRL-IK') and base in FINGER_NAMES):
+        return 'finger_curl', {}
+    if base == 'Thumb-Joint':
+        return 'pole', {'radius': 0.3}
+    if base == 'Eye_Target':
+        return 'circle', {'radius': 0.5, 'y': 0.0}
+    if prefix == 'CTRL-IK':
+        return 'cube', {'size': 1.0}
+    if prefix == 'CTRL' and base in BODY_CONTROLS:
+        return 'circle', {'radius': BODY_CONTROLS[base], 'y': 0.5}
+    if prefix == 'IK':
+        return 'circle', {'radius': 0.25, 'y': 0.5}
+    return 'circle', {'radius': 0.5, 'y': 0.5}
+
+
+def widget_object_name(shape: str, segments: int, params: dict) -> str:
+    """
+    Name the shared widget object of a shape, e.g. ``'WGT-circle-16-radius0.5-y0.5'``.
+
+    Args:
+        shape: Shape name
+        segments: Segments per full circle
+        params: Shape parameters
+
+    Returns:
+        Object (and mesh) name
+    """
+    return '-'.join(['WGT', shape, str(segments), *(f'{key}{value:g}' for key, value in sorted(params.items()))])
+
+
+@cache
+def widget_geometry(shape: str, segments: int, params: tuple[tuple[str, float], ...] = ()) -> tuple[tuple, tuple]:
+    """
+    Build the wire geometry of a shape. Results are cached per shape and parameters.
+
+    Args:
+        shape: One of ``'circle'``, ``'cube'``, ``'arrow'``, ``'finger_curl'`` or ``'pole'``
+        segments: Segments per full circle
+        params: Shape parameters as sorted ``(name, value)`` pairs
+
+    Returns:
+        ``(vertices, edges)``, with vertices as ``(x, y, z)`` tuples
+
+    Raises:
+        ValueError: If the shape is unknown
+    """
+    builders = {
+        'circle': _circle,
+        'cube': _cube,
+        'arrow': _arrow,
+        'finger_curl': _finger_curl,
+        'pole': _pole,
+    }
+    if shape not in builders:
+        raise ValueError(f"Unknown widget shape: {shape}")
+
+    vertices, edges = builders[shape](segments, **dict(params))
+    return tuple(vertices), tuple(edges)
+
+
+def _ring(segments: int, point) -> tuple[list, list]:
+    """Build a closed loop of ``segments`` vertices placed by ``point(angle)``."""
+    vertices = [point(2 * math.pi * i / segments) for i in range(segments)]
+    edges = [(i, (i + 1) % segments) for i in range(segments)]
+    return vertices, edges
+
+
+def _circle(segments: int, radius: float = 1.0, y: float = 0.5) -> tuple[list, list]:
+    """Ring around the bone, perpendicular to it."""
+    return _ring(segments, lambda angle: (radius * math.cos(angle), y, radius * math.sin(angle)))
+
+
+def _cube(_segments: int, size: float = 1.0) -> tuple[list, list]:
+    """Wire cube centred on the middle of the bone; eight vertices at any budget."""
+    half = size / 2
+    vertices = [(x * half, 0.5 + y * half, z * half) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)]
+    edges = [(a, b) for a in range(8) for b in range(a + 1, 8) if bin(a ^ b).count('1') == 1]
+    return vertices, edges
+
+
+def _arrow(_segments: int) -> tuple[list, list]:
+    """Flat arrow pointing along the bone; seven vertices at any budget."""
+    vertices = [
+        (-0.1, 0.0, 0.0), (0.1, 0.0, 0.0), (0.1, 0.6, 0.0), (0.25, 0.6, 0.0),
+        (0.0, 1.0, 0.0), (-0.25, 0.6, 0.0), (-0.1, 0.6, 0.0),
+    ]
+    edges = [(i, (i + 1) % len(vertices)) for i in range(len(vertices))]
+    return vertices, edges
+
+
+def _finger_curl(segments: int) -> tuple[list, list]:
+    """Half-circle arc curling around the bone tip, ending in an arrowhead."""
+    steps = max(segments // 2, 2)
+    vertices = [
+        (0.0, 0.5 + 0.5 * math.cos(math.pi * i / steps), 0.5 * math.sin(math.pi * i / steps))
+        for i in range(steps + 1)
+    ]
+    edges = [(i, i + 1) for i in range(steps)]
+    tip = len(vertices) - 1
+    vertices += [(0.0, 0.1, 0.15), (0.0, -0.1, 0.15)]
+    edges += [(tip, tip + 1), (tip, tip + 2)]
+    return vertices, edges
+
+
+def _pole(segments: int, radius: float = 0.2) -> tuple[list, list]:
+    """Sphere of three rings around the bone head, for pole targets and joints."""
+    planes = (
+        lambda angle: (radius * math.cos(angle), radius * math.sin(angle), 0.0),
+        lambda angle: (radius * math.cos(angle), 0.0, radius * math.sin(angle)),
+        lambda angle: (0.0, radius * math.cos(angle), radius * math.sin(angle)),
+    )
+    vertices, edges = [], []
+    for point in planes:
+        ring_vertices, ring_edges = _ring(segments, point)
+        offset = len(vertices)
+        vertices += ring_vertices
+        edges += [(a + offset, b + offset) for a, b in ring_edges]
+    return vertices, edges